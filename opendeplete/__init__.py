@@ -3,22 +3,84 @@ OpenDeplete
 ===========
 
 A simple depletion front-end tool.
+
+Submodules are imported on first access of them or one of their names, so that
+reading results does not import OpenMC or initialize MPI.  comm and have_mpi
+are likewise set up on first access.
 """
 
+import importlib
+
 from .dummy_comm import DummyCommunicator
-try:
-    from mpi4py import MPI
-    comm = MPI.COMM_WORLD
-    have_mpi = True
-except ImportError:
-    comm = DummyCommunicator()
-    have_mpi = False
-
-from .nuclide import *
-from .depletion_chain import *
-from .openmc_wrapper import *
-from .reaction_rates import *
-from .function import *
-from .results import *
-from .integrator import *
-from .utilities import *
+
+# Submodule providing each public name
+_LAZY_NAMES = {
+    ".nuclide": ["Nuclide", "DecayTuple", "ReactionTuple", "FissionYields"],
+    ".depletion_chain": ["DepletionChain", "replace_missing"],
+    ".openmc_wrapper": ["OpenMCSettings", "Materials", "OpenMCOperator",
+                        "chunks", "density_to_mat", "clean_up_openmc"],
+    ".fake_capi": ["FakeCapi", "FakeSettings", "FakeMaterial",
+                   "FakeMaterialFilter", "FakeTally"],
+    ".atom_number": ["AtomNumber"],
+    ".reaction_rates": ["ReactionRates"],
+    ".function": ["Settings", "Operator"],
+    ".results": ["Results", "ResultsFile", "ResultsWriter", "CompactRates",
+                 "read_metadata", "get_dict", "tail_results", "write_results",
+                 "read_results", "RESULTS_VERSION", "RESULTS_VERSION_MIN",
+                 "CHUNK_BYTES", "CHUNK_STEPS"],
+    ".replay": ["ReplayOperator"],
+    ".integrator": ["cecm", "predictor", "sie", "CRAM16", "CRAM48", "TTA",
+                    "TTA_CUTOFF", "cram_wrapper", "cram16_wrapper",
+                    "tta_wrapper", "deplete", "fission_power", "get_pool",
+                    "get_solver", "ranks_per_node", "default_workers",
+                    "results_writer", "save_results"],
+    ".utilities": ["evaluate_single_nuclide", "evaluate_reaction_rate",
+                   "evaluate_eigenvalue", "nuclide_series",
+                   "reaction_rate_series", "eigenvalue_series",
+                   "dense_output"],
+}
+
+_NAME_TO_MODULE = {name: module for module, names in _LAZY_NAMES.items()
+                   for name in names}
+
+__all__ = ["DummyCommunicator", "comm", "have_mpi"] + list(_NAME_TO_MODULE)
+
+
+def _init_comm():
+    """ Sets comm to COMM_WORLD if mpi4py is available, else a dummy. """
+
+    try:
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        have_mpi = True
+    except ImportError:
+        comm = DummyCommunicator()
+        have_mpi = False
+
+    globals().update(comm=comm, have_mpi=have_mpi)
+
+
+def __getattr__(name):
+    if name in ("comm", "have_mpi"):
+        _init_comm()
+        return globals()[name]
+
+    if name in _NAME_TO_MODULE:
+        module = importlib.import_module(_NAME_TO_MODULE[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    # Submodules and subpackages, as a plain package would after their import
+    try:
+        return importlib.import_module("." + name, __name__)
+    except ModuleNotFoundError as err:
+        if err.name != __name__ + "." + name:
+            raise
+
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,6 +5,8 @@ An ndarray to store atom densities with string, integer, or slice indexing.
 
 import numpy as np
 
+from .indexing import name_index, outer_index
+
 
 class AtomNumber(object):
     """ AtomNumber module.
@@ -70,6 +72,9 @@ class AtomNumber(object):
         self._burn_nuc_list = None
         self._burn_mat_list = None
 
+        # Sorted name arrays for looking up lists of names
+        self._index_cache = {}
+
     def __getitem__(self, pos):
         """ Retrieves total atom number from AtomNumber.
 
@@ -78,7 +83,9 @@ class AtomNumber(object):
         pos : tuple
             A two-length tuple containing a material index and a nuc index.
             These indexes can be strings (which get converted to integers via
-            the dictionaries), integers used directly, or slices.
+            the dictionaries), integers used directly, slices, or lists or
+            arrays of either.  Lists on both axes select every nuclide in
+            every material.
 
         Returns
         -------
@@ -86,13 +93,7 @@ class AtomNumber(object):
             The value indexed from self.number.
         """
 
-        mat, nuc = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
-
-        return self.number[mat, nuc]
+        return self.number[self._index(*pos)]
 
     def __setitem__(self, pos, val):
         """ Sets total atom number into AtomNumber.
@@ -102,27 +103,22 @@ class AtomNumber(object):
         pos : tuple
             A two-length tuple containing a material index and a nuc index.
             These indexes can be strings (which get converted to integers via
-            the dictionaries), integers used directly, or slices.
+            the dictionaries), integers used directly, slices, or lists or
+            arrays of either.
         val : float
             The value to set the array to.
         """
 
-        mat, nuc = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
-
-        self.number[mat, nuc] = val
+        self.number[self._index(*pos)] = val
 
     def get_atom_density(self, mat, nuc):
         """ Accesses atom density instead of total number.
 
         Parameters
         ----------
-        mat : str, int or slice
+        mat : str, int, slice or list
             Material index.
-        nuc : str, int or slice
+        nuc : str, int, slice or list
             Nuclide index.
 
         Returns
@@ -131,39 +127,34 @@ class AtomNumber(object):
             The density indexed.
         """
 
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
+        index = self._index(mat, nuc)
+        number = self.number[index]
 
-        return self[mat, nuc] / self.volume[mat]
+        return number / self._volume(index[0], number)
 
     def set_atom_density(self, mat, nuc, val):
         """ Sets atom density instead of total number.
 
         Parameters
         ----------
-        mat : str, int or slice
+        mat : str, int, slice or list
             Material index.
-        nuc : str, int or slice
+        nuc : str, int, slice or list
             Nuclide index.
         val : numpy.array
             Array of values to set.
         """
 
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
+        index = self._index(mat, nuc)
 
-        self[mat, nuc] = val * self.volume[mat]
+        self.number[index] = val * self._volume(index[0], self.number[index])
 
     def get_mat_slice(self, mat):
         """ Gets atom quantity indexed by mats for all burned nuclides
 
         Parameters
         ----------
-        mat : str, int or slice
+        mat : str, int, slice or list
             Material index.
 
         Returns
@@ -172,8 +163,7 @@ class AtomNumber(object):
             The slice requested.
         """
 
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
+        mat = name_index(mat, self.mat_to_ind, self._index_cache)
 
         return self[mat, 0:self.n_nuc_burn]
 
@@ -182,17 +172,33 @@ class AtomNumber(object):
 
         Parameters
         ----------
-        mat : str, int or slice
+        mat : str, int, slice or list
             Material index.
         val : numpy.array
             The slice to set.
         """
 
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
+        mat = name_index(mat, self.mat_to_ind, self._index_cache)
 
         self[mat, 0:self.n_nuc_burn] = val
 
+    def _index(self, mat, nuc):
+        """ Translates a material and nuclide index into array indices. """
+
+        mat = name_index(mat, self.mat_to_ind, self._index_cache)
+        nuc = name_index(nuc, self.nuc_to_ind, self._index_cache)
+
+        return outer_index((mat, nuc), self.number.shape)
+
+    def _volume(self, mat, number):
+        """ Returns the volumes of mat, broadcastable against number. """
+
+        volume = self.volume[mat]
+        if np.ndim(volume) == 1 and np.ndim(number) == 2:
+            volume = volume[:, np.newaxis]
+
+        return volume
+
     @property
     def n_mat(self):
         """Number of materials."""
@@ -0,0 +1,10 @@
+"""
+OpenDeplete benchmarks
+======================
+
+Synthetic chains and operators of configurable size, and a suite timing the
+main stages of a depletion run against a stored baseline.
+"""
+
+from .synthetic import *
+from .suite import *
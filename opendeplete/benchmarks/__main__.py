@@ -0,0 +1,5 @@
+""" Runs the benchmark suite, see opendeplete.benchmarks.suite.main. """
+
+from .suite import main
+
+main()
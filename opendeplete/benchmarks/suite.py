@@ -0,0 +1,295 @@
+""" The benchmark suite.
+
+Times reading chains, forming depletion matrices, the CRAM solvers, results
+output and input, time series reads, and full integrator steps on a
+synthetic problem, and compares the throughput against a stored baseline.
+"""
+
+import argparse
+from collections import OrderedDict
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .. import comm
+from ..depletion_chain import DepletionChain
+from ..function import Settings
+from ..integrator import CRAM16, CRAM48, predictor, results_writer, \
+    save_results
+from ..results import read_results
+from ..utilities import nuclide_series
+from .synthetic import synthetic_chain, SyntheticOperator
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Time step used for the solver and integrator benchmarks, in seconds
+BENCHMARK_DT = 30 * 24 * 3600.0
+
+
+def run_suite(n_nuclides=200, n_materials=32, n_steps=2, repeat=3,
+              n_sample=16, backend="serial", n_workers=None, seed=1):
+    """ Runs every benchmark on a synthetic problem.
+
+    Each benchmark is run repeat times, and the fastest time is kept.
+
+    Parameters
+    ----------
+    n_nuclides : int, optional
+        Number of nuclides in the synthetic chain.
+    n_materials : int, optional
+        Number of materials in the synthetic operator.
+    n_steps : int, optional
+        Number of steps written and read, and integrated.
+    repeat : int, optional
+        Number of times each benchmark is run.
+    n_sample : int, optional
+        Number of materials used for the per-material benchmarks.
+    backend : str, optional
+        Depletion backend used for the integrator benchmark.
+    n_workers : int, optional
+        Number of depletion workers used for the integrator benchmark.
+    seed : int, optional
+        Seed of the synthetic problem.
+
+    Returns
+    -------
+    OrderedDict of str to dict
+        For each benchmark, the time in "seconds", the "throughput" and its
+        "unit".
+    """
+
+    chain = synthetic_chain(n_nuclides, seed=seed)
+
+    settings = Settings()
+    settings.dt_vec = [BENCHMARK_DT] * n_steps
+    settings.backend = backend
+    settings.n_workers = n_workers
+
+    op = SyntheticOperator(settings, chain, n_materials, seed=seed)
+    x = op.initial_condition()
+    rates = op.eval(x)[1]
+    n_sample = min(n_sample, len(op.burn_list))
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        settings.output_dir = tmp_dir
+        chain_file = os.path.join(tmp_dir, "chain.xml")
+        chain.xml_write(chain_file)
+
+        results = OrderedDict()
+
+        seconds = _best(repeat, DepletionChain.xml_read, chain_file)
+        results["xml_read"] = _entry(seconds, n_nuclides, "nuclides/s")
+
+        # Rates of the chain's pairs, as passed by deplete
+        def form_matrices():
+            return [chain.form_matrix(rates.rates[i]) for i in range(n_sample)]
+
+        seconds = _best(repeat, form_matrices)
+        results["form_matrix"] = _entry(seconds, n_sample, "materials/s")
+
+        matrices = form_matrices()
+        for name, cram in (("cram16", CRAM16), ("cram48", CRAM48)):
+            def solve():
+                for i in range(n_sample):
+                    cram(matrices[i], x[i], BENCHMARK_DT)
+
+            seconds = _best(repeat, solve)
+            results[name] = _entry(seconds, n_sample, "materials/s")
+
+        # Results output and input, in atom number entries per second
+        n_entries = n_steps * n_materials * n_nuclides
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            def write():
+                with results_writer(op) as writer:
+                    for i in range(n_steps):
+                        save_results(op, x[None, :, :], [rates], [1.0], [0],
+                                     [i * BENCHMARK_DT, (i + 1) * BENCHMARK_DT],
+                                     i, writer)
+
+            seconds = _best(repeat, write)
+            results["save_results"] = _entry(seconds, n_entries, "entries/s")
+
+            seconds = _best(repeat, read_results, "results.h5")
+            results["read_results"] = _entry(seconds, n_entries, "entries/s")
+
+            # Time series of one nuclide in the sampled materials, from the
+            # contiguous datasets of a run and from chunked, compressed ones
+            cells = [str(i) for i in range(n_sample)]
+            nuc = chain.nuclides[0].name
+            n_series = n_steps * n_sample
+
+            seconds = _best(repeat, nuclide_series, "results.h5", cells, nuc)
+            results["read_series"] = _entry(seconds, n_series, "entries/s")
+
+            settings.output_compression = "gzip"
+            try:
+                write()
+            finally:
+                settings.output_compression = None
+
+            seconds = _best(repeat, nuclide_series, "results.h5", cells, nuc)
+            results["read_series_gzip"] = _entry(seconds, n_series,
+                                                 "entries/s")
+        finally:
+            os.chdir(cwd)
+
+        seconds = _best(repeat, predictor, op, False)
+        results["predictor"] = _entry(seconds, n_steps * n_materials,
+                                      "material steps/s")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return results
+
+
+def compare(results, baseline):
+    """ Compares benchmark throughput against a baseline.
+
+    Parameters
+    ----------
+    results : dict of str to dict
+        Benchmark results, as returned by run_suite.
+    baseline : dict of str to dict
+        Baseline results in the same form.
+
+    Returns
+    -------
+    OrderedDict of str to float
+        Throughput relative to the baseline for every benchmark in both,
+        above one if faster.
+    """
+
+    ratios = OrderedDict()
+    for name, entry in results.items():
+        if name in baseline:
+            ratios[name] = entry["throughput"] / baseline[name]["throughput"]
+
+    return ratios
+
+
+def load_baseline(filename=BASELINE):
+    """ Loads a baseline JSON file.
+
+    Parameters
+    ----------
+    filename : str, optional
+        Path to the baseline, the one shipped with the package by default.
+
+    Returns
+    -------
+    config : dict
+        Arguments of run_suite the baseline was run with.
+    results : dict of str to dict
+        Baseline results.
+    """
+
+    with open(filename) as fh:
+        data = json.load(fh)
+
+    return data["config"], data["results"]
+
+
+def save_baseline(filename, config, results):
+    """ Stores benchmark results as a baseline JSON file.
+
+    Parameters
+    ----------
+    filename : str
+        Path to write.
+    config : dict
+        Arguments of run_suite the results were run with.
+    results : dict of str to dict
+        Benchmark results.
+    """
+
+    with open(filename, "w") as fh:
+        json.dump({"config": config, "results": results}, fh, indent=2)
+        fh.write("\n")
+
+
+def main(argv=None):
+    """ Runs the benchmark suite from the command line.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments, sys.argv by default.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m opendeplete.benchmarks",
+        description="Benchmarks opendeplete on a synthetic problem.")
+    parser.add_argument("-n", "--nuclides", type=int, default=200)
+    parser.add_argument("-m", "--materials", type=int, default=32)
+    parser.add_argument("-s", "--steps", type=int, default=2)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("--sample", type=int, default=16,
+                        help="materials used for per-material benchmarks")
+    parser.add_argument("--backend", default="serial",
+                        choices=["process", "thread", "serial"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="baseline JSON to compare against")
+    parser.add_argument("--save", default=None,
+                        help="write the results as a baseline JSON")
+    args = parser.parse_args(argv)
+
+    config = OrderedDict([("n_nuclides", args.nuclides),
+                          ("n_materials", args.materials),
+                          ("n_steps", args.steps),
+                          ("repeat", args.repeat),
+                          ("n_sample", args.sample),
+                          ("backend", args.backend),
+                          ("n_workers", args.workers)])
+
+    results = run_suite(**config)
+
+    if comm.rank != 0:
+        return
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        baseline_config, baseline = load_baseline(args.baseline)
+        if baseline_config != config:
+            print("Warning: baseline was run with {}".format(
+                json.dumps(baseline_config)), file=sys.stderr)
+
+    ratios = compare(results, baseline)
+
+    print("{:<14} {:>12} {:>16}  {:<18} {:>9}".format(
+        "benchmark", "seconds", "throughput", "unit", "baseline"))
+    for name, entry in results.items():
+        ratio = "{:.2f}x".format(ratios[name]) if name in ratios else "-"
+        print("{:<14} {:>12.4e} {:>16.4e}  {:<18} {:>9}".format(
+            name, entry["seconds"], entry["throughput"], entry["unit"], ratio))
+
+    if args.save:
+        save_baseline(args.save, config, results)
+
+
+def _best(repeat, func, *args):
+    """ Returns the fastest of repeat calls of func, in seconds. """
+
+    best = float("inf")
+    for _ in range(repeat):
+        comm.barrier()
+        t_start = time.perf_counter()
+        func(*args)
+        comm.barrier()
+        best = min(best, time.perf_counter() - t_start)
+
+    return best
+
+
+def _entry(seconds, count, unit):
+    """ Builds a benchmark result. """
+
+    return OrderedDict([("seconds", seconds),
+                        ("throughput", count / seconds),
+                        ("unit", unit)])
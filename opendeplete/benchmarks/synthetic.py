@@ -0,0 +1,246 @@
+""" Synthetic chains and operators for benchmarking.
+
+The generated problems have no physical meaning, but have the structure of
+real depletion problems: a mix of stable and decaying nuclides with branched
+decay and transmutation, and fissionable nuclides whose yields populate a
+configurable fraction of the chain.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from .. import comm
+from ..depletion_chain import DepletionChain
+from ..function import Operator
+from ..nuclide import Nuclide, DecayTuple, ReactionTuple, FissionYields
+from ..reaction_rates import ReactionRates
+
+# Reactions given to every nuclide with reactions, with their change in index
+_REACTIONS = [("(n,gamma)", 1), ("(n,2n)", -1), ("(n,p)", 2), ("(n,a)", -3)]
+
+# Recoverable energy per fission in eV
+_FISSION_Q = 2.0e8
+
+
+def synthetic_chain(n_nuclides, n_branches=2, fission_fraction=0.02,
+                    yield_density=0.2, stable_fraction=0.1,
+                    reaction_fraction=0.5, seed=1):
+    """ Generates a depletion chain of arbitrary size.
+
+    Parameters
+    ----------
+    n_nuclides : int
+        Number of nuclides.
+    n_branches : int, optional
+        Number of decay modes of each unstable nuclide.
+    fission_fraction : float, optional
+        Fraction of nuclides that are fissionable, at least one.
+    yield_density : float, optional
+        Fraction of the chain produced by the fission of each fissionable
+        nuclide.
+    stable_fraction : float, optional
+        Fraction of nuclides that do not decay.
+    reaction_fraction : float, optional
+        Fraction of nuclides with neutron reactions.  Fissionable nuclides
+        always have reactions.
+    seed : int, optional
+        Seed of the random number generator.
+
+    Returns
+    -------
+    DepletionChain
+        The chain, with nuclides named "Syn0", "Syn1", ...
+    """
+
+    rng = np.random.RandomState(seed)
+
+    names = ["Syn{}".format(i) for i in range(n_nuclides)]
+
+    n_fissionable = max(1, int(fission_fraction * n_nuclides))
+    fissionable = set(rng.choice(n_nuclides, n_fissionable, replace=False))
+    n_products = max(1, int(yield_density * n_nuclides))
+
+    chain = DepletionChain()
+
+    for i, name in enumerate(names):
+        nuc = Nuclide()
+        nuc.name = name
+
+        if rng.rand() >= stable_fraction:
+            nuc.half_life = 10.0 ** rng.uniform(0.0, 15.0)
+            nuc.decay_energy = rng.uniform(0.0, 5.0e6)
+
+            # Decay into any other nuclide, which allows cycles
+            targets = (i + rng.randint(1, max(n_nuclides, 2), n_branches)) \
+                % n_nuclides
+            ratios = rng.dirichlet(np.ones(n_branches))
+            for target, ratio in zip(targets, ratios):
+                nuc.decay_modes.append(
+                    DecayTuple("beta-", names[target], ratio))
+
+        if i in fissionable or rng.rand() < reaction_fraction:
+            for r_type, shift in _REACTIONS:
+                target = names[(i + shift) % n_nuclides]
+                nuc.reactions.append(ReactionTuple(r_type, target, 0.0, 1.0))
+
+        if i in fissionable:
+            nuc.reactions.append(
+                ReactionTuple("fission", None, _FISSION_Q, 1.0))
+
+            products = np.sort(rng.choice(n_nuclides, n_products,
+                                          replace=False))
+            yields = 2.0 * rng.dirichlet(np.ones(n_products))
+            nuc.yield_data[0.0253] = FissionYields(
+                [names[j] for j in products], yields)
+            nuc.yield_energies = [0.0253]
+
+        chain.nuclide_dict[name] = i
+        for rx in nuc.reactions:
+            if rx.type not in chain.react_to_ind:
+                chain.react_to_ind[rx.type] = len(chain.react_to_ind)
+
+        chain.nuclides.append(nuc)
+
+    return chain
+
+
+class SyntheticOperator(Operator):
+    """ Operator with any number of materials and no transport.
+
+    Each material has random, fixed reaction rates per atom, and eval returns
+    a copy of them.  Materials are split evenly over the processes.
+
+    Parameters
+    ----------
+    settings : Settings
+        Settings object.
+    chain : DepletionChain
+        Depletion chain, typically from synthetic_chain.
+    n_materials : int
+        Number of materials in the whole problem.
+    seed : int, optional
+        Seed of the random number generator.
+
+    Attributes
+    ----------
+    settings : Settings
+        Settings object.
+    chain : DepletionChain
+        Depletion chain, with its reaction rate indices set.
+    n_materials : int
+        Number of materials in the whole problem.
+    burn_list : list of str
+        Materials depleted on this process.
+    rates : ReactionRates
+        Reaction rates returned by eval.
+    """
+
+    def __init__(self, settings, chain, n_materials, seed=1):
+        super().__init__(settings)
+
+        self.chain = chain
+        self.n_materials = n_materials
+
+        self.chain.nuc_to_react_ind = OrderedDict(
+            (nuc.name, i) for i, nuc in enumerate(
+                nuc for nuc in chain.nuclides if nuc.reactions))
+
+        bounds = np.linspace(0, n_materials, comm.size + 1).astype(int)
+        low = bounds[comm.rank]
+        high = bounds[comm.rank + 1]
+        self.burn_list = [str(i) for i in range(low, high)]
+
+        # Seed by rank, such that the materials of each process differ
+        rng = np.random.RandomState(seed + comm.rank)
+
+        self.rates = ReactionRates(
+            OrderedDict((mat, i) for i, mat in enumerate(self.burn_list)),
+            self.chain.nuc_to_react_ind, self.chain.react_to_ind,
+            self.chain.reaction_pairs())
+        self.rates.rates = 10.0 ** rng.uniform(-14.0, -9.0,
+                                               self.rates.rates.shape)
+
+        self._initial = np.zeros((len(self.burn_list), len(chain.nuclides)))
+        present = rng.rand(len(chain.nuclides)) < 0.5
+        self._initial[:, present] = 10.0 ** rng.uniform(
+            15.0, 24.0, (len(self.burn_list), np.count_nonzero(present)))
+
+    def initial_condition(self):
+        """ Returns random initial atoms.
+
+        Returns
+        -------
+        numpy.ndarray
+            Total atoms for initial conditions, indexed by material on this
+            process then by nuclide.
+        """
+
+        return self._initial.copy()
+
+    def eval(self, vec, print_out=True):
+        """ Returns the fixed reaction rates.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            Total atoms, ignored.
+        print_out : bool, optional
+            Ignored, as no transport is run.
+
+        Returns
+        -------
+        k : float
+            One.
+        rates : ReactionRates
+            Copy of the reaction rates.
+        seed : int
+            Zero.
+        """
+
+        rates = ReactionRates(self.rates.mat_to_ind, self.rates.nuc_to_ind,
+                              self.rates.react_to_ind, self.rates.pairs)
+        rates.rates = self.rates.rates.copy()
+
+        return 1.0, rates, 0
+
+    def form_matrix(self, y, mat):
+        """ Forms the depletion matrix.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            An array representing reaction rates for this cell.
+        mat : int
+            Material id.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Sparse matrix representing the depletion matrix.
+        """
+
+        return self.chain.form_matrix(y[mat, :, :])
+
+    def get_results_info(self):
+        """ Returns volume list, material lists, and nuc lists.
+
+        Returns
+        -------
+        volume : dict of str float
+            Volumes corresponding to materials in full_burn_dict
+        nuc_list : list of str
+            A list of all nuclide names. Used for sorting the simulation.
+        burn_list : list of int
+            A list of all material IDs to be burned.  Used for sorting the
+            simulation.
+        full_burn_dict : OrderedDict of str to int
+            Maps material name to index in global geometry.
+        """
+
+        volume = {str(i): 1.0 for i in range(self.n_materials)}
+        nuc_list = [nuc.name for nuc in self.chain.nuclides]
+        full_burn_dict = OrderedDict(
+            (str(i), i) for i in range(self.n_materials))
+
+        return volume, nuc_list, self.burn_list, full_burn_dict
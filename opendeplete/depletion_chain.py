@@ -11,6 +11,7 @@ import math
 import re
 import os
 
+import numpy as np
 from tqdm import tqdm
 import scipy.sparse as sp
 import openmc.data
@@ -25,7 +26,7 @@ except ImportError:
     from openmc.clean_xml import clean_xml_indentation
     _have_lxml = False
 
-from .nuclide import Nuclide, DecayTuple, ReactionTuple
+from .nuclide import Nuclide, DecayTuple, ReactionTuple, FissionYields
 
 
 # tuple of (reaction name, possible MT values, (dA, dZ)) where dA is the change
@@ -108,6 +109,68 @@ def replace_missing(product, decay_data):
     return product
 
 
+def _interp_weights(x, xp):
+    """ Returns linear interpolation weights from points xp to points x.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Points to interpolate to.
+    xp : numpy.ndarray
+        Increasing points tabulated.  Values are constant outside of them.
+
+    Returns
+    -------
+    numpy.ndarray
+        Weight of each tabulated point, indexed by x then by xp.
+    """
+
+    eye = np.eye(len(xp))
+    return np.column_stack([np.interp(x, xp, eye[k])
+                            for k in range(len(xp))]).reshape(len(x), len(xp))
+
+
+def _yield_table(nuc, energies):
+    """ Interpolates the fission yields of a nuclide to energies.
+
+    Parameters
+    ----------
+    nuc : Nuclide
+        The fissionable nuclide.
+    energies : numpy.ndarray
+        Energies to interpolate to, in eV.
+
+    Returns
+    -------
+    products : list of str
+        Every fission product, in the order of the lowest energy table,
+        followed by the products of higher energies only.
+    table : numpy.ndarray
+        Yield of each product, indexed by energy then by product.
+    """
+
+    nuc_energies = sorted(nuc.yield_data)
+
+    products = []
+    columns = {}
+    for energy in nuc_energies:
+        for product in nuc.yield_data[energy].products:
+            if product not in columns:
+                columns[product] = len(products)
+                products.append(product)
+
+    if not products:
+        return products, np.zeros((max(len(energies), 1), 0))
+
+    values = np.zeros((len(nuc_energies), len(products)))
+    for k, energy in enumerate(nuc_energies):
+        data = nuc.yield_data[energy]
+        np.add.at(values[k], [columns[p] for p in data.products],
+                  data.yields)
+
+    return products, np.dot(_interp_weights(energies, nuc_energies), values)
+
+
 class DepletionChain(object):
     """ The DepletionChain class.
 
@@ -125,6 +188,8 @@ class DepletionChain(object):
         Dictionary mapping a nuclide name to an index in ReactionRates.
     react_to_ind : OrderedDict of str to int
         Dictionary mapping a reaction name to an index in ReactionRates.
+    yield_energies : numpy.ndarray
+        Every energy at which fission yields are tabulated, sorted.
 
     """
 
@@ -134,6 +199,9 @@ class DepletionChain(object):
         self.nuc_to_react_ind = OrderedDict()
         self.react_to_ind = OrderedDict()
 
+        self._structure = None
+        self._structure_key = None
+
     @property
     def n_nuclides(self):
         """Number of nuclides in chain."""
@@ -264,7 +332,8 @@ class DepletionChain(object):
                         missing_fpy.append(parent)
 
             if parent in fpy_data:
-                fpy = fpy_data[parent]
+                # Yield tables are released once converted
+                fpy = fpy_data.pop(parent)
 
                 if fpy.energies is not None:
                     nuclide.yield_energies = fpy.energies
@@ -286,9 +355,9 @@ class DepletionChain(object):
                     if yield_replace > 0.0:
                         missing_fp.append((parent, E, yield_replace))
 
-                    nuclide.yield_data[E] = []
-                    for k in sorted(yields, key=_get_zai):
-                        nuclide.yield_data[E].append((k, yields[k]))
+                    products = sorted(yields, key=_get_zai)
+                    nuclide.yield_data[E] = FissionYields(
+                        products, [yields[k] for k in products])
 
         # Display warnings
         if missing_daughter:
@@ -377,13 +446,65 @@ class DepletionChain(object):
             clean_xml_indentation(root_elem, spaces_per_level=2)
             tree.write(filename, encoding='utf-8')
 
-    def form_matrix(self, rates):
+    @property
+    def yield_energies(self):
+        """Every energy at which fission yields are tabulated, sorted."""
+        energies = set()
+        for nuc in self.nuclides:
+            energies.update(nuc.yield_data)
+        return np.array(sorted(energies), dtype=float)
+
+    def yield_weights(self, energy):
+        """ Returns the weight of each tabulated yield energy.
+
+        Fission yields at an energy are linearly interpolated between the
+        tabulated energies, and are constant outside of them.
+
+        Parameters
+        ----------
+        energy : float or numpy.ndarray
+            Energy of the neutrons causing fission in eV, such as one per
+            material.
+
+        Returns
+        -------
+        numpy.ndarray
+            Weight of each entry of yield_energies, indexed by the entries of
+            energy then by yield energy, to pass to form_matrix.
+        """
+
+        energy = np.asarray(energy, dtype=float)
+        energies = self.yield_energies
+        if len(energies) == 0:
+            return np.ones(energy.shape + (1,))
+
+        weights = _interp_weights(energy.reshape(-1), energies)
+        return weights.reshape(energy.shape + (len(energies),))
+
+    def form_matrix(self, rates, yield_weights=None):
         """ Forms depletion matrix.
 
+        The sparsity structure of the matrix, with every nuclide name
+        resolved to an index, is built on the first call and reused as long
+        as nuclides, nuclide_dict, nuc_to_react_ind and react_to_ind hold
+        the same entries, whether they are replaced or modified in place.
+        Each call then only gathers the reaction rates and sums them into the
+        matrix.  Nuclide objects are read when the structure is built, so a
+        nuclide is changed by putting a new Nuclide in nuclides.
+
+        The structure holds the fission yields of every tabulated energy.
+        The yields of a material are their combination with yield_weights,
+        or the yields at the lowest energy, the thermal yields, by default.
+
         Parameters
         ----------
         rates : numpy.ndarray
-            2D array indexed by nuclide then by cell.
+            Reaction rates of a material, either indexed by the pairs of
+            reaction_pairs, as stored by ReactionRates, or 2D and indexed by
+            nuclide then by reaction.
+        yield_weights : numpy.ndarray, optional
+            Weight of each entry of yield_energies, as returned by
+            yield_weights.
 
         Returns
         -------
@@ -391,8 +512,99 @@ class DepletionChain(object):
             Sparse matrix representing depletion.
         """
 
-        matrix = defaultdict(float)
-        reactions = set()
+        (slots, decay_values, nuc_ind, react_ind, pair_ind, _, coeffs,
+         indices, indptr) = self._matrix_structure()
+
+        if yield_weights is None:
+            coeffs = coeffs[0]
+        else:
+            coeffs = np.dot(yield_weights, coeffs)
+
+        if np.ndim(rates) == 1:
+            term_rates = rates[pair_ind]
+        else:
+            term_rates = rates[nuc_ind, react_ind]
+
+        values = np.concatenate((decay_values, coeffs * term_rates))
+        data = np.bincount(slots, weights=values, minlength=len(indices))
+
+        return sp.csr_matrix((data, indices.copy(), indptr.copy()),
+                             shape=(self.n_nuclides, self.n_nuclides))
+
+    def reaction_pairs(self):
+        """ Returns the reaction rates used by the chain.
+
+        Only these can affect the depletion matrix, every other combination
+        of nuclide and reaction in a ReactionRates is structurally zero.
+
+        Returns
+        -------
+        numpy.ndarray of int
+            Index in nuc_to_react_ind and react_to_ind of each pair, sorted.
+            The array is shared by every call and must not be modified.
+        """
+
+        return self._matrix_structure()[5]
+
+    def _matrix_structure(self):
+        """ Returns the structure of the depletion matrix.
+
+        Each entry of the matrix is the sum of a decay term, and of reaction
+        rates times a coefficient, a branching ratio or a fission yield.  The
+        terms are listed in the order they are summed.
+
+        Returns
+        -------
+        slots : numpy.ndarray of int
+            Index in the CSR data of each term, decay terms first.
+        decay_values : numpy.ndarray
+            Value of each decay term.
+        nuc_ind : numpy.ndarray of int
+            Reaction rate nuclide index of each reaction term.
+        react_ind : numpy.ndarray of int
+            Reaction rate reaction index of each reaction term.
+        pair_ind : numpy.ndarray of int
+            Index in pairs of each reaction term.
+        pairs : numpy.ndarray of int
+            Sorted nuclide and reaction index pairs of the reaction terms.
+        coeffs : numpy.ndarray
+            Coefficient of each reaction term, indexed by yield energy then
+            by term.  Only the fission yields differ between energies.
+        indices : numpy.ndarray of int
+            CSR column indices.
+        indptr : numpy.ndarray of int
+            CSR row pointers.
+        """
+
+        # The structure is kept while the nuclides and index maps equal the
+        # copies it was built from, which also catches changes in place
+        key = (self.nuclides, self.nuclide_dict, self.nuc_to_react_ind,
+               self.react_to_ind)
+        if self._structure is not None and all(
+                current == cached
+                for current, cached in zip(key, self._structure_key)):
+            return self._structure
+
+        decay_rows = []
+        decay_cols = []
+        decay_values = []
+        rows = []
+        cols = []
+        nuc_ind = []
+        react_ind = []
+        coeffs = []
+
+        # Fission yield terms, with their coefficient at each yield energy
+        energies = self.yield_energies
+        yield_terms = []
+        yield_coeffs = []
+
+        def add(k, i, nuc_id, r_id, coeff):
+            rows.append(k)
+            cols.append(i)
+            nuc_ind.append(nuc_id)
+            react_ind.append(r_id)
+            coeffs.append(coeff)
 
         for i, nuc in enumerate(self.nuclides):
 
@@ -402,7 +614,9 @@ class DepletionChain(object):
                 decay_constant = math.log(2) / nuc.half_life
 
                 if decay_constant != 0.0:
-                    matrix[i, i] -= decay_constant
+                    decay_rows.append(i)
+                    decay_cols.append(i)
+                    decay_values.append(-decay_constant)
 
                 # Gain
                 for _, target, branching_ratio in nuc.decay_modes:
@@ -411,50 +625,64 @@ class DepletionChain(object):
                         branch_val = branching_ratio * decay_constant
 
                         if branch_val != 0.0:
-                            k = self.nuclide_dict[target]
-                            matrix[k, i] += branch_val
+                            decay_rows.append(self.nuclide_dict[target])
+                            decay_cols.append(i)
+                            decay_values.append(branch_val)
 
             if nuc.name in self.nuc_to_react_ind:
-                # Extract all reactions for this nuclide in this cell
-                nuc_ind = self.nuc_to_react_ind[nuc.name]
-                nuc_rates = rates[nuc_ind, :]
+                nuc_id = self.nuc_to_react_ind[nuc.name]
+
+                # Loss term -- make sure we only count loss once for
+                # reactions with branching ratios
+                reactions = set()
 
                 for r_type, target, _, br in nuc.reactions:
-                    # Extract reaction index, and then final reaction rate
                     r_id = self.react_to_ind[r_type]
-                    path_rate = nuc_rates[r_id]
 
-                    # Loss term -- make sure we only count loss once for
-                    # reactions with branching ratios
                     if r_type not in reactions:
                         reactions.add(r_type)
-                        if path_rate != 0.0:
-                            matrix[i, i] -= path_rate
+                        add(i, i, nuc_id, r_id, -1.0)
 
                     # Gain term; allow for total annihilation for debug purposes
                     if target != 'Nothing':
                         if r_type != 'fission':
-                            if path_rate != 0.0:
-                                k = self.nuclide_dict[target]
-                                matrix[k, i] += path_rate * br
+                            add(self.nuclide_dict[target], i, nuc_id, r_id, br)
                         else:
-                            # Assume that we should always use thermal fission
-                            # yields. At some point it would be nice to account
-                            # for the energy-dependence..
-                            energy, data = sorted(nuc.yield_data.items())[0]
-                            for product, y in data:
-                                yield_val = y * path_rate
-                                if yield_val != 0.0:
-                                    k = self.nuclide_dict[product]
-                                    matrix[k, i] += yield_val
-
-                # Clear set of reactions
-                reactions.clear()
-
-        # Use DOK matrix as intermediate representation, then convert to CSR and return
-        matrix_dok = sp.dok_matrix((self.n_nuclides, self.n_nuclides))
-        dict.update(matrix_dok, matrix)
-        return matrix_dok.tocsr()
+                            products, table = _yield_table(nuc, energies)
+                            for product, y in zip(products, table.T):
+                                yield_terms.append(len(coeffs))
+                                yield_coeffs.append(y)
+                                add(self.nuclide_dict[product], i, nuc_id,
+                                    r_id, y[0])
+
+        all_rows = np.array(decay_rows + rows, dtype=int)
+        all_cols = np.array(decay_cols + cols, dtype=int)
+
+        # Number the distinct entries in CSR order
+        n = self.n_nuclides
+        flat = all_rows * n + all_cols
+        entries, slots = np.unique(flat, return_inverse=True)
+        indices = entries % n
+        indptr = np.searchsorted(entries // n, np.arange(n + 1))
+
+        all_coeffs = np.tile(np.array(coeffs, dtype=float),
+                             (max(len(energies), 1), 1))
+        if yield_terms:
+            all_coeffs[:, yield_terms] = np.array(yield_coeffs).T
+
+        nuc_ind = np.array(nuc_ind, dtype=int)
+        react_ind = np.array(react_ind, dtype=int)
+        pairs, pair_ind = np.unique(np.column_stack((nuc_ind, react_ind)),
+                                    axis=0, return_inverse=True)
+
+        self._structure = (slots, np.array(decay_values, dtype=float),
+                           nuc_ind, react_ind, pair_ind.reshape(-1),
+                           pairs.reshape(-1, 2), all_coeffs, indices, indptr)
+        self._structure_key = (list(self.nuclides), dict(self.nuclide_dict),
+                               dict(self.nuc_to_react_ind),
+                               dict(self.react_to_ind))
+
+        return self._structure
 
     def nuc_by_ind(self, ind):
         """ Extracts nuclides from the list by dictionary key.
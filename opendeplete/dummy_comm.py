@@ -25,3 +25,9 @@ class DummyCommunicator(object):
 
     def scatter(self, sendobj, root=0):
         return sendobj[0]
+
+    def Free(self):
+        pass
+
+    def Split_type(self, split_type, key=0, info=None):
+        return self
@@ -0,0 +1,294 @@
+""" The fake capi module.
+
+Implements an in-memory stand-in for openmc.capi, such that OpenMCOperator
+can be exercised without a compiled OpenMC.  No transport is run: tallies
+return synthetic results of the correct shape, proportional to the densities
+set on each material.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+
+
+class FakeCapi(object):
+    """ Stand-in for the openmc.capi module.
+
+    Provides the subset of openmc.capi used by OpenMCOperator: materials,
+    material filters, tallies, settings, keff and the init, reset, run and
+    finalize calls.  Pass an instance as the capi argument of OpenMCOperator.
+
+    The tally result of a nuclide and score in a material is the density of
+    the nuclide in the material times a pseudo cross section.  The cross
+    section only depends on the nuclide, the score and seed, so results do not
+    depend on the order of nuclides or on the number of processes.
+
+    Parameters
+    ----------
+    keff : float, optional
+        Eigenvalue returned by keff.
+    seed : int, optional
+        Seed of the pseudo cross sections.
+
+    Attributes
+    ----------
+    materials : dict of int to FakeMaterial
+        Materials by ID.  Read from materials.xml by init, and created on
+        first access otherwise.
+    tallies : dict of int to FakeTally
+        Tallies by ID.
+    settings : FakeSettings
+        Run settings.
+    seed : int
+        Seed of the pseudo cross sections.
+    n_runs : int
+        Number of calls to run.
+    """
+
+    def __init__(self, keff=1.0, seed=1):
+        self.materials = _MaterialDict()
+        self.tallies = {}
+        self.settings = FakeSettings()
+        self.seed = seed
+        self.n_runs = 0
+        self._keff = keff
+        self._xs = {}
+
+    def init(self, intracomm=None):
+        """ Loads the materials in materials.xml, if present.
+
+        Parameters
+        ----------
+        intracomm : mpi4py.MPI.Intracomm, optional
+            Communicator, ignored.
+        """
+
+        if os.path.exists("materials.xml"):
+            root = ET.parse("materials.xml").getroot()
+            for node in root.findall("material"):
+                mat_id = int(node.get("id"))
+                self.materials[mat_id] = FakeMaterial(mat_id)
+
+    def finalize(self):
+        """ Frees the materials and tallies. """
+
+        self.materials.clear()
+        self.tallies.clear()
+
+    def reset(self):
+        """ Resets the tally results. """
+
+        for tally in self.tallies.values():
+            tally.results = None
+
+    def run(self):
+        """ Computes synthetic results for every tally. """
+
+        for tally in self.tallies.values():
+            tally.results = self._tally_results(tally)
+
+        self.n_runs += 1
+
+    def keff(self):
+        """ Returns the eigenvalue.
+
+        Returns
+        -------
+        tuple of float
+            Mean and standard deviation of the eigenvalue.
+        """
+
+        return self._keff, 0.0
+
+    def MaterialFilter(self, bins, uid=None):
+        """ Creates a material filter.
+
+        Parameters
+        ----------
+        bins : list of FakeMaterial
+            Materials of the filter.
+        uid : int, optional
+            Filter ID.
+
+        Returns
+        -------
+        FakeMaterialFilter
+            The filter.
+        """
+
+        return FakeMaterialFilter(bins, uid)
+
+    def Tally(self, uid):
+        """ Creates or returns a tally.
+
+        Parameters
+        ----------
+        uid : int
+            Tally ID.
+
+        Returns
+        -------
+        FakeTally
+            The tally with this ID.
+        """
+
+        if uid not in self.tallies:
+            self.tallies[uid] = FakeTally(uid)
+
+        return self.tallies[uid]
+
+    def _cross_section(self, nuclide, score):
+        """ Returns the pseudo cross section of a nuclide and score. """
+
+        key = (nuclide, score)
+        if key not in self._xs:
+            name = "{} {}".format(nuclide, score).encode()
+            rng = np.random.RandomState(
+                (zlib.crc32(name) + self.seed) % 2**32)
+            self._xs[key] = 10.0 ** rng.uniform(-2.0, 1.0)
+
+        return self._xs[key]
+
+    def _tally_results(self, tally):
+        """ Computes the results array of a tally.
+
+        Returns
+        -------
+        numpy.ndarray
+            Results indexed by filter bin, then by nuclide and score with
+            scores varying fastest, then by value, sum and sum of squares.
+        """
+
+        materials = []
+        for tally_filter in tally.filters:
+            materials.extend(tally_filter.bins)
+
+        scores = list(tally.scores)
+        xs = np.array([[self._cross_section(nuc, score) for score in scores]
+                       for nuc in tally.nuclides]).reshape(-1, len(scores))
+
+        results = np.zeros((len(materials), xs.size, 3))
+        for i, mat in enumerate(materials):
+            density = np.array([mat.densities.get(nuc, 0.0)
+                                for nuc in tally.nuclides])
+            results[i, :, 1] = (density[:, np.newaxis] * xs).ravel()
+
+        results[:, :, 0] = results[:, :, 1]
+        results[:, :, 2] = results[:, :, 1]**2
+
+        return results
+
+
+class FakeSettings(object):
+    """ Stand-in for openmc.capi.settings.
+
+    Attributes
+    ----------
+    particles : int
+        Number of particles per generation.
+    """
+
+    def __init__(self):
+        self.particles = None
+
+
+class FakeMaterial(object):
+    """ Stand-in for openmc.capi.Material.
+
+    Parameters
+    ----------
+    uid : int
+        Material ID.
+
+    Attributes
+    ----------
+    id : int
+        Material ID.
+    densities : dict of str to float
+        Atom density of each nuclide in atom/b-cm.
+    """
+
+    def __init__(self, uid):
+        self.id = uid
+        self.densities = {}
+
+    @property
+    def nuclides(self):
+        """ Nuclides in the material. """
+        return list(self.densities)
+
+    def set_densities(self, nuclides, densities):
+        """ Sets the atom densities of the material.
+
+        Parameters
+        ----------
+        nuclides : list of str
+            Nuclide names.
+        densities : iterable of float
+            Atom densities in atom/b-cm.
+        """
+
+        self.densities = dict(zip(nuclides, densities))
+
+
+class FakeMaterialFilter(object):
+    """ Stand-in for openmc.capi.MaterialFilter.
+
+    Parameters
+    ----------
+    bins : list of FakeMaterial
+        Materials of the filter.
+    uid : int, optional
+        Filter ID.
+
+    Attributes
+    ----------
+    id : int
+        Filter ID.
+    bins : list of FakeMaterial
+        Materials of the filter.
+    """
+
+    def __init__(self, bins, uid=None):
+        self.id = uid
+        self.bins = list(bins)
+
+
+class FakeTally(object):
+    """ Stand-in for openmc.capi.Tally.
+
+    Parameters
+    ----------
+    uid : int
+        Tally ID.
+
+    Attributes
+    ----------
+    id : int
+        Tally ID.
+    filters : list of FakeMaterialFilter
+        Filters of the tally.
+    nuclides : list of str
+        Nuclides of the tally.
+    scores : list of str
+        Scores of the tally.
+    results : numpy.ndarray
+        Results of the last run, None before it.
+    """
+
+    def __init__(self, uid):
+        self.id = uid
+        self.filters = []
+        self.nuclides = []
+        self.scores = []
+        self.results = None
+
+
+class _MaterialDict(dict):
+    """ Dictionary of materials that creates missing ones on access. """
+
+    def __missing__(self, uid):
+        self[uid] = FakeMaterial(uid)
+        return self[uid]
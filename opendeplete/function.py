@@ -17,6 +17,43 @@ class Settings(object):
         Array of time steps to take.
     output_dir : str
         Path to output directory to save results.
+    output_compression : str
+        Filter for the number and reaction rate datasets of results.h5, None
+        (default), "gzip" or "lzf".
+    output_compression_opts : int
+        Compression level for "gzip".
+    output_shuffle : bool
+        Whether or not to apply the shuffle filter before compression.
+    output_rates_dtype : str
+        Storage type of reaction rates in results.h5, "float64" (default) or
+        "float32".
+    output_nuclides : list of str
+        Nuclides stored in results.h5.  All burnable nuclides are stored if
+        None (default).
+    output_materials : list of str
+        Material IDs stored in results.h5.  All burnable materials are stored
+        if None (default).
+    output_rates : str
+        Reaction rates stored in results.h5, "all" stages (default), only the
+        beginning of step ("bos") or "none".
+    output_swmr : bool
+        Whether to write results.h5 in HDF5 single-writer/multiple-reader
+        mode, so that it can be followed with results.tail_results while
+        running.  Not supported with parallel HDF5.
+    solver : str
+        Matrix exponential solver, "cram48" (default) or "cram16".
+    substeps : int
+        Number of constant-power depletion substeps per integrator
+        exponential.  No transport is performed between substeps.
+    backend : str
+        Execution backend for the per-material depletion on each rank, either
+        "process" (default) for a multiprocessing.Pool, "thread" for a
+        concurrent.futures.ThreadPoolExecutor, or "serial" for pure MPI
+        depletion without workers.  Threads share the chain and reaction
+        rates by reference instead of pickling them.
+    n_workers : int
+        Number of processes or threads used for depletion on each rank.
+        Defaults to the cores of the node divided by the ranks on the node.
     """
 
     def __init__(self):
@@ -24,6 +61,24 @@ class Settings(object):
         self.dt_vec = None
         self.output_dir = None
 
+        # Output specific
+        self.output_compression = None
+        self.output_compression_opts = None
+        self.output_shuffle = False
+        self.output_rates_dtype = 'float64'
+        self.output_nuclides = None
+        self.output_materials = None
+        self.output_rates = "all"
+        self.output_swmr = False
+
+        # Depletion solver specific
+        self.solver = "cram48"
+        self.substeps = 1
+
+        # Depletion execution specific
+        self.backend = "process"
+        self.n_workers = None
+
 class Operator(metaclass=ABCMeta):
     """ The Operator metaclass.
 
@@ -44,8 +99,9 @@ class Operator(metaclass=ABCMeta):
 
         Returns
         -------
-        list of numpy.array
-            Total density for initial conditions.
+        numpy.ndarray
+            Total atoms for initial conditions, indexed by burnable material
+            then by burnable nuclide.
         """
 
         pass
@@ -56,8 +112,9 @@ class Operator(metaclass=ABCMeta):
 
         Parameters
         ----------
-        vec : list of numpy.array
-            Total atoms to be used in function.
+        vec : numpy.ndarray
+            Total atoms to be used in function, indexed by burnable material
+            then by burnable nuclide.
         print_out : bool, optional
             Whether or not to print out time.
 
@@ -66,13 +123,30 @@ class Operator(metaclass=ABCMeta):
         k : float
             Eigenvalue of the problem.
         rates : ReactionRates
-            Reaction rates from this simulation.
+            Reaction rates from this simulation.  Operators may reuse the
+            returned object in a later call, see reserve_rates.
         seed : int
             Seed for this simulation.
         """
 
         pass
 
+    def reserve_rates(self, n_rates):
+        """ Declares how many rates returned by eval are held at once.
+
+        An operator that reuses its reaction rate buffers must not overwrite
+        the rates returned by one of the last n_rates calls to eval.
+        Integrators call this before their first eval.  Operators returning
+        a new object from every eval need not do anything.
+
+        Parameters
+        ----------
+        n_rates : int
+            Number of rates held at once.
+        """
+
+        pass
+
     @abstractmethod
     def get_results_info(self):
         """ Returns volume list, cell lists, and nuc lists.
@@ -0,0 +1,125 @@
+""" The indexing module.
+
+Translates names to integer indices for the containers indexed by material,
+nuclide and reaction names.  Lists and arrays of names are looked up as a
+whole through cached sorted arrays, and several lists index the outer
+product of their axes.
+"""
+
+import numpy as np
+
+
+def name_index(key, to_ind, cache):
+    """ Translates an index that may contain names into integer indices.
+
+    Parameters
+    ----------
+    key : str, int, slice, or list or numpy.ndarray of str or int
+        The index.  Names are looked up in to_ind, anything else is returned
+        unchanged.
+    to_ind : dict of str to int
+        Maps a name to its index.
+    cache : dict
+        Storage for the sorted lookup arrays, owned by the caller.  The
+        arrays of to_ind are rebuilt whenever it changes size.
+
+    Returns
+    -------
+    int, slice or numpy.ndarray
+        The index with every name replaced by its integer index.
+
+    Raises
+    ------
+    KeyError
+        If a name is not in to_ind.
+    """
+
+    if isinstance(key, str):
+        return to_ind[key]
+
+    if not isinstance(key, (list, tuple, np.ndarray)):
+        return key
+
+    key = np.asarray(key)
+    if key.size == 0:
+        return np.zeros(key.shape, dtype=int)
+    if key.dtype.kind not in "USO":
+        return key
+
+    key = key.astype(str)
+
+    entry = cache.get(id(to_ind))
+    if entry is None or entry[0] is not to_ind or entry[1] != len(to_ind):
+        names = np.array(list(to_ind), dtype=str)
+        order = np.argsort(names)
+        indices = np.fromiter(to_ind.values(), dtype=int, count=len(to_ind))
+
+        # Holding to_ind keeps its id from being reused
+        entry = (to_ind, len(to_ind), names[order], indices[order])
+        cache[id(to_ind)] = entry
+
+    _, _, names, indices = entry
+    if len(names) == 0:
+        raise KeyError(key.flat[0])
+
+    pos = np.minimum(np.searchsorted(names, key), len(names) - 1)
+    found = names[pos] == key
+    if not np.all(found):
+        raise KeyError(key[~found].flat[0])
+
+    return indices[pos]
+
+
+def outer_index(pos, shape):
+    """ Makes several array indices select the outer product of their axes.
+
+    NumPy pairs the entries of array indices on different axes, and moves
+    their axis first when they are separated by a slice.  When an array is
+    combined with another array or an integer, slices are expanded and the
+    arrays are broadcast against each other instead, so that a list of
+    materials and a list of nuclides select every nuclide in every material,
+    and axes keep their order.
+
+    Parameters
+    ----------
+    pos : tuple
+        Index with one entry per axis, already translated to integers.
+    shape : tuple of int
+        Shape of the indexed array.
+
+    Returns
+    -------
+    tuple
+        Index for the array.
+    """
+
+    is_array = [np.ndim(key) > 0 for key in pos]
+    n_ints = sum(isinstance(key, (int, np.integer)) for key in pos)
+    if not any(is_array) or sum(is_array) + n_ints < 2:
+        return pos
+
+    axes = []
+    for key, array, size in zip(pos, is_array, shape):
+        if isinstance(key, slice):
+            axes.append(np.arange(size)[key])
+        elif array:
+            key = np.asarray(key)
+            if key.dtype == bool:
+                key = np.flatnonzero(key)
+            axes.append(key)
+        else:
+            axes.append(None)
+
+    n_dims = sum(axis is not None for axis in axes)
+    index = []
+    dim = 0
+    for key, axis in zip(pos, axes):
+        if axis is None:
+            index.append(key)
+        else:
+            view = [1] * n_dims
+            view[dim] = -1
+            index.append(axis.reshape(view))
+            dim += 1
+
+    return tuple(index) + tuple(pos[len(axes):])
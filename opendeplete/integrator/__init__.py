@@ -7,5 +7,8 @@ The integrator subcomponents.
 
 from .cecm import *
 from .cram import *
+from .deplete import *
 from .predictor import *
 from .save_results import *
+from .sie import *
+from .tta import *
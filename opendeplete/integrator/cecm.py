@@ -1,14 +1,11 @@
 """ The CE/CM integrator."""
 
-import copy
-from itertools import repeat
 import os
-from multiprocessing import Pool
-import time
 
-from .. import comm
-from .cram import CRAM48, cram_wrapper
-from .save_results import save_results
+import numpy as np
+
+from .deplete import deplete
+from .save_results import results_writer, save_results
 
 
 def cecm(operator, print_out=True):
@@ -51,83 +48,59 @@ def cecm(operator, print_out=True):
     # Generate initial conditions
     vec = operator.initial_condition()
 
-    n_mats = len(vec)
+    # Rates of every stage are held until the step is saved
+    operator.reserve_rates(2)
 
-    t = 0.0
+    # Preallocate stage and result buffers, reused every step
+    x = np.empty((2,) + vec.shape)
+    x_result = np.empty(vec.shape)
+    x[0] = vec
 
-    for i, dt in enumerate(operator.settings.dt_vec):
-        # Create vectors
-        x = [copy.deepcopy(vec)]
-        seeds = []
-        eigvls = []
-        rates_array = []
+    with results_writer(operator) as writer:
+        t = 0.0
 
-        eigvl, rates, seed = operator.eval(x[0])
+        for i, dt in enumerate(operator.settings.dt_vec):
+            # Create vectors
+            seeds = []
+            eigvls = []
+            rates_array = []
 
-        eigvls.append(eigvl)
-        seeds.append(seed)
-        rates_array.append(rates)
+            eigvl, rates, seed = operator.eval(x[0])
+
+            eigvls.append(eigvl)
+            seeds.append(seed)
+            rates_array.append(rates)
 
-        t_start = time.time()
+            deplete(operator, x[0], rates_array[0], dt/2, print_out, out=x[1])
 
-        chains = repeat(operator.chain, n_mats)
-        vecs = (x[0][i] for i in range(n_mats))
-        rates = (rates_array[0][i, :, :] for i in range(n_mats))
-        dts = repeat(dt/2, n_mats)
+            eigvl, rates, seed = operator.eval(x[1])
 
-        with Pool() as pool:
-            iters = zip(chains, vecs, rates, dts)
-            x_result = list(pool.starmap(cram_wrapper, iters))
+            eigvls.append(eigvl)
+            seeds.append(seed)
+            rates_array.append(rates)
 
-        t_end = time.time()
-        if comm.rank == 0:
-            if print_out:
-                print("Time to matexp: ", t_end - t_start)
+            deplete(operator, x[0], rates_array[1], dt, print_out, out=x_result)
 
-        x.append(x_result)
+            # Create results, write to disk
+            save_results(operator, x, rates_array, eigvls, seeds, [t, t + dt],
+                         i, writer)
 
-        eigvl, rates, seed = operator.eval(x[1])
+            t += dt
+            x[0] = x_result
+
+        # Perform one last simulation
+        seeds = []
+        eigvls = []
+        rates_array = []
+        eigvl, rates, seed = operator.eval(x[0])
 
         eigvls.append(eigvl)
         seeds.append(seed)
         rates_array.append(rates)
 
-        t_start = time.time()
-
-        chains = repeat(operator.chain, n_mats)
-        vecs = (x[0][i] for i in range(n_mats))
-        rates = (rates_array[1][i, :, :] for i in range(n_mats))
-        dts = repeat(dt, n_mats)
-
-        with Pool() as pool:
-            iters = zip(chains, vecs, rates, dts)
-            x_result = list(pool.starmap(cram_wrapper, iters))
-
-        t_end = time.time()
-        if comm.rank == 0:
-            if print_out:
-                print("Time to matexp: ", t_end - t_start)
-
         # Create results, write to disk
-        save_results(operator, x, rates_array, eigvls, seeds, [t, t + dt], i)
-
-        t += dt
-        vec = copy.deepcopy(x_result)
-
-    # Perform one last simulation
-    x = [copy.deepcopy(vec)]
-    seeds = []
-    eigvls = []
-    rates_array = []
-    eigvl, rates, seed = operator.eval(x[0])
-
-    eigvls.append(eigvl)
-    seeds.append(seed)
-    rates_array.append(rates)
-
-    # Create results, write to disk
-    save_results(operator, x, rates_array, eigvls, seeds, [t, t],
-                 len(operator.settings.dt_vec))
+        save_results(operator, x[:1], rates_array, eigvls, seeds, [t, t],
+                     len(operator.settings.dt_vec), writer)
 
     # Return to origin
     os.chdir(dir_home)
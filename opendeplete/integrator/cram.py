@@ -8,7 +8,7 @@ import scipy.sparse as sp
 import scipy.sparse.linalg as sla
 
 
-def cram_wrapper(chain, n0, rates, dt):
+def cram_wrapper(chain, n0, rates, dt, yield_weights=None):
     """Wraps depletion matrix creation / CRAM solve for multiprocess execution
 
     Parameters
@@ -18,19 +18,48 @@ def cram_wrapper(chain, n0, rates, dt):
     n0 : numpy.array
         Vector to operate a matrix exponent on.
     rates : numpy.ndarray
-        2D array indexed by nuclide then by cell.
+        Reaction rates of the material, as taken by chain.form_matrix.
     dt : float
         Time to integrate to.
+    yield_weights : numpy.ndarray, optional
+        Weight of each fission yield energy of the chain.  Thermal yields
+        are used if not given.
 
     Returns
     -------
     numpy.array
         Results of the matrix exponent.
     """
-    A = chain.form_matrix(rates)
+    A = chain.form_matrix(rates, yield_weights)
     return CRAM48(A, n0, dt)
 
 
+def cram16_wrapper(chain, n0, rates, dt, yield_weights=None):
+    """Wraps depletion matrix creation / CRAM16 solve for multiprocess execution
+
+    Parameters
+    ----------
+    chain : DepletionChain
+        Depletion chain used to construct the burnup matrix
+    n0 : numpy.array
+        Vector to operate a matrix exponent on.
+    rates : numpy.ndarray
+        Reaction rates of the material, as taken by chain.form_matrix.
+    dt : float
+        Time to integrate to.
+    yield_weights : numpy.ndarray, optional
+        Weight of each fission yield energy of the chain.  Thermal yields
+        are used if not given.
+
+    Returns
+    -------
+    numpy.array
+        Results of the matrix exponent.
+    """
+    A = chain.form_matrix(rates, yield_weights)
+    return CRAM16(A, n0, dt)
+
+
 def CRAM16(A, n0, dt):
     """ Chebyshev Rational Approximation Method, order 16
 
@@ -0,0 +1,340 @@
+""" Depletion step shared by all integrators.
+
+Applies the selected matrix exponential solver to every burnable material.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from multiprocessing import Pool
+import os
+import time
+
+import numpy as np
+
+from .. import comm, have_mpi
+from .cram import cram_wrapper, cram16_wrapper
+
+
+def get_solver(settings):
+    """ Returns the per-material solver selected in settings.
+
+    Parameters
+    ----------
+    settings : Settings
+        Settings object.
+
+    Returns
+    -------
+    function
+        Function with the cram_wrapper calling convention.
+    """
+
+    if settings.solver == "cram48":
+        return cram_wrapper
+    elif settings.solver == "cram16":
+        return cram16_wrapper
+
+    raise ValueError('Unknown depletion solver "{}"'.format(settings.solver))
+
+
+@lru_cache(maxsize=None)
+def ranks_per_node():
+    """ Returns the number of MPI ranks sharing this node.
+
+    The first call is collective, as it splits a node-local communicator.
+
+    Returns
+    -------
+    int
+        Number of ranks on this node.
+    """
+
+    if not have_mpi:
+        return 1
+
+    from mpi4py import MPI
+
+    node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+    size = node_comm.size
+    node_comm.Free()
+
+    return size
+
+
+def default_workers():
+    """ Returns the number of depletion workers for this rank.
+
+    If the process is bound to fewer cores than the node has, the launcher
+    has already given this rank its share, and every bound core is used.
+    Otherwise the cores of the node are divided evenly between the ranks on
+    it, so that ranks do not oversubscribe it.
+
+    The call is collective, whatever the binding of each rank.
+
+    Returns
+    -------
+    int
+        Number of workers, at least one.
+    """
+
+    # Every rank takes part in the split, as binding may differ by rank
+    n_ranks = ranks_per_node()
+    n_cores = os.cpu_count() or 1
+
+    if hasattr(os, "sched_getaffinity"):
+        n_bound = len(os.sched_getaffinity(0))
+        if n_bound < n_cores:
+            return n_bound
+
+    return max(1, n_cores // n_ranks)
+
+
+def get_pool(settings):
+    """ Returns the execution backend selected in settings.
+
+    Parameters
+    ----------
+    settings : Settings
+        Settings object.
+
+    Returns
+    -------
+    multiprocessing.Pool or concurrent.futures.ThreadPoolExecutor
+        Pool to distribute materials over.  A serial pool running in this
+        process is returned for the "serial" backend, or if only one worker
+        is requested.
+    """
+
+    if settings.backend not in ("process", "thread", "serial"):
+        raise ValueError(
+            'Unknown depletion backend "{}"'.format(settings.backend))
+
+    if settings.backend == "serial":
+        return _SerialPool()
+
+    n_workers = settings.n_workers
+    if n_workers is None:
+        n_workers = default_workers()
+
+    if n_workers == 1:
+        return _SerialPool()
+    elif settings.backend == "process":
+        return Pool(n_workers)
+    else:
+        return ThreadPoolExecutor(n_workers)
+
+
+def deplete(operator, x, rates, dt, print_out=True, out=None):
+    """ Depletes all burnable materials over a single time step.
+
+    If settings.substeps is greater than one, the step is split into that many
+    depletion substeps.  No transport is performed between substeps; instead,
+    the reaction rates are scaled at the start of each substep such that the
+    fission power matches that at the start of the step.
+
+    If rates has a fission_energy, the fission yields of each material are
+    interpolated to its energy.  The weights of the yield energies are
+    computed once and shared by every substep.
+
+    Parameters
+    ----------
+    operator : Operator
+        The operator object to simulate on.
+    x : numpy.ndarray
+        Total atoms at the beginning of the step, indexed by material then by
+        nuclide.
+    rates : ReactionRates
+        Reaction rates at the beginning of the step.
+    dt : float
+        Time to integrate to.
+    print_out : bool, optional
+        Whether or not to print out time.
+    out : numpy.ndarray, optional
+        Array to store the result in.  Must not be x.  Allocated if not given.
+
+    Returns
+    -------
+    numpy.ndarray
+        Total atoms at the end of the step, indexed by material then by
+        nuclide.
+    """
+
+    if out is None:
+        out = np.empty_like(x)
+
+    n_substeps = operator.settings.substeps
+    solver = get_solver(operator.settings)
+
+    yield_weights = None
+    fission_energy = getattr(rates, "fission_energy", None)
+    if fission_energy is not None:
+        yield_weights = operator.chain.yield_weights(fission_energy)
+
+    mat_rates = _material_rates(operator.chain, rates)
+
+    t_start = time.time()
+
+    with get_pool(operator.settings) as pool:
+        if n_substeps == 1:
+            _solve(pool, solver, operator.chain, x, mat_rates, dt, out,
+                   yield_weights)
+        else:
+            power = fission_power(operator.chain, x, rates)
+
+            x_sub = x
+            for j in range(n_substeps):
+                scale = 1.0
+                if j > 0 and power != 0.0:
+                    scale = power / fission_power(operator.chain, out, rates)
+
+                _solve(pool, solver, operator.chain, x_sub,
+                       mat_rates * scale, dt / n_substeps, out,
+                       yield_weights)
+                x_sub = out
+
+    t_end = time.time()
+    if comm.rank == 0:
+        if print_out:
+            print("Time to matexp: ", t_end - t_start)
+
+    return out
+
+
+def fission_power(chain, x, rates):
+    """ Computes the fission power summed over all burnable materials.
+
+    Parameters
+    ----------
+    chain : DepletionChain
+        Depletion chain supplying the fission Q values.
+    x : numpy.ndarray
+        Total atoms, indexed by material then by nuclide.
+    rates : ReactionRates
+        Reaction rates per atom.
+
+    Returns
+    -------
+    float
+        Fission power in eV/s, reduced across all processes.
+    """
+
+    number_ind = []
+    rate_ind = []
+    fission_Q = []
+
+    for nuc in chain.nuclides:
+        if nuc.name in chain.nuc_to_react_ind:
+            for rx in nuc.reactions:
+                if rx.type == 'fission':
+                    number_ind.append(chain.nuclide_dict[nuc.name])
+                    rate_ind.append(chain.nuc_to_react_ind[nuc.name])
+                    fission_Q.append(rx.Q)
+                    break
+
+    power = 0.0
+
+    if number_ind:
+        fission_ind = rates.react_to_ind["fission"]
+        fission_rates = rates[:, rate_ind, fission_ind]
+        power = np.sum(np.dot(fission_rates * x[:, number_ind], fission_Q))
+
+    return comm.allreduce(power)
+
+
+def _material_rates(chain, rates):
+    """ Returns the reaction rates of each material as form_matrix takes them.
+
+    The stored rates of the chain's pairs are passed on as they are, without
+    expanding them to every nuclide and reaction.
+
+    Parameters
+    ----------
+    chain : DepletionChain
+        Depletion chain used to construct the burnup matrix.
+    rates : ReactionRates or numpy.ndarray
+        Reaction rates indexed by material, nuclide, then reaction.
+
+    Returns
+    -------
+    numpy.ndarray
+        Reaction rates indexed by material, then either by pair of the chain
+        or by nuclide and reaction.
+    """
+
+    pairs = getattr(rates, "pairs", None)
+    if pairs is not None and hasattr(chain, "reaction_pairs") and \
+            np.array_equal(pairs, chain.reaction_pairs()):
+        return rates.rates
+
+    return rates[:, :, :]
+
+
+def _solve(pool, solver, chain, x, rates, dt, out, yield_weights=None):
+    """ Applies solver to every material using a pool.
+
+    A process pool pickles the chain and rates for every material, while
+    thread and serial pools share them by reference and write directly into
+    out.
+
+    Parameters
+    ----------
+    pool : multiprocessing.Pool, concurrent.futures.ThreadPoolExecutor or _SerialPool
+        Pool to distribute materials over.
+    solver : function
+        Function with the cram_wrapper calling convention.
+    chain : DepletionChain
+        Depletion chain used to construct the burnup matrix.
+    x : numpy.ndarray
+        Total atoms, indexed by material then by nuclide.
+    rates : numpy.ndarray
+        Reaction rates indexed by material, as returned by _material_rates.
+    dt : float
+        Time to integrate to.
+    out : numpy.ndarray
+        Array to store the results of the matrix exponent in.
+    yield_weights : numpy.ndarray, optional
+        Weight of each fission yield energy, indexed by material then by
+        energy.  Thermal yields are used if not given.
+    """
+
+    n_mats = len(x)
+
+    if yield_weights is None:
+        yield_weights = repeat(None, n_mats)
+
+    if isinstance(pool, (ThreadPoolExecutor, _SerialPool)):
+        def solve_mat(i, weights):
+            out[i] = solver(chain, x[i], rates[i], dt, weights)
+
+        # Consume the iterator so that exceptions are raised here
+        for _ in pool.map(solve_mat, range(n_mats), yield_weights):
+            pass
+        return
+
+    chains = repeat(chain, n_mats)
+    vecs = (x[i] for i in range(n_mats))
+    mat_rates = (rates[i] for i in range(n_mats))
+    dts = repeat(dt, n_mats)
+
+    iters = zip(chains, vecs, mat_rates, dts, yield_weights)
+    for i, result in enumerate(pool.starmap(solver, iters)):
+        out[i] = result
+
+
+class _SerialPool(object):
+    """ Runs every material in the calling process.
+
+    Used for pure MPI depletion, where each rank solves its own materials
+    without spawning workers.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def map(self, func, *iterables):
+        """ Applies func to every element of the iterables. """
+        return map(func, *iterables)
@@ -1,14 +1,11 @@
 """ The Predictor algorithm."""
 
-import copy
-from itertools import repeat
 import os
-from multiprocessing import Pool
-import time
 
-from .. import comm
-from .cram import CRAM48, cram_wrapper
-from .save_results import save_results
+import numpy as np
+
+from .deplete import deplete
+from .save_results import results_writer, save_results
 
 
 def predictor(operator, print_out=True):
@@ -42,17 +39,42 @@ def predictor(operator, print_out=True):
     # Generate initial conditions
     vec = operator.initial_condition()
 
-    n_mats = len(vec)
+    # Rates of every stage are held until the step is saved
+    operator.reserve_rates(1)
+
+    # Preallocate stage and result buffers, reused every step
+    x = np.empty((1,) + vec.shape)
+    x_result = np.empty(vec.shape)
+    x[0] = vec
+
+    with results_writer(operator) as writer:
+        t = 0.0
+
+        for i, dt in enumerate(operator.settings.dt_vec):
+            # Create vectors
+            seeds = []
+            eigvls = []
+            rates_array = []
+
+            eigvl, rates, seed = operator.eval(x[0])
 
-    t = 0.0
+            eigvls.append(eigvl)
+            seeds.append(seed)
+            rates_array.append(rates)
 
-    for i, dt in enumerate(operator.settings.dt_vec):
-        # Create vectors
-        x = [copy.deepcopy(vec)]
+            # Create results, write to disk
+            save_results(operator, x, rates_array, eigvls, seeds, [t, t + dt],
+                         i, writer)
+
+            deplete(operator, x[0], rates_array[0], dt, print_out, out=x_result)
+
+            t += dt
+            x[0] = x_result
+
+        # Perform one last simulation
         seeds = []
         eigvls = []
         rates_array = []
-
         eigvl, rates, seed = operator.eval(x[0])
 
         eigvls.append(eigvl)
@@ -60,41 +82,8 @@ def predictor(operator, print_out=True):
         rates_array.append(rates)
 
         # Create results, write to disk
-        save_results(operator, x, rates_array, eigvls, seeds, [t, t + dt], i)
-
-        t_start = time.time()
-
-        chains = repeat(operator.chain, n_mats)
-        vecs = (x[0][i] for i in range(n_mats))
-        rates = (rates_array[0][i, :, :] for i in range(n_mats))
-        dts = repeat(dt, n_mats)
-
-        with Pool() as pool:
-            iters = zip(chains, vecs, rates, dts)
-            x_result = list(pool.starmap(cram_wrapper, iters))
-
-        t_end = time.time()
-        if comm.rank == 0:
-            if print_out:
-                print("Time to matexp: ", t_end - t_start)
-
-        t += dt
-        vec = copy.deepcopy(x_result)
-
-    # Perform one last simulation
-    x = [copy.deepcopy(vec)]
-    seeds = []
-    eigvls = []
-    rates_array = []
-    eigvl, rates, seed = operator.eval(x[0])
-
-    eigvls.append(eigvl)
-    seeds.append(seed)
-    rates_array.append(rates)
-
-    # Create results, write to disk
-    save_results(operator, x, rates_array, eigvls, seeds, [t, t],
-                 len(operator.settings.dt_vec))
+        save_results(operator, x, rates_array, eigvls, seeds, [t, t],
+                     len(operator.settings.dt_vec), writer)
 
     # Return to origin
     os.chdir(dir_home)
@@ -1,17 +1,47 @@
 """ Generic result saving code for integrators.
 
 """
-from opendeplete.results import Results, write_results
+from opendeplete.results import Results, ResultsWriter, write_results
 
-def save_results(op, x, rates, eigvls, seeds, t, step_ind):
+
+def results_writer(op):
+    """ Creates the writer for "results.h5" used over an entire run.
+
+    Parameters
+    ----------
+    op : Function
+        The operator whose settings give the number of steps and the storage
+        options.
+
+    Returns
+    -------
+    ResultsWriter
+        Unopened writer, to be used as a context manager.
+    """
+
+    settings = op.settings
+    n_steps = len(settings.dt_vec) + 1
+
+    return ResultsWriter("results.h5", n_steps,
+                         nuclides=settings.output_nuclides,
+                         materials=settings.output_materials,
+                         rates=settings.output_rates,
+                         swmr=settings.output_swmr,
+                         compression=settings.output_compression,
+                         compression_opts=settings.output_compression_opts,
+                         shuffle=settings.output_shuffle,
+                         rates_dtype=settings.output_rates_dtype)
+
+def save_results(op, x, rates, eigvls, seeds, t, step_ind, writer=None):
     """ Creates and writes results to disk
 
     Parameters
     ----------
     op : Function
         The operator used to generate these results.
-    x : list of list of numpy.array
-        The prior x vectors.  Indexed [i][cell] using the above equation.
+    x : numpy.ndarray
+        The prior x vectors.  Indexed [i, cell, nuclide] using the above
+        equation.
     rates : list of ReactionRates
         The reaction rates for each substep.
     eigvls : list of float
@@ -22,6 +52,10 @@ def save_results(op, x, rates, eigvls, seeds, t, step_ind):
         Time indices.
     step_ind : int
         Step index.
+    writer : ResultsWriter, optional
+        Open writer to store results with, whose selection filters the stored
+        nuclides, materials and reaction rates.  If not given, everything is
+        written to "results.h5", reopened with write_results.
     """
 
     # Get indexing terms
@@ -29,18 +63,20 @@ def save_results(op, x, rates, eigvls, seeds, t, step_ind):
 
     # Create results
     stages = len(x)
-    results = Results()
-    results.allocate(vol_list, nuc_list, burn_list, full_burn_list, stages)
+    selection = {} if writer is None else writer.selection
 
-    n_mat = len(burn_list)
+    results = Results()
+    results.allocate(vol_list, nuc_list, burn_list, full_burn_list, stages,
+                     **selection)
 
-    for i in range(stages):
-        for mat_i in range(n_mat):
-            results[i, mat_i, :] = x[i][mat_i][:]
+    results.data[:] = results.select_number(x)
 
     results.k = eigvls
     results.seeds = seeds
     results.time = t
-    results.rates = rates
+    results.rates = results.select_rates(rates)
 
-    write_results(results, "results.h5", step_ind)
+    if writer is None:
+        write_results(results, "results.h5", step_ind)
+    else:
+        writer.write(results, step_ind)
@@ -0,0 +1,146 @@
+""" The stochastic implicit Euler integrator."""
+
+import copy
+import os
+
+import numpy as np
+
+from .deplete import deplete
+from .save_results import results_writer, save_results
+
+
+def sie(operator, m=5, print_out=True):
+    """The stochastic implicit Euler integrator.
+
+    Implements the stochastic implicit Euler (SIE) algorithm [sie]_.  Each
+    step is solved with m transport iterations, each of which evaluates the
+    end of step reaction rates.  The rates are relaxed across iterations so
+    that the statistical noise averages out instead of driving oscillations.
+    This algorithm is mathematically defined as:
+
+    .. math::
+        y' &= A(y, t) y(t)
+
+        y_{n+1}^{(0)} &= \\text{expm}(\\bar{A}_{n} h) y_n
+
+        A^{(j)} &= A(y_{n+1}^{(j-1)}, t_n + h)
+
+        \\bar{A}^{(j)} &= (1 - \\omega_j) \\bar{A}^{(j-1)}
+            + \\omega_j A^{(j)}
+
+        y_{n+1}^{(j)} &= \\text{expm}(\\bar{A}^{(j)} h) y_n
+
+    where :math:`\\bar{A}_{n}` is the relaxed operator of the previous step,
+    or :math:`A(y_0, t_0)` for the first step, and
+    :math:`y_{n+1} = y_{n+1}^{(m)}`.  Iteration j uses j times the particles
+    in operator.settings.particles, if present, and the relaxation factor
+    :math:`\\omega_j = j / \\sum_{i=1}^{j} i` weights each iteration by its
+    number of particles.
+
+    All m + 1 stages (the beginning of step and every iteration) are saved.
+
+    .. [sie]
+        Dufek, Jan, Dan Kotlyar, and Eugene Shwageraus. "The stochastic
+        implicit Euler method - A stable coupling scheme for Monte Carlo
+        burnup calculations." Annals of Nuclear Energy 60 (2013): 295-300.
+
+    Parameters
+    ----------
+    operator : Operator
+        The operator object to simulate on.
+    m : int, optional
+        Number of transport iterations per step.
+    print_out : bool, optional
+        Whether or not to print out time.
+    """
+
+    # Save current directory
+    dir_home = os.getcwd()
+
+    # Move to folder
+    os.makedirs(operator.settings.output_dir, exist_ok=True)
+    os.chdir(operator.settings.output_dir)
+
+    # Particles per batch of the first iteration, if the operator has them
+    particles = getattr(operator.settings, "particles", None)
+
+    # Generate initial conditions
+    vec = operator.initial_condition()
+
+    # Rates of every stage are held until the step is saved
+    operator.reserve_rates(m + 1)
+
+    # Preallocate stage and result buffers, reused every step
+    x = np.empty((m + 1,) + vec.shape)
+    x_result = np.empty(vec.shape)
+    x[0] = vec
+
+    # Beginning of step reaction rates for the first step
+    eigvl, rates, seed = operator.eval(x[0])
+
+    # The relaxed rates of a step are the beginning of step rates of the
+    # next, so two buffers are swapped every step
+    relaxed = [copy.deepcopy(rates), copy.deepcopy(rates)]
+
+    with results_writer(operator) as writer:
+        t = 0.0
+
+        for i, dt in enumerate(operator.settings.dt_vec):
+            # Create vectors
+            seeds = [seed]
+            eigvls = [eigvl]
+            rates_array = [rates]
+
+            deplete(operator, x[0], rates, dt, print_out, out=x[1])
+
+            rates = relaxed[i % 2]
+            weight = 0
+            try:
+                for j in range(1, m + 1):
+                    if particles is not None:
+                        operator.settings.particles = j * particles
+
+                    eigvl, rates_j, seed = operator.eval(x[j])
+
+                    eigvls.append(eigvl)
+                    seeds.append(seed)
+                    rates_array.append(rates_j)
+
+                    # Relax towards the new rates, weighted by particles
+                    weight += j
+                    if j == 1:
+                        rates.rates[:] = rates_j.rates
+                    else:
+                        rates.rates += j / weight * (rates_j.rates
+                                                     - rates.rates)
+                    rates.fission_energy = rates_j.fission_energy
+
+                    out = x[j + 1] if j < m else x_result
+                    deplete(operator, x[0], rates, dt, print_out, out=out)
+            finally:
+                if particles is not None:
+                    operator.settings.particles = particles
+
+            # Create results, write to disk
+            save_results(operator, x, rates_array, eigvls, seeds, [t, t + dt],
+                         i, writer)
+
+            t += dt
+            x[0] = x_result
+
+        # Perform one last simulation
+        seeds = []
+        eigvls = []
+        rates_array = []
+        eigvl, rates, seed = operator.eval(x[0])
+
+        eigvls.append(eigvl)
+        seeds.append(seed)
+        rates_array.append(rates)
+
+        # Create results, write to disk
+        save_results(operator, x[:1], rates_array, eigvls, seeds, [t, t],
+                     len(operator.settings.dt_vec), writer)
+
+    # Return to origin
+    os.chdir(dir_home)
@@ -0,0 +1,364 @@
+""" Transmutation Trajectory Analysis module
+
+Implements a linear chain (Bateman) solver, to verify CRAM against and to
+study the paths atoms take.  It is not offered as a Settings.solver, as it is
+much slower than CRAM on chains with many initial nuclides and cycles.
+"""
+
+import bisect
+import functools
+import math
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import gammaln
+
+# Relative passage below which trajectories are not followed.  Each pruned
+# trajectory drops at most this fraction of the atoms of its initial nuclide.
+TTA_CUTOFF = 1.0e-10
+
+# Nodes of a divided difference closer than this are evaluated with a Taylor
+# series of this many terms, which converges to machine precision.
+_TAYLOR_SPREAD = 6.0
+_TAYLOR_TERMS = 40
+
+# Divided differences whose rounding error could exceed this many machine
+# epsilons are evaluated with a series instead, if their nodes are closer than
+# _MAX_SERIES_SPREAD.
+_MAX_ERROR = 100.0
+_MAX_SERIES_SPREAD = 200.0
+
+
+def tta_wrapper(chain, n0, rates, dt, yield_weights=None, cutoff=TTA_CUTOFF):
+    """Wraps depletion matrix creation / TTA solve for multiprocess execution
+
+    Uses the same calling convention as cram_wrapper.  The cutoff can be
+    bound with functools.partial.
+
+    Parameters
+    ----------
+    chain : DepletionChain
+        Depletion chain used to construct the burnup matrix
+    n0 : numpy.array
+        Vector to operate a matrix exponent on.
+    rates : numpy.ndarray
+        Reaction rates of the material, as taken by chain.form_matrix.
+    dt : float
+        Time to integrate to.
+    yield_weights : numpy.ndarray, optional
+        Weight of each fission yield energy of the chain.  Thermal yields
+        are used if not given.
+    cutoff : float, optional
+        Relative passage below which a trajectory is no longer followed.
+
+    Returns
+    -------
+    numpy.array
+        Results of the matrix exponent.
+    """
+    A = chain.form_matrix(rates, yield_weights)
+    return TTA(A, n0, dt, cutoff)
+
+
+def TTA(A, n0, dt, cutoff=TTA_CUTOFF, pool=None):
+    """ Transmutation Trajectory Analysis
+
+    Decomposes the problem into linear chains (trajectories) starting at each
+    nuclide present in n0 [tta]_.  Each trajectory is solved with the
+    analytic Bateman solution, written as a divided difference of the
+    exponential, which remains exact when removal constants repeat along the
+    chain and stable when the chain is stiff.  A trajectory is extended to the
+    successors of its last nuclide only if the passage (the number of atoms
+    that have entered the last nuclide by dt) relative to the initial atoms of
+    the starting nuclide exceeds cutoff.
+
+    A trajectory that returns to a nuclide it has already passed through is
+    not extended any further, such that cycles end the walk instead of being
+    followed until their passage falls below cutoff, which takes as many
+    turns as the atoms make around the cycle.  The atoms that have come back
+    are counted, but not those that leave the nuclide again.  TTA is exact to
+    within cutoff on acyclic chains, and underestimates the nuclides
+    downstream of a cycle by the atoms that go around it more than once.
+
+    .. [tta]
+        Cetnar, Jerzy. "General solution of Bateman equations for nuclear
+        transmutations." Annals of Nuclear Energy 33.7 (2006): 640-645.
+
+    Parameters
+    ----------
+    A : scipy.linalg.csr_matrix
+        Matrix to take exponent of.
+    n0 : numpy.array
+        Vector to operate a matrix exponent on.
+    dt : float
+        Time to integrate to.
+    cutoff : float, optional
+        Relative passage below which a trajectory is no longer followed.
+        Must be positive.
+    pool : multiprocessing.Pool or concurrent.futures.Executor, optional
+        Pool to walk the trajectories of each initial nuclide over, as they
+        are independent.  They are walked in this process if not given.
+
+    Returns
+    -------
+    numpy.array
+        Results of the matrix exponent.
+    """
+
+    if cutoff <= 0.0:
+        raise ValueError("TTA cutoff must be positive, got {}".format(cutoff))
+
+    # Column i holds the transfer rates out of nuclide i
+    A = sp.csc_matrix(A)
+
+    roots = np.flatnonzero(n0)
+    walk = functools.partial(_walk, A, dt, cutoff)
+    if pool is None:
+        solutions = map(walk, roots)
+    else:
+        solutions = pool.map(walk, roots)
+
+    y = np.zeros(A.shape[0])
+    for root, solution in zip(roots, solutions):
+        y += n0[root] * solution
+
+    return y
+
+
+def _walk(A, dt, cutoff, root):
+    """ Walks every trajectory starting at one nuclide.
+
+    Parameters
+    ----------
+    A : scipy.sparse.csc_matrix
+        Matrix to take exponent of.
+    dt : float
+        Time to integrate to.
+    cutoff : float
+        Relative passage below which a trajectory is no longer followed.
+    root : int
+        Index of the starting nuclide.
+
+    Returns
+    -------
+    numpy.array
+        Results of the matrix exponent for one atom of the root nuclide.
+    """
+
+    nodes = A.diagonal() * dt
+    y = np.zeros(A.shape[0])
+
+    # Depth-first traversal, each entry is (nuclides, log of the product of
+    # transfer constants, its sign, series of all but the last nuclide or
+    # None, whether the last nuclide is already on the trajectory)
+    stack = [([root], 0.0, 1.0, _series(_TAYLOR_TERMS), False)]
+    while stack:
+        path, log_prod, sign, head, repeated = stack.pop()
+        last = path[-1]
+        order = len(path) - 1
+
+        # While every removal constant times dt is in [-_TAYLOR_SPREAD, 0],
+        # as for most nuclides, the series of the chain about -_TAYLOR_SPREAD
+        # is extended one nuclide at a time.  Anything else is solved from
+        # scratch.
+        if head is not None and -_TAYLOR_SPREAD <= nodes[last] <= 0.0:
+            series = _extend(head, nodes[last] + _TAYLOR_SPREAD)
+            log_number = _log_series(series, order) - _TAYLOR_SPREAD
+        else:
+            series = None
+            log_number = _log_exp_dd(nodes[path])
+
+        y[last] += sign * math.exp(log_prod + log_number)
+
+        if repeated:
+            continue
+
+        # Atoms that have entered the last nuclide are those of a chain
+        # ending in a nuclide that is never removed.
+        if order == 0:
+            passage = 1.0
+        elif head is not None:
+            log_passage = (_log_series(_extend(head, _TAYLOR_SPREAD), order)
+                           - _TAYLOR_SPREAD)
+            passage = sign * math.exp(log_prod + log_passage)
+        else:
+            log_passage = _log_exp_dd(np.append(nodes[path[:-1]], 0.0))
+            passage = sign * math.exp(log_prod + log_passage)
+
+        if abs(passage) <= cutoff:
+            continue
+
+        start = A.indptr[last]
+        end = A.indptr[last + 1]
+        for k, rate in zip(A.indices[start:end], A.data[start:end]):
+            if k != last and rate != 0.0:
+                beta = rate * dt
+                stack.append((path + [k],
+                              log_prod + math.log(abs(beta)),
+                              -sign if beta < 0.0 else sign,
+                              series, k in path))
+
+    return y
+
+
+def _log_exp_dd(x):
+    """ Logarithm of the divided difference of exp over the nodes x.
+
+    The Bateman solution of a chain is the product of its transfer constants
+    with the divided difference of the exponential over its removal constants,
+    which is positive for any real nodes.  Only the divided differences over
+    the lowest nodes are needed, which are built from the highest nodes down.
+    Nodes closer than _TAYLOR_SPREAD are evaluated with a Taylor series about
+    the lowest of them, whose terms are all positive, and so are differences
+    that would cancel.  Working with logarithms keeps the solution finite
+    however stiff the chain is.
+
+    Parameters
+    ----------
+    x : iterable of float
+        Nodes of the divided difference.
+
+    Returns
+    -------
+    float
+        Logarithm of the divided difference.
+    """
+
+    x = sorted(x)
+
+    # row[j] is the divided difference over nodes[:j + 1], starting with the
+    # nodes within _TAYLOR_SPREAD of the highest, and error[j] bounds its
+    # relative rounding error in units of machine epsilon
+    split = bisect.bisect_left(x, x[-1] - _TAYLOR_SPREAD)
+    nodes = x[split:]
+    row = []
+    series = _series(_TAYLOR_TERMS)
+    for order, node in enumerate(nodes):
+        series = _extend(series, node - nodes[0])
+        row.append(nodes[0] + _log_series(series, order))
+    error = [1.0] * len(row)
+
+    for low in reversed(x[:split]):
+        series = _extend(_series(_TAYLOR_TERMS), 0.0)
+        new_row = [low]
+        new_error = [1.0]
+        for order, node in enumerate(nodes, 1):
+            spread = node - low
+            if spread <= _TAYLOR_SPREAD:
+                series = _extend(series, spread)
+                new_row.append(low + _log_series(series, order))
+                new_error.append(1.0)
+                continue
+
+            # The difference amplifies the errors of both divided differences
+            ratio = math.exp(new_row[order - 1] - row[order - 1])
+            amplified = (error[order - 1] + ratio * new_error[order - 1]) \
+                / (1.0 - ratio) + 1.0
+            if amplified > _MAX_ERROR and spread <= _MAX_SERIES_SPREAD:
+                window = _series(_series_terms(spread))
+                for other in [low] + nodes[:order]:
+                    window = _extend(window, (other - low) / spread)
+                new_row.append(low + _log_series(window, order, spread))
+                new_error.append(1.0)
+            else:
+                new_row.append(row[order - 1] + math.log1p(-ratio)
+                               - math.log(spread))
+                new_error.append(amplified)
+        nodes.insert(0, low)
+        row = new_row
+        error = new_error
+
+    return row[-1]
+
+
+def _series_terms(spread):
+    """ Number of terms for a series over nodes spread over [0, spread].
+
+    Parameters
+    ----------
+    spread : float
+        Largest node.
+
+    Returns
+    -------
+    int
+        Number of terms beyond which the Poisson tail of the series is below
+        machine precision.
+    """
+
+    return int(spread + 9.0 * math.sqrt(spread)) + 10
+
+
+def _series(terms):
+    """ Taylor series of the divided difference of exp over no nodes.
+
+    The divided difference of order L of exp over nodes y is the sum over m of
+    h_m / (m + L)!, where h_m is the complete homogeneous symmetric polynomial
+    of degree m of the nodes.  A series holds h_m / scale^m, for nodes scaled
+    by a scale that keeps them below one.
+
+    Parameters
+    ----------
+    terms : int
+        Number of terms after the first.
+
+    Returns
+    -------
+    numpy.array
+        h_m over no nodes.
+    """
+
+    series = np.zeros(terms + 1)
+    series[0] = 1.0
+    return series
+
+
+def _extend(series, node):
+    """ Adds a node to a series from _series.
+
+    Parameters
+    ----------
+    series : numpy.array
+        h_m of the current nodes.
+    node : float
+        Scaled node to add, nonnegative so that every term is positive.
+
+    Returns
+    -------
+    numpy.array
+        h_m of the nodes with node added.
+    """
+
+    terms = len(series)
+    return np.convolve(series, node ** np.arange(terms))[:terms]
+
+
+def _log_series(series, order, scale=1.0):
+    """ Logarithm of a divided difference of exp from its series.
+
+    Parameters
+    ----------
+    series : numpy.array
+        h_m of the nodes, from _extend.
+    order : int
+        Order of the divided difference, one less than the number of nodes.
+    scale : float, optional
+        Scale of the nodes of the series.
+
+    Returns
+    -------
+    float
+        Logarithm of the divided difference.
+    """
+
+    total = np.dot(series, _coefficients(order, len(series), scale))
+    return math.log(total) - math.lgamma(order + 1)
+
+
+@functools.lru_cache(maxsize=1024)
+def _coefficients(order, terms, scale):
+    """ Returns order! scale^m / (m + order)! for each term m of a series. """
+
+    m = np.arange(terms)
+    return np.exp(m * math.log(scale) + math.lgamma(order + 1)
+                  - gammaln(m + order + 1))
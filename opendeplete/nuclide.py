@@ -9,9 +9,136 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
+import numpy as np
+
 DecayTuple = namedtuple('DecayTuple', 'type target branching_ratio')
 ReactionTuple = namedtuple('ReactionTuple', 'type target Q branching_ratio')
 
+# Names of fission products, shared by every FissionYields of the process
+_PRODUCT_NAMES = []
+_PRODUCT_TO_IND = {}
+
+
+def _product_indices(names):
+    """ Returns the index of each product name in _PRODUCT_NAMES.
+
+    Names not yet in the table are appended to it.
+    """
+
+    indices = np.empty(len(names), dtype=np.int32)
+    for i, name in enumerate(names):
+        ind = _PRODUCT_TO_IND.get(name)
+        if ind is None:
+            ind = len(_PRODUCT_NAMES)
+            _PRODUCT_NAMES.append(name)
+            _PRODUCT_TO_IND[name] = ind
+        indices[i] = ind
+
+    return indices
+
+
+class FissionYields(object):
+    """ Fission product yields at one energy.
+
+    Stored as parallel arrays of product indices and yields.  The product
+    names are kept once per process in a table shared by every instance.
+    Behaves as a read-only sequence of (product, yield) tuples, and compares
+    equal to a list of the same tuples.
+
+    Parameters
+    ----------
+    products : iterable of str
+        Names of the fission products.
+    yields : iterable of float
+        Yield of each product.
+
+    Attributes
+    ----------
+    product_index : numpy.ndarray of int
+        Index of each product in the shared table of product names.
+    yields : numpy.ndarray of float
+        Yield of each product.
+    """
+
+    __slots__ = ('product_index', 'yields')
+
+    def __init__(self, products, yields):
+        self.product_index = _product_indices(list(products))
+        self.yields = np.array(yields, dtype=float).reshape(-1)
+
+        if len(self.product_index) != len(self.yields):
+            raise ValueError("Number of products and yields differ")
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """ Creates yields from (product, yield) pairs.
+
+        Parameters
+        ----------
+        pairs : iterable of tuple of str and float
+            Name and yield of each fission product.
+
+        Returns
+        -------
+        FissionYields
+            The yields.
+        """
+
+        if isinstance(pairs, cls):
+            return pairs
+
+        pairs = list(pairs)
+        return cls([product for product, _ in pairs], [y for _, y in pairs])
+
+    @property
+    def products(self):
+        """Names of the fission products."""
+        return [_PRODUCT_NAMES[i] for i in self.product_index]
+
+    def __len__(self):
+        return len(self.yields)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        return (_PRODUCT_NAMES[self.product_index[index]],
+                float(self.yields[index]))
+
+    def __iter__(self):
+        return zip(self.products, self.yields.tolist())
+
+    def __eq__(self, other):
+        try:
+            return list(self) == [tuple(pair) for pair in other]
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'FissionYields({!r})'.format(list(self))
+
+    def __reduce__(self):
+        # Indices are only valid in this process, so products are pickled by
+        # name
+        return (type(self), (self.products, self.yields))
+
+
+class _YieldData(dict):
+    """ Dictionary of energy to FissionYields that converts assigned lists. """
+
+    def __init__(self, data=()):
+        super().__init__()
+        for energy, yields in dict(data).items():
+            self[energy] = yields
+
+    def __setitem__(self, energy, yields):
+        super().__setitem__(energy, FissionYields.from_pairs(yields))
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
 
 class Nuclide(object):
     """The Nuclide class.
@@ -36,14 +163,18 @@ class Nuclide(object):
     reactions : list of ReactionTuple
         Reaction information. Each element of the list is a named tuple with
         attribute 'type', 'target', 'Q', and 'branching_ratio'.
-    yield_data : dict of float to list
-        Maps tabulated energy to list of (product, yield) for all
-        neutron-induced fission products.
+    yield_data : dict of float to FissionYields
+        Maps tabulated energy to the (product, yield) pairs of all
+        neutron-induced fission products.  Lists of pairs assigned to it are
+        converted to FissionYields.
     yield_energies : list of float
         Energies at which fission product yiels exist
 
     """
 
+    __slots__ = ('name', 'half_life', 'decay_energy', 'decay_modes',
+                 'reactions', '_yield_data', 'yield_energies')
+
     def __init__(self):
         # Information about the nuclide
         self.name = None
@@ -60,6 +191,15 @@ class Nuclide(object):
         self.yield_data = {}
         self.yield_energies = []
 
+    @property
+    def yield_data(self):
+        """Fission product yields by energy."""
+        return self._yield_data
+
+    @yield_data.setter
+    def yield_data(self, yield_data):
+        self._yield_data = _YieldData(yield_data)
+
     @property
     def n_decay_modes(self):
         """Number of decay modes."""
@@ -122,9 +262,9 @@ class Nuclide(object):
             for yields_elem in fpy_elem.iter('fission_yields'):
                 E = float(yields_elem.get('energy'))
                 products = yields_elem.find('products').text.split()
-                yields = [float(y) for y in
-                          yields_elem.find('data').text.split()]
-                nuc.yield_data[E] = list(zip(products, yields))
+                yields = np.array(yields_elem.find('data').text.split(),
+                                  dtype=float)
+                nuc.yield_data[E] = FissionYields(products, yields)
             nuc.yield_energies = list(sorted(nuc.yield_data.keys()))
 
         return nuc
@@ -171,8 +311,9 @@ class Nuclide(object):
                 yields_elem.set('energy', str(E))
 
                 products_elem = ET.SubElement(yields_elem, 'products')
-                products_elem.text = ' '.join(x[0] for x in self.yield_data[E])
+                products_elem.text = ' '.join(self.yield_data[E].products)
                 data_elem = ET.SubElement(yields_elem, 'data')
-                data_elem.text = ' '.join(str(x[1]) for x in self.yield_data[E])
+                data_elem.text = ' '.join(
+                    str(y) for y in self.yield_data[E].yields.tolist())
 
         return elem
@@ -20,7 +20,6 @@ except ImportError:
 import h5py
 import numpy as np
 import openmc
-import openmc.capi
 
 from . import comm
 from .atom_number import AtomNumber
@@ -56,6 +55,38 @@ class OpenMCSettings(Settings):
         Tolerance for adaptive time stepping. (From Settings)
     output_dir : str
         Path to output directory to save results. (From Settings)
+    output_compression : str
+        Filter for results.h5, None (default), "gzip" or "lzf". (From Settings)
+    output_compression_opts : int
+        Compression level for "gzip". (From Settings)
+    output_shuffle : bool
+        Whether or not to shuffle before compressing. (From Settings)
+    output_rates_dtype : str
+        Storage type of reaction rates in results.h5, "float64" (default) or
+        "float32". (From Settings)
+    output_nuclides : list of str
+        Nuclides stored in results.h5, all if None (default). (From Settings)
+    output_materials : list of str
+        Material IDs stored in results.h5, all if None (default).
+        (From Settings)
+    output_rates : str
+        Reaction rates stored in results.h5, "all" (default), "bos" or
+        "none". (From Settings)
+    output_swmr : bool
+        Whether to write results.h5 in SWMR mode. (From Settings)
+    solver : str
+        Matrix exponential solver, "cram48" (default) or "cram16".
+        (From Settings)
+    substeps : int
+        Number of constant-power depletion substeps per integrator
+        exponential. (From Settings)
+    backend : str
+        Execution backend for the per-material depletion, "process" (default),
+        "thread" or "serial". (From Settings)
+    n_workers : int
+        Number of processes or threads used for depletion on each rank.
+        Defaults to the cores of the node divided by the ranks on the node.
+        (From Settings)
     chain_file : str
         Path to the depletion chain xml file.  Defaults to the environment
         variable "OPENDEPLETE_CHAIN" if it exists.
@@ -86,6 +117,11 @@ class OpenMCSettings(Settings):
         Power of the reactor in W. For a 2D problem, the power can be given in
         W/cm as long as the "volume" assigned to a depletion material is
         actually an area in cm^2.
+    fission_yield_energy : float or dict of str to float
+        Energy in eV of the neutrons causing fission, at which fission yields
+        are interpolated, for every material or by material ID, as str or
+        int.  Thermal yields are used if None (default), and for materials
+        missing from a dict.
     """
 
     def __init__(self):
@@ -110,6 +146,7 @@ class OpenMCSettings(Settings):
 
         # Depletion problem specific
         self.power = None
+        self.fission_yield_energy = None
 
 
 class Materials(object):
@@ -142,6 +179,9 @@ class OpenMCOperator(Operator):
         The OpenMC geometry object.
     settings : OpenMCSettings
         Settings object.
+    capi : module or FakeCapi, optional
+        Backend providing the openmc.capi interface, openmc.capi by default.
+        A FakeCapi runs the operator without a compiled OpenMC.
 
     Attributes
     ----------
@@ -149,6 +189,8 @@ class OpenMCOperator(Operator):
         Settings object. (From Operator)
     geometry : openmc.Geometry
         The OpenMC geometry object.
+    capi : module or FakeCapi
+        Backend providing the openmc.capi interface.
     materials : list of Materials
         Materials to be used for this simulation.
     seed : int
@@ -161,6 +203,9 @@ class OpenMCOperator(Operator):
         The depletion chain information necessary to form matrices and tallies.
     reaction_rates : ReactionRates
         Reaction rates from the last operator step.
+    rate_buffers : list of ReactionRates
+        Ring of reaction rate buffers filled by eval in turn.  The buffers
+        share their index dictionaries and pairs, which must not be modified.
     power : OrderedDict of str to float
         Material-by-Material power.  Indexed by material ID.
     mat_name : OrderedDict of str to int
@@ -176,14 +221,20 @@ class OpenMCOperator(Operator):
         Dictionary mapping material ID to index in tally.
     """
 
-    def __init__(self, geometry, settings):
+    def __init__(self, geometry, settings, capi=None):
         super().__init__(settings)
 
+        if capi is None:
+            import openmc.capi as capi
+        self.capi = capi
+
         self.geometry = geometry
         self.seed = 0
         self.number = None
         self.participating_nuclides = None
         self.reaction_rates = None
+        self.rate_buffers = []
+        self._next_buffer = 0
         self.power = None
         self.mat_name = OrderedDict()
         self.burn_mat_to_ind = OrderedDict()
@@ -221,7 +272,7 @@ class OpenMCOperator(Operator):
         self.initialize_reaction_rates()
 
     def __del__(self):
-        openmc.capi.finalize()
+        self.capi.finalize()
 
     def extract_mat_ids(self):
         """ Extracts materials and assigns them to processes.
@@ -374,21 +425,46 @@ class OpenMCOperator(Operator):
             self.number.set_atom_density(mat_id, name, number)
 
     def initialize_reaction_rates(self):
-        """ Create reaction rates object. """
+        """ Create reaction rates object.
+
+        Two buffers are created, such that the rates of consecutive calls to
+        eval do not overlap.  reserve_rates adds more.
+        """
+        self.chain.nuc_to_react_ind = self.burn_nuc_to_ind
+
         self.reaction_rates = ReactionRates(
             self.burn_mat_to_ind,
             self.burn_nuc_to_ind,
-            self.chain.react_to_ind)
+            self.chain.react_to_ind,
+            self.chain.reaction_pairs())
 
-        self.chain.nuc_to_react_ind = self.burn_nuc_to_ind
+        self.rate_buffers = [self.reaction_rates]
+        self._next_buffer = 0
+        self.reserve_rates(2)
+
+    def reserve_rates(self, n_rates):
+        """ Grows the ring of reaction rate buffers to at least n_rates.
+
+        Parameters
+        ----------
+        n_rates : int
+            Number of rates returned by eval held at once.
+        """
+
+        template = self.rate_buffers[0]
+        while len(self.rate_buffers) < n_rates:
+            self.rate_buffers.append(ReactionRates(
+                template.mat_to_ind, template.nuc_to_ind,
+                template.react_to_ind, template.pairs))
 
     def eval(self, vec, print_out=True):
         """ Runs a simulation.
 
         Parameters
         ----------
-        vec : list of numpy.array
-            Total atoms to be used in function.
+        vec : numpy.ndarray
+            Total atoms to be used in function, indexed by burnable material
+            then by burnable nuclide.
         print_out : bool, optional
             Whether or not to print out time.
 
@@ -399,7 +475,10 @@ class OpenMCOperator(Operator):
         k : float
             Eigenvalue of the problem.
         rates : ReactionRates
-            Reaction rates from this simulation.
+            Reaction rates from this simulation.  The next buffer of
+            rate_buffers, owned by the operator.  It is overwritten
+            len(rate_buffers) calls later, and must be copied to be kept
+            longer.
         seed : int
             Seed for this simulation.
         """
@@ -414,15 +493,20 @@ class OpenMCOperator(Operator):
 
         # Update material compositions and tally nuclides
         self._update_materials()
-        openmc.capi.tallies[1].nuclides = self._get_tally_nuclides()
+        self.capi.tallies[1].nuclides = self._get_tally_nuclides()
+
+        # Integrators such as sie change the particles between evaluations
+        self.capi.settings.particles = self.settings.particles
 
         # Run OpenMC
-        openmc.capi.reset()
-        openmc.capi.run()
+        self.capi.reset()
+        self.capi.run()
 
         time_openmc = time.time()
 
-        # Extract results
+        # Extract results into the next buffer of the ring
+        self.reaction_rates = self.rate_buffers[self._next_buffer]
+        self._next_buffer = (self._next_buffer + 1) % len(self.rate_buffers)
         k = self.unpack_tallies_and_normalize()
 
         if comm.rank == 0:
@@ -432,7 +516,7 @@ class OpenMCOperator(Operator):
                 print("Time to openmc: ", time_openmc - time_start)
                 print("Time to unpack: ", time_unpack - time_openmc)
 
-        return k, copy.deepcopy(self.reaction_rates), self.seed
+        return k, self.reaction_rates, self.seed
 
     def form_matrix(self, y, mat):
         """ Forms the depletion matrix.
@@ -457,8 +541,9 @@ class OpenMCOperator(Operator):
 
         Returns
         -------
-        list of numpy.array
-            Total density for initial conditions.
+        numpy.ndarray
+            Total atoms for initial conditions, indexed by burnable material
+            then by burnable nuclide.
         """
 
         # Create XML files
@@ -469,7 +554,7 @@ class OpenMCOperator(Operator):
 
         # Initialize OpenMC library
         comm.barrier()
-        openmc.capi.init(comm)
+        self.capi.init(comm)
 
         # Generate tallies in memory
         self.generate_tallies()
@@ -483,34 +568,38 @@ class OpenMCOperator(Operator):
         for rank in range(comm.size):
             number_i = comm.bcast(self.number, root=rank)
 
-            for mat in number_i.mat_to_ind:
-                nuclides = []
-                densities = []
-                for nuc in number_i.nuc_to_ind:
-                    if nuc in self.participating_nuclides:
-                        val = 1.0e-24 * number_i.get_atom_density(mat, nuc)
-
-                        # If nuclide is zero, do not add to the problem.
-                        if val > 0.0:
-                            if self.settings.round_number:
-                                val_magnitude = np.floor(np.log10(val))
-                                val_scaled = val / 10**val_magnitude
-                                val_round = round(val_scaled, 8)
-
-                                val = val_round * 10**val_magnitude
-
-                            nuclides.append(nuc)
-                            densities.append(val)
-                        else:
-                            # Only output warnings if values are significantly
-                            # negative.  CRAM does not guarantee positive values.
-                            if val < -1.0e-21:
-                                print("WARNING: nuclide ", nuc, " in material ", mat,
-                                      " is negative (density = ", val, " at/barn-cm)")
-                            number_i[mat, nuc] = 0.0
-
-                mat_internal = openmc.capi.materials[int(mat)]
-                mat_internal.set_densities(nuclides, densities)
+            nuclides = [nuc for nuc in number_i.nuc_to_ind
+                        if nuc in self.participating_nuclides]
+            nuc_ind = np.array([number_i.nuc_to_ind[nuc] for nuc in nuclides],
+                               dtype=int)
+
+            # Densities of every participating nuclide in every material
+            density = 1.0e-24 * number_i.get_atom_density(np.s_[:], nuc_ind)
+
+            for mat, mat_ind in number_i.mat_to_ind.items():
+                val = density[mat_ind]
+                present = val > 0.0
+
+                # If nuclide is zero, do not add to the problem.
+                densities = val[present]
+                if self.settings.round_number:
+                    val_magnitude = np.floor(np.log10(densities))
+                    val_scaled = densities / 10**val_magnitude
+                    val_round = np.array([round(v, 8) for v in val_scaled])
+
+                    densities = val_round * 10**val_magnitude
+
+                # Only output warnings if values are significantly
+                # negative.  CRAM does not guarantee positive values.
+                for j in np.flatnonzero(val < -1.0e-21):
+                    print("WARNING: nuclide ", nuclides[j], " in material ", mat,
+                          " is negative (density = ", val[j], " at/barn-cm)")
+                number_i.number[mat_ind, nuc_ind[~present]] = 0.0
+
+                mat_internal = self.capi.materials[int(mat)]
+                mat_internal.set_densities(
+                    [nuc for nuc, keep in zip(nuclides, present) if keep],
+                    densities.tolist())
 
     def generate_materials_xml(self):
         """ Creates materials.xml from self.number.
@@ -575,10 +664,12 @@ class OpenMCOperator(Operator):
 
         # Create the set of all nuclides in the decay chain in cells marked for
         # burning in which the number density is greater than zero.
-        for nuc in self.number.nuc_to_ind:
-            if nuc in self.participating_nuclides:
-                if np.sum(self.number[:, nuc]) > 0.0:
-                    nuc_set.add(nuc)
+        nuclides = [nuc for nuc in self.number.nuc_to_ind
+                    if nuc in self.participating_nuclides]
+        if nuclides:
+            totals = np.sum(self.number[:, nuclides], axis=0)
+            nuc_set.update(nuc for nuc, total in zip(nuclides, totals)
+                           if total > 0.0)
 
         # Communicate which nuclides have nonzeros to rank 0
         if comm.rank == 0:
@@ -612,33 +703,29 @@ class OpenMCOperator(Operator):
         """
 
         # Create tallies for depleting regions
-        materials = [openmc.capi.materials[int(i)]
+        materials = [self.capi.materials[int(i)]
                      for i in self.mat_tally_ind]
-        mat_filter = openmc.capi.MaterialFilter(materials, 1)
+        mat_filter = self.capi.MaterialFilter(materials, 1)
 
         # Set up a tally that has a material filter covering each depletable
         # material and scores corresponding to all reactions that cause
         # transmutation. The nuclides for the tally are set later when eval() is
         # called.
-        tally_dep = openmc.capi.Tally(1)
+        tally_dep = self.capi.Tally(1)
         tally_dep.scores = self.chain.react_to_ind.keys()
         tally_dep.filters = [mat_filter]
 
     def total_density_list(self):
-        """ Returns a list of total density lists.
-
-        This list is in the exact same order as depletion_matrix_list, so that
-        matrix exponentiation can be done easily.
+        """ Returns the total atoms of all burnable materials.
 
         Returns
         -------
-        list of numpy.array
-            A list of np.arrays containing total atoms of each cell.
+        numpy.ndarray
+            View into self.number, indexed by burnable material then by
+            burnable nuclide.
         """
 
-        total_density = [self.number.get_mat_slice(i) for i in range(self.number.n_mat_burn)]
-
-        return total_density
+        return self.number.get_mat_slice(np.s_[:self.number.n_mat_burn])
 
     def set_density(self, total_density):
         """ Sets density.
@@ -648,13 +735,11 @@ class OpenMCOperator(Operator):
 
         Parameters
         ----------
-        total_density : list of numpy.array
-            Total atoms.
+        total_density : numpy.ndarray
+            Total atoms, indexed by burnable material then by burnable nuclide.
         """
 
-        # Fill in values
-        for i in range(self.number.n_mat_burn):
-            self.number.set_mat_slice(i, total_density[i])
+        self.number.set_mat_slice(np.s_[:self.number.n_mat_burn], total_density)
 
     def unpack_tallies_and_normalize(self):
         """ Unpack tallies from OpenMC
@@ -675,13 +760,13 @@ class OpenMCOperator(Operator):
         """
 
         rates = self.reaction_rates
-        rates[:, :, :] = 0.0
+        rates.rates[:] = 0.0
 
-        k_combined = openmc.capi.keff()[0]
+        k_combined = self.capi.keff()[0]
 
         # Extract tally bins
         materials = list(self.mat_tally_ind.keys())
-        nuclides = openmc.capi.tallies[1].nuclides
+        nuclides = self.capi.tallies[1].nuclides
         reactions = list(self.chain.react_to_ind.keys())
 
         # Form fast map
@@ -695,10 +780,8 @@ class OpenMCOperator(Operator):
         # particle
         energy = 0.0
 
-        # Create arrays to store fission Q values, reaction rates, and nuclide
-        # numbers
+        # Create arrays to store fission Q values and nuclide numbers
         fission_Q = np.zeros(rates.n_nuc)
-        rates_expanded = np.zeros((rates.n_nuc, rates.n_react))
         number = np.zeros(rates.n_nuc)
 
         fission_ind = rates.react_to_ind["fission"]
@@ -711,36 +794,44 @@ class OpenMCOperator(Operator):
                         fission_Q[ind] = rx.Q
                         break
 
+        # Position in the tally results of the rate of each pair, which are
+        # the only rates stored.  Pairs of nuclides without tallies are zero.
+        tally_pos = np.full((rates.n_nuc, rates.n_react), -1, dtype=int)
+        tally_shape = (len(nuc_ind), len(react_ind))
+        tally_pos[np.ix_(nuc_ind, react_ind)] = \
+            np.arange(np.prod(tally_shape, dtype=int)).reshape(tally_shape)
+        pair_pos = tally_pos[rates.pairs[:, 0], rates.pairs[:, 1]]
+        tallied = np.flatnonzero(pair_pos >= 0)
+        pair_pos = pair_pos[tallied]
+        pair_nuc = rates.pairs[tallied, 0]
+        pair_Q = np.where(rates.pairs[tallied, 1] == fission_ind,
+                          fission_Q[pair_nuc], 0.0)
+
         # Extract results
         for i, mat in enumerate(self.number.burn_mat_list):
             # Get tally index
             slab = materials.index(mat)
 
             # Get material results hyperslab
-            results = openmc.capi.tallies[1].results[slab, :, 1]
+            results = self.capi.tallies[1].results[slab, :, 1]
 
-            # Zero out reaction rates and nuclide numbers
-            rates_expanded[:] = 0.0
+            # Zero out nuclide numbers
             number[:] = 0.0
-
-            # Expand into our memory layout
-            j = 0
             for nuc, i_nuc_results in zip(nuclides, nuc_ind):
                 number[i_nuc_results] = self.number[mat, nuc]
-                for react in react_ind:
-                    rates_expanded[i_nuc_results, react] = results[j]
-                    j += 1
+
+            # Gather the rates of the pairs
+            pair_rates = results[pair_pos]
 
             # Accumulate energy from fission
-            energy += np.dot(rates_expanded[:, fission_ind], fission_Q)
+            energy += np.dot(pair_rates, pair_Q)
 
             # Divide by total number and store
-            for i_nuc_results in nuc_ind:
-                if number[i_nuc_results] != 0.0:
-                    for react in react_ind:
-                        rates_expanded[i_nuc_results, react] /= number[i_nuc_results]
+            pair_number = number[pair_nuc]
+            nonzero = pair_number != 0.0
+            pair_rates[nonzero] /= pair_number[nonzero]
 
-            rates.rates[i, :, :] = rates_expanded
+            rates.rates[i, tallied] = pair_rates
 
         # Reduce energy produced from all processes
         energy = comm.allreduce(energy)
@@ -749,7 +840,21 @@ class OpenMCOperator(Operator):
         power = self.settings.power / _JOULE_PER_EV
 
         # Scale reaction rates to obtain units of reactions/sec
-        rates[:, :, :] *= power / energy
+        rates.rates *= power / energy
+
+        # Energy at which the fission yields of each material are evaluated
+        yield_energy = self.settings.fission_yield_energy
+        if yield_energy is None:
+            rates.fission_energy = None
+        elif isinstance(yield_energy, dict):
+            # Material IDs may be given as int, but are str everywhere else
+            yield_energy = {str(mat): energy
+                            for mat, energy in yield_energy.items()}
+            rates.fission_energy = np.zeros(rates.n_mat)
+            for mat, i in rates.mat_to_ind.items():
+                rates.fission_energy[i] = yield_energy.get(mat, 0.0)
+        else:
+            rates.fission_energy = np.full(rates.n_mat, float(yield_energy))
 
         return k_combined
 
@@ -5,6 +5,8 @@ An ndarray to store reaction rates with string, integer, or slice indexing.
 
 import numpy as np
 
+from .indexing import name_index, outer_index
+
 
 class ReactionRates(object):
     """ ReactionRates class.
@@ -19,6 +21,9 @@ class ReactionRates(object):
         A dictionary mapping nuclide name as string to index.
     react_to_ind : OrderedDict of str to int
         A dictionary mapping reaction name as string to index.
+    pairs : numpy.ndarray of int, optional
+        Nuclide and reaction index of every rate that can be nonzero, such as
+        returned by DepletionChain.reaction_pairs.
 
     Attributes
     ----------
@@ -35,16 +40,40 @@ class ReactionRates(object):
     n_react : int
         Number of reactions.
     rates : numpy.array
-        Array storing rates indexed by the above dictionaries.
+        Array storing rates indexed by the above dictionaries.  If pairs is
+        given, only the rates of the pairs are stored, indexed by material
+        then by pair, and indexing the ReactionRates itself returns them as if
+        the dense array were stored.  DepletionChain.form_matrix takes the
+        row of a material directly.
+    pairs : numpy.ndarray of int
+        Nuclide and reaction index of every rate that can be nonzero, indexed
+        by pair.  The other rates are structurally zero, and are neither held
+        in memory nor stored in results files.  None if every rate can be
+        nonzero.
+    fission_energy : numpy.ndarray
+        Energy in eV of the neutrons causing fission in each material, at
+        which fission yields are interpolated.  None to use thermal yields.
+        Not stored in results files.
     """
 
-    def __init__(self, mat_to_ind, nuc_to_ind, react_to_ind):
+    def __init__(self, mat_to_ind, nuc_to_ind, react_to_ind, pairs=None):
 
         self.mat_to_ind = mat_to_ind
         self.nuc_to_ind = nuc_to_ind
         self.react_to_ind = react_to_ind
+        self.pairs = pairs
+        self.fission_energy = None
+
+        if pairs is None:
+            self.rates = np.zeros((self.n_mat, self.n_nuc, self.n_react))
+        else:
+            self.rates = np.zeros((self.n_mat, len(pairs)))
+
+        # Sorted name arrays for looking up lists of names
+        self._index_cache = {}
 
-        self.rates = np.zeros((self.n_mat, self.n_nuc, self.n_react))
+        # Pairs and the column of each nuclide and reaction built from them
+        self._columns = (None, None)
 
     def __getitem__(self, pos):
         """ Retrieves an item from reaction_rates.
@@ -54,24 +83,25 @@ class ReactionRates(object):
         pos : tuple
             A three-length tuple containing a material index, a nuc index, and a
             reaction index.  These indexes can be strings (which get converted
-            to integers via the dictionaries), integers used directly, or
-            slices.
+            to integers via the dictionaries), integers used directly, slices,
+            or lists or arrays of either.  Lists on several axes select their
+            outer product.
 
         Returns
         -------
         numpy.array
-            The value indexed from self.rates.
+            The value indexed from self.rates.  Rates that are not of a pair
+            are zero.
         """
 
-        mat, nuc, react = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
-        if isinstance(react, str):
-            react = self.react_to_ind[react]
+        index = self._index(*pos)
+        if self.pairs is None:
+            return self.rates[index]
 
-        return self.rates[mat, nuc, react]
+        mat, column = self._compact_index(index)
+        values = self.rates[mat, np.maximum(column, 0)]
+
+        return np.where(column >= 0, values, 0.0)[()]
 
     def __setitem__(self, pos, val):
         """ Sets an item from reaction_rates.
@@ -81,21 +111,96 @@ class ReactionRates(object):
         pos : tuple
             A three-length tuple containing a material index, a nuc index, and a
             reaction index.  These indexes can be strings (which get converted
-            to integers via the dictionaries), integers used directly, or
-            slices.
+            to integers via the dictionaries), integers used directly, slices,
+            or lists or arrays of either.  Lists on several axes select their
+            outer product.
         val : float
             The value to set the array to.
+
+        Raises
+        ------
+        ValueError
+            If a rate that is not of a pair is set to a nonzero value.
+        """
+
+        index = self._index(*pos)
+        if self.pairs is None:
+            self.rates[index] = val
+            return
+
+        mat, column = self._compact_index(index)
+        val = np.broadcast_to(val, column.shape)
+
+        stored = column >= 0
+        if np.any(val[~stored] != 0.0):
+            raise ValueError("Only the rates of the pairs can be nonzero")
+
+        self.rates[mat[stored], column[stored]] = val[stored]
+
+    def _index(self, mat, nuc, react):
+        """ Translates a material, nuclide and reaction index. """
+
+        mat = name_index(mat, self.mat_to_ind, self._index_cache)
+        nuc = name_index(nuc, self.nuc_to_ind, self._index_cache)
+        react = name_index(react, self.react_to_ind, self._index_cache)
+
+        return outer_index((mat, nuc, react),
+                           (self.n_mat, self.n_nuc, self.n_react))
+
+    def _compact_index(self, index):
+        """ Translates an index of the dense rates to the stored rates.
+
+        Parameters
+        ----------
+        index : tuple
+            Index of the rates indexed by material, nuclide, then reaction.
+
+        Returns
+        -------
+        mat : numpy.ndarray of int
+            Material of each indexed rate.
+        column : numpy.ndarray of int
+            Pair of each indexed rate, -1 if it is not of a pair.
         """
 
-        mat, nuc, react = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
-        if isinstance(react, str):
-            react = self.react_to_ind[react]
+        pairs, columns = self._columns
+        if pairs is not self.pairs:
+            columns = np.full((self.n_nuc, self.n_react), -1, dtype=int)
+            columns[self.pairs[:, 0], self.pairs[:, 1]] = \
+                np.arange(len(self.pairs))
+            self._columns = (self.pairs, columns)
+
+        # Broadcast views index like the dense rates without allocating them
+        shape = (self.n_mat, self.n_nuc, self.n_react)
+        mats = np.broadcast_to(np.arange(self.n_mat)[:, None, None], shape)
+        columns = np.broadcast_to(columns, shape)
+
+        return mats[index], columns[index]
+
+    def compact(self):
+        """ Returns the rates of the nonzero pairs only.
+
+        Returns
+        -------
+        numpy.ndarray
+            Rates indexed by material, then by pair.  This is the stored
+            array itself.
+        """
+
+        return self.rates
+
+    def set_compact(self, data):
+        """ Sets the rates from the rates of the nonzero pairs.
+
+        Every other rate is set to zero.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Rates indexed by material, then by pair.
+        """
 
-        self.rates[mat, nuc, react] = val
+        self.rates[:] = data
 
     @property
     def n_mat(self):
@@ -0,0 +1,325 @@
+""" The replay module.
+
+Implements an operator that drives the integrators with the reaction rates
+recorded in a prior results file, without any transport.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from . import comm
+from .depletion_chain import DepletionChain
+from .function import Operator
+from .reaction_rates import ReactionRates
+from .results import CompactRates, ResultsFile
+
+
+class ReplayOperator(Operator):
+    """ Operator that returns recorded reaction rates from a results file.
+
+    Each call to eval returns the reaction rates, eigenvalue and seed of a
+    transport evaluation in the file, ignoring the state it is given.  By
+    default the evaluations are replayed in the order the integrator made
+    them, which reproduces a run of the same integrator and time steps.  With
+    interpolate, each evaluation instead takes place at the time the
+    integrator would have evaluated it for settings.dt_vec, and the recorded
+    rates are linearly interpolated to that time.
+
+    Materials are split evenly over the processes in file order, so that the
+    depletion, output and MPI pipeline can be exercised at full scale.  The
+    file must store every nuclide and material with the reaction rates of
+    all stages, and is kept open for the lifetime of the operator, so it
+    must not be the results.h5 written by the replaying run.
+
+    Parameters
+    ----------
+    settings : Settings
+        Settings object.
+    filename : str
+        Results file to replay.
+    chain : DepletionChain or str
+        Depletion chain used for the recorded run, or the path to its xml
+        file.
+    integrator : str, optional
+        Integrator that produced and will replay the file, "predictor"
+        (default), "cecm" or "sie".
+    interpolate : bool, optional
+        Whether to interpolate the recorded rates in time instead of
+        replaying them in order.
+
+    Attributes
+    ----------
+    settings : Settings
+        Settings object.
+    chain : DepletionChain
+        The depletion chain, with its reaction rate indices set from the file.
+    results : ResultsFile
+        The open results file.
+    integrator : str
+        Integrator that produced and will replay the file.
+    interpolate : bool
+        Whether recorded rates are interpolated in time.
+    burn_list : list of str
+        Materials depleted on this process.
+    n_evals : int
+        Number of evaluations performed so far.
+    """
+
+    def __init__(self, settings, filename, chain, integrator="predictor",
+                 interpolate=False):
+        super().__init__(settings)
+
+        if integrator not in ("predictor", "cecm", "sie"):
+            raise ValueError('Unknown integrator "{}"'.format(integrator))
+
+        if isinstance(chain, str):
+            chain = DepletionChain.xml_read(chain)
+
+        self.results = ResultsFile(filename)
+        self.integrator = integrator
+        self.interpolate = interpolate
+        self.n_evals = 0
+
+        res_file = self.results
+        if res_file.rates is None:
+            raise ValueError("Results do not store reaction rates")
+
+        n_nuc = res_file.number.shape[3]
+        if hasattr(chain, "nuclide_dict") and len(chain.nuclide_dict) != n_nuc:
+            raise ValueError("Results do not store every nuclide of the chain")
+
+        self._nuc_list = _sorted_keys(res_file.nuc_to_ind)
+        self._rxn_nuc_to_ind = OrderedDict(
+            (nuc, i) for i, nuc in enumerate(_sorted_keys(res_file.rxn_nuc_to_ind)))
+        self._rxn_to_ind = OrderedDict(
+            (rxn, i) for i, rxn in enumerate(_sorted_keys(res_file.rxn_to_ind)))
+
+        # Replayed rates keep the pairs the file was restricted to
+        self._pairs = None
+        if isinstance(res_file.rates, CompactRates):
+            self._pairs = res_file.rates.pairs
+
+        self.chain = chain
+        self.chain.nuc_to_react_ind = self._rxn_nuc_to_ind
+
+        # Distribute materials contiguously in file order
+        mat_list = _sorted_keys(res_file.mat_to_ind)
+        bounds = np.linspace(0, len(mat_list), comm.size + 1).astype(int)
+        self._low = bounds[comm.rank]
+        self._high = bounds[comm.rank + 1]
+        self.burn_list = mat_list[self._low:self._high]
+
+        # Transport evaluations in the file, by step, stage and time
+        time = res_file.time[:, 0]
+        n_stages = res_file.rates.shape[1]
+        self._recorded = _eval_schedule(integrator, np.diff(time), n_stages,
+                                        time[0])
+
+        if interpolate:
+            self._schedule = _eval_schedule(integrator, settings.dt_vec,
+                                            n_stages, time[0])
+
+            # Evaluations at the same time, such as the iterations of sie,
+            # are averaged
+            self._times = np.unique([t for _, _, t in self._recorded])
+            self._at_time = [[(step, stage) for step, stage, t in self._recorded
+                              if t == t_rec] for t_rec in self._times]
+        else:
+            self._schedule = self._recorded
+
+    def initial_condition(self):
+        """ Returns the recorded atoms at the beginning of the file.
+
+        Returns
+        -------
+        numpy.ndarray
+            Total atoms for initial conditions, indexed by material on this
+            process then by nuclide.
+        """
+
+        return np.array(self.results.number[0, 0, self._low:self._high])
+
+    def eval(self, vec, print_out=True):
+        """ Returns the next recorded evaluation.
+
+        Parameters
+        ----------
+        vec : numpy.ndarray
+            Total atoms, ignored.
+        print_out : bool, optional
+            Ignored, as no transport is run.
+
+        Returns
+        -------
+        k : float
+            Recorded eigenvalue.
+        rates : ReactionRates
+            Recorded reaction rates.
+        seed : int
+            Recorded seed.
+        """
+
+        if self.n_evals >= len(self._schedule):
+            raise ValueError("No recorded evaluation left to replay")
+
+        step, stage, time = self._schedule[self.n_evals]
+        self.n_evals += 1
+
+        if self.interpolate:
+            k, rates, seed = self._interpolate(time)
+        else:
+            k = self.results.k[step, stage]
+            seed = self.results.seeds[step, stage]
+            rates = self._read_rates(step, stage)
+
+        reaction_rates = ReactionRates(
+            OrderedDict((mat, i) for i, mat in enumerate(self.burn_list)),
+            self._rxn_nuc_to_ind, self._rxn_to_ind, self._pairs)
+        reaction_rates.rates = rates
+
+        return k, reaction_rates, int(seed)
+
+    def get_results_info(self):
+        """ Returns volume list, material lists, and nuc lists.
+
+        Returns
+        -------
+        volume : dict of str float
+            Volumes corresponding to materials in full_burn_dict
+        nuc_list : list of str
+            A list of all nuclide names. Used for sorting the simulation.
+        burn_list : list of int
+            A list of all material IDs to be burned.  Used for sorting the
+            simulation.
+        full_burn_dict : OrderedDict of str to int
+            Maps material name to index in global geometry.
+        """
+
+        return (dict(self.results.volume), self._nuc_list, self.burn_list,
+                OrderedDict(self.results.mat_to_ind))
+
+    def form_matrix(self, y, mat):
+        """ Forms the depletion matrix.
+
+        Parameters
+        ----------
+        y : numpy.ndarray
+            An array representing reaction rates for this cell.
+        mat : int
+            Material id.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Sparse matrix representing the depletion matrix.
+        """
+
+        return self.chain.form_matrix(y[mat, :, :])
+
+    def _read_rates(self, step, stage):
+        """ Reads the rates of this process for one recorded evaluation. """
+
+        rates = self.results.rates
+        if self._pairs is not None:
+            # The replayed rates hold the stored pairs as they are
+            rates = rates.dset
+
+        return np.array(rates[step, stage, self._low:self._high],
+                        dtype=np.float64)
+
+    def _interpolate(self, time):
+        """ Interpolates the recorded evaluations to time.
+
+        Times outside of the file use the nearest recorded evaluation.
+
+        Parameters
+        ----------
+        time : float
+            Time to interpolate to.
+
+        Returns
+        -------
+        k : float
+            Interpolated eigenvalue.
+        rates : numpy.ndarray
+            Interpolated reaction rates of this process.
+        seed : int
+            Seed of the last recorded evaluation at or before time.
+        """
+
+        times = self._times
+        upper = int(np.clip(np.searchsorted(times, time), 1, len(times) - 1))
+        lower = upper - 1
+
+        if len(times) == 1:
+            lower = upper = 0
+            weight = 0.0
+        else:
+            weight = (time - times[lower]) / (times[upper] - times[lower])
+            weight = float(np.clip(weight, 0.0, 1.0))
+
+        k = 0.0
+        rates = 0.0
+        for index, factor in ((lower, 1.0 - weight), (upper, weight)):
+            entries = self._at_time[index]
+            for step, stage in entries:
+                k += factor * self.results.k[step, stage] / len(entries)
+                if factor != 0.0:
+                    rates = rates + factor / len(entries) * \
+                        self._read_rates(step, stage)
+
+        step, stage = self._at_time[upper if weight == 1.0 else lower][0]
+        seed = self.results.seeds[step, stage]
+
+        return k, rates, seed
+
+
+def _sorted_keys(to_ind):
+    """ Returns the keys of an index dictionary ordered by index. """
+
+    return sorted(to_ind, key=lambda key: to_ind[key])
+
+
+def _eval_schedule(integrator, dt_vec, n_stages, t_start=0.0):
+    """ Returns the transport evaluations an integrator makes.
+
+    Parameters
+    ----------
+    integrator : str
+        "predictor", "cecm" or "sie".
+    dt_vec : iterable of float
+        Time steps.
+    n_stages : int
+        Number of stages stored for each step, used for the number of sie
+        iterations.
+    t_start : float, optional
+        Time at the beginning of the first step.
+
+    Returns
+    -------
+    list of tuple
+        Step, stage and time of each evaluation, in order.
+    """
+
+    dt_vec = list(dt_vec)
+    t = t_start + np.concatenate(([0.0], np.cumsum(dt_vec)))
+
+    evals = []
+    for i, dt in enumerate(dt_vec):
+        if integrator == "predictor":
+            evals.append((i, 0, t[i]))
+        elif integrator == "cecm":
+            evals.append((i, 0, t[i]))
+            evals.append((i, 1, t[i] + dt / 2))
+        else:
+            # Only the first step evaluates the beginning of step, every
+            # iteration evaluates the end of step
+            if i == 0:
+                evals.append((i, 0, t[i]))
+            for j in range(1, n_stages):
+                evals.append((i, j, t[i + 1]))
+
+    evals.append((len(dt_vec), 0, t[-1]))
+
+    return evals
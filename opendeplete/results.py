@@ -5,14 +5,27 @@ Contains results generation and saving capabilities.
 
 from collections import OrderedDict
 import copy
+import time
 
 import numpy as np
 import h5py
+from h5py import h5fd, h5p, h5s
 
-from . import comm, have_mpi
+from .indexing import name_index, outer_index
 from .reaction_rates import ReactionRates
 
-RESULTS_VERSION = 2
+RESULTS_VERSION = 4
+
+# Oldest file version that can still be read
+RESULTS_VERSION_MIN = 2
+
+# Target size of a single chunk of the number and reaction rate datasets
+CHUNK_BYTES = 256 * 1024
+
+# Steps per chunk of the number and reaction rate datasets.  A time series
+# reads one chunk per CHUNK_STEPS steps, at the cost of reading CHUNK_STEPS
+# steps of a block to read one.
+CHUNK_STEPS = 8
 
 class Results(object):
     """ Contains output of opendeplete.
@@ -45,6 +58,15 @@ class Results(object):
         Number of stages in simulation.
     data : numpy.array
         Atom quantity, stored by stage, mat, then by nuclide.
+    output_rates : str
+        Which reaction rates are stored, "all" stages, only the beginning of
+        step ("bos") or "none".
+    burn_mat_ind : list of int
+        Indices of the stored materials in the burn list, or None if all
+        materials are stored.
+    burn_nuc_ind : list of int
+        Indices of the stored nuclides in the nuclide list, or None if all
+        nuclides are stored.
     """
 
     def __init__(self):
@@ -61,9 +83,22 @@ class Results(object):
 
         self.data = None
 
-    def allocate(self, volume, nuc_list, burn_list, full_burn_dict, stages):
+        self.output_rates = "all"
+        self.burn_mat_ind = None
+        self.burn_nuc_ind = None
+
+        # Sorted name arrays for looking up lists of names
+        self._index_cache = {}
+
+    def allocate(self, volume, nuc_list, burn_list, full_burn_dict, stages,
+                 nuclides=None, materials=None, rates="all"):
         """ Allocates memory of Results.
 
+        Only the nuclides and materials selected for output are allocated.
+        Stored materials are renumbered contiguously in the file, in the order
+        of full_burn_dict, and the resulting index maps are what create_hdf5
+        records.
+
         Parameters
         ----------
         volume : dict of str float
@@ -76,12 +111,46 @@ class Results(object):
             Map of material name to id in global geometry.
         stages : int
             Number of stages in simulation.
+        nuclides : list of str, optional
+            Nuclides to store.  Names not in nuc_list are ignored.  All are
+            stored if not given.
+        materials : list of str, optional
+            Materials to store.  All are stored if not given.
+        rates : str, optional
+            Which reaction rates to store, "all" stages (default), only the
+            beginning of step ("bos") or "none".
         """
 
-        self.volume = copy.deepcopy(volume)
+        if rates not in ("all", "bos", "none"):
+            raise ValueError('Unknown reaction rate output "{}"'.format(rates))
+
+        self.output_rates = rates
         self.nuc_to_ind = OrderedDict()
         self.mat_to_ind = OrderedDict()
-        self.mat_to_hdf5_ind = copy.deepcopy(full_burn_dict)
+
+        if materials is None:
+            self.volume = copy.deepcopy(volume)
+            self.mat_to_hdf5_ind = copy.deepcopy(full_burn_dict)
+            self.burn_mat_ind = None
+        else:
+            materials = set(str(mat) for mat in materials)
+            kept = sorted((mat for mat in full_burn_dict if mat in materials),
+                          key=lambda mat: full_burn_dict[mat])
+
+            self.volume = {mat: volume[mat] for mat in kept}
+            self.mat_to_hdf5_ind = OrderedDict(
+                (mat, i) for i, mat in enumerate(kept))
+            self.burn_mat_ind = [i for i, mat in enumerate(burn_list)
+                                 if mat in materials]
+            burn_list = [burn_list[i] for i in self.burn_mat_ind]
+
+        if nuclides is None:
+            self.burn_nuc_ind = None
+        else:
+            nuclides = set(nuclides)
+            self.burn_nuc_ind = [i for i, nuc in enumerate(nuc_list)
+                                 if nuc in nuclides]
+            nuc_list = [nuc_list[i] for i in self.burn_nuc_ind]
 
         for i, mat in enumerate(burn_list):
             self.mat_to_ind[mat] = i
@@ -92,6 +161,79 @@ class Results(object):
         # Create storage array
         self.data = np.zeros((stages, self.n_mat, self.n_nuc))
 
+    def select_number(self, x):
+        """ Selects the stored materials and nuclides from a state.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Total atoms, indexed by stage, burnable material, then burnable
+            nuclide.
+
+        Returns
+        -------
+        numpy.ndarray
+            Total atoms of the stored materials and nuclides.
+        """
+
+        x = np.asarray(x)
+
+        if self.burn_mat_ind is None and self.burn_nuc_ind is None:
+            return x
+
+        mat_ind = self.burn_mat_ind
+        nuc_ind = self.burn_nuc_ind
+        if mat_ind is None:
+            mat_ind = range(x.shape[1])
+        if nuc_ind is None:
+            nuc_ind = range(x.shape[2])
+
+        return x[np.ix_(range(x.shape[0]), mat_ind, nuc_ind)]
+
+    def select_rates(self, rates):
+        """ Selects the stored stages, materials and nuclides of rates.
+
+        Parameters
+        ----------
+        rates : list of ReactionRates
+            The reaction rates for each stage.
+
+        Returns
+        -------
+        list of ReactionRates
+            The reaction rates to store.  These are the inputs themselves if
+            no materials or nuclides are filtered.
+        """
+
+        if self.output_rates == "none":
+            return []
+        elif self.output_rates == "bos":
+            rates = rates[:1]
+
+        if self.burn_mat_ind is None and self.burn_nuc_ind is None:
+            return list(rates)
+
+        selected = []
+        for rate in rates:
+            mat_ind = [rate.mat_to_ind[mat] for mat in self.mat_to_ind]
+            nucs = sorted((nuc for nuc in rate.nuc_to_ind
+                           if nuc in self.nuc_to_ind),
+                          key=lambda nuc: rate.nuc_to_ind[nuc])
+            nuc_ind = [rate.nuc_to_ind[nuc] for nuc in nucs]
+
+            new_rate = ReactionRates(
+                OrderedDict((mat, i) for i, mat in enumerate(self.mat_to_ind)),
+                OrderedDict((nuc, i) for i, nuc in enumerate(nucs)),
+                rate.react_to_ind, _select_pairs(rate.pairs, nuc_ind))
+            if rate.pairs is None:
+                new_rate.rates = rate.rates[np.ix_(mat_ind, nuc_ind)]
+            else:
+                kept = np.flatnonzero(np.isin(rate.pairs[:, 0], nuc_ind))
+                new_rate.rates = rate.rates[np.ix_(mat_ind, kept)]
+            selected.append(new_rate)
+
+        return selected
+
     @property
     def n_mat(self):
         """Number of mats."""
@@ -119,8 +261,10 @@ class Results(object):
         ----------
         pos : tuple
             A three-length tuple containing a stage index, mat index and a nuc
-            index.  All can be integers or slices.  The second two can be
-            strings corresponding to their respective dictionary.
+            index.  All can be integers, slices, or lists or arrays of
+            integers.  The second two can be strings, or lists or arrays of
+            strings, corresponding to their respective dictionary.  Lists on
+            several axes select their outer product.
 
         Returns
         -------
@@ -128,13 +272,7 @@ class Results(object):
             The atoms for stage, mat, nuc
         """
 
-        stage, mat, nuc = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
-
-        return self.data[stage, mat, nuc]
+        return self.data[self._index(*pos)]
 
     def __setitem__(self, pos, val):
         """ Sets an item from results.
@@ -143,28 +281,55 @@ class Results(object):
         ----------
         pos : tuple
             A three-length tuple containing a stage index, mat index and a nuc
-            index.  All can be integers or slices.  The second two can be
-            strings corresponding to their respective dictionary.
+            index.  All can be integers, slices, or lists or arrays of
+            integers.  The second two can be strings, or lists or arrays of
+            strings, corresponding to their respective dictionary.  Lists on
+            several axes select their outer product.
 
         val : float
             The value to set data to.
         """
 
-        stage, mat, nuc = pos
-        if isinstance(mat, str):
-            mat = self.mat_to_ind[mat]
-        if isinstance(nuc, str):
-            nuc = self.nuc_to_ind[nuc]
+        self.data[self._index(*pos)] = val
 
-        self.data[stage, mat, nuc] = val
+    def _index(self, stage, mat, nuc):
+        """ Translates a stage, material and nuclide index. """
 
-    def create_hdf5(self, handle):
+        mat = name_index(mat, self.mat_to_ind, self._index_cache)
+        nuc = name_index(nuc, self.nuc_to_ind, self._index_cache)
+
+        return outer_index((stage, mat, nuc), self.data.shape)
+
+    def create_hdf5(self, handle, n_steps=1, compression=None,
+                    compression_opts=None, shuffle=False, rates_dtype='float64',
+                    extendable=True):
         """ Creates file structure for a blank HDF5 file.
 
+        If the number of steps is fixed and no filter is applied, the number
+        and reaction rate datasets are contiguous, which ResultsFile
+        memory-maps.  Otherwise each chunk holds up to CHUNK_STEPS steps of a
+        single stage, with the material and nuclide axes split into blocks
+        such that chunks are at most CHUNK_BYTES, so that time series of a few
+        materials or nuclides read few chunks and not the whole file.
+
         Parameters
         ----------
         handle : h5py.File or h5py.Group
             An hdf5 file or group type to store this in.
+        n_steps : int, optional
+            Number of steps to preallocate.
+        compression : str, optional
+            Filter for the number and reaction rate datasets, "gzip" or "lzf".
+            Writing filtered datasets in parallel requires HDF5 1.10.2 or
+            newer.
+        compression_opts : int, optional
+            Compression level for "gzip".
+        shuffle : bool, optional
+            Whether or not to apply the shuffle filter before compression.
+        rates_dtype : str, optional
+            Storage type of the reaction rates, "float64" or "float32".
+        extendable : bool, optional
+            Whether datasets can be extended past n_steps.
         """
 
         # Create and save the 5 dictionaries:
@@ -180,60 +345,118 @@ class Results(object):
 
         handle.create_dataset("version", data=RESULTS_VERSION)
 
+        if self.rates:
+            rxn_nuc_to_ind = self.rates[0].nuc_to_ind
+            rxn_to_ind = self.rates[0].react_to_ind
+        else:
+            rxn_nuc_to_ind = {}
+            rxn_to_ind = {}
+
         mat_int = sorted([int(mat) for mat in self.mat_to_hdf5_ind])
         mat_list = [str(mat) for mat in mat_int]
         nuc_list = sorted(self.nuc_to_ind.keys())
-        rxn_list = sorted(self.rates[0].react_to_ind.keys())
+        rxn_list = sorted(rxn_to_ind.keys())
 
         n_mats = self.n_hdf5_mats
         n_nuc_number = len(nuc_list)
-        n_nuc_rxn = len(self.rates[0].nuc_to_ind)
+        n_nuc_rxn = len(rxn_nuc_to_ind)
         n_rxn = len(rxn_list)
         n_stages = self.n_stages
 
+        # Metadata is stored as parallel arrays of names and indices, a
+        # reaction rate index of -1 marks nuclides without reaction rates
         mat_group = handle.create_group("cells")
-
-        for mat in mat_list:
-            mat_single_group = mat_group.create_group(mat)
-            mat_single_group.attrs["index"] = self.mat_to_hdf5_ind[mat]
-            mat_single_group.attrs["volume"] = self.volume[mat]
+        mat_group.create_dataset("names", data=np.array(mat_list, dtype='S'))
+        mat_group.create_dataset(
+            "index", data=[self.mat_to_hdf5_ind[mat] for mat in mat_list],
+            dtype='int64')
+        mat_group.create_dataset(
+            "volume", data=[self.volume[mat] for mat in mat_list],
+            dtype='float64')
 
         nuc_group = handle.create_group("nuclides")
-
-        for nuc in nuc_list:
-            nuc_single_group = nuc_group.create_group(nuc)
-            nuc_single_group.attrs["atom number index"] = self.nuc_to_ind[nuc]
-            if nuc in self.rates[0].nuc_to_ind:
-                nuc_single_group.attrs["reaction rate index"] = self.rates[0].nuc_to_ind[nuc]
+        nuc_group.create_dataset("names", data=np.array(nuc_list, dtype='S'))
+        nuc_group.create_dataset(
+            "atom number index", data=[self.nuc_to_ind[nuc] for nuc in nuc_list],
+            dtype='int64')
+        nuc_group.create_dataset(
+            "reaction rate index",
+            data=[rxn_nuc_to_ind.get(nuc, -1) for nuc in nuc_list],
+            dtype='int64')
 
         rxn_group = handle.create_group("reactions")
+        rxn_group.create_dataset("names", data=np.array(rxn_list, dtype='S'))
+        rxn_group.create_dataset(
+            "index", data=[rxn_to_ind[rxn] for rxn in rxn_list],
+            dtype='int64')
 
-        for rxn in rxn_list:
-            rxn_single_group = rxn_group.create_group(rxn)
-            rxn_single_group.attrs["index"] = self.rates[0].react_to_ind[rxn]
+        # Only the rates of these nuclide and reaction index pairs are stored
+        pairs = self.rates[0].pairs if self.rates else None
+        if pairs is not None:
+            rxn_group.create_dataset("pairs", data=pairs, dtype='int64')
 
         # Construct array storage
 
-        handle.create_dataset("number", (1, n_stages, n_mats, n_nuc_number),
-                              maxshape=(None, n_stages, n_mats, n_nuc_number),
-                              chunks=(1, 1, n_mats, n_nuc_number),
-                              dtype='float64')
-
-        handle.create_dataset("reaction rates", (1, n_stages, n_mats, n_nuc_rxn, n_rxn),
-                              maxshape=(None, n_stages, n_mats, n_nuc_rxn, n_rxn),
-                              chunks=(1, 1, n_mats, n_nuc_rxn, n_rxn),
-                              dtype='float64')
-
-        handle.create_dataset("eigenvalues", (1, n_stages),
-                              maxshape=(None, n_stages), dtype='float64')
-
-        handle.create_dataset("seeds", (1, n_stages), maxshape=(None, n_stages), dtype='int64')
-
-        handle.create_dataset("time", (1, 2), maxshape=(None, 2), dtype='float64')
+        filters = {'compression': compression,
+                   'compression_opts': compression_opts,
+                   'shuffle': shuffle}
+
+        # Chunks of a fixed number of steps cannot extend past them
+        if extendable:
+            step_chunks = CHUNK_STEPS
+        else:
+            step_chunks = max(1, min(n_steps, CHUNK_STEPS))
+
+        number_shape = (n_steps, n_stages, n_mats, n_nuc_number)
+        number_chunks = (step_chunks, 1) + _chunk_shape(
+            (n_mats, n_nuc_number), 8 * step_chunks)
+        handle.create_dataset("number", number_shape, dtype='float64',
+                              **_storage(number_shape, number_chunks,
+                                         extendable, filters))
+
+        # Reaction rates are stored for every stage, only the first, or not
+        # at all
+        if self.output_rates != "none":
+            n_rxn_stages = n_stages if self.output_rates == "all" else 1
+
+            rates_itemsize = np.dtype(rates_dtype).itemsize
+            if pairs is not None:
+                n_pairs = len(pairs)
+                rxn_shape = (n_steps, n_rxn_stages, n_mats, n_pairs)
+                rxn_chunks = (step_chunks, 1) + _chunk_shape(
+                    (n_mats, n_pairs), rates_itemsize * step_chunks)
+            else:
+                rxn_shape = (n_steps, n_rxn_stages, n_mats, n_nuc_rxn, n_rxn)
+                rxn_chunks = (step_chunks, 1) + _chunk_shape(
+                    (n_mats, n_nuc_rxn),
+                    rates_itemsize * n_rxn * step_chunks) + (n_rxn,)
+            handle.create_dataset("reaction rates", rxn_shape,
+                                  dtype=rates_dtype,
+                                  **_storage(rxn_shape, rxn_chunks,
+                                             extendable, filters))
+
+        for name, shape, dtype in (("eigenvalues", (n_steps, n_stages), 'float64'),
+                                   ("seeds", (n_steps, n_stages), 'int64'),
+                                   ("time", (n_steps, 2), 'float64')):
+            if extendable:
+                handle.create_dataset(name, shape, dtype=dtype,
+                                      maxshape=(None,) + shape[1:])
+            else:
+                handle.create_dataset(name, shape, dtype=dtype)
+
+        # Number of steps written, as the datasets may be preallocated
+        handle.create_dataset("steps", data=0, dtype='int64')
 
     def to_hdf5(self, handle, index):
         """ Converts results object into an hdf5 object.
 
+        Each process writes all stages of its materials in a single call per
+        dataset, selecting the runs of consecutive file indices its
+        materials occupy, which need not be contiguous.  With the mpio driver
+        these are collective transfers, in which processes without stored
+        materials take part with an empty selection.  The eigenvalues, seeds
+        and time are written by rank 0 alone.
+
         Parameters
         ----------
         handle : h5py.File or h5py.Group
@@ -243,65 +466,62 @@ class Results(object):
         """
 
         if "/number" not in handle:
-            comm.barrier()
             self.create_hdf5(handle)
 
-        comm.barrier()
-
         # Grab handles
         number_dset = handle["/number"]
-        rxn_dset = handle["/reaction rates"]
         eigenvalues_dset = handle["/eigenvalues"]
         seeds_dset = handle["/seeds"]
         time_dset = handle["/time"]
+        rxn_dset = handle.get("/reaction rates")
 
-        # Get number of results stored
-        number_shape = list(number_dset.shape)
-        number_results = number_shape[0]
+        dsets = [number_dset, eigenvalues_dset, seeds_dset, time_dset]
+        if rxn_dset is not None:
+            dsets.append(rxn_dset)
 
+        # Extend first dimension to fit this step
         new_shape = index + 1
-
-        if number_results < new_shape:
-            # Extend first dimension by 1
-            number_shape[0] = new_shape
-            number_dset.resize(number_shape)
-
-            rxn_shape = list(rxn_dset.shape)
-            rxn_shape[0] = new_shape
-            rxn_dset.resize(rxn_shape)
-
-            eigenvalues_shape = list(eigenvalues_dset.shape)
-            eigenvalues_shape[0] = new_shape
-            eigenvalues_dset.resize(eigenvalues_shape)
-
-            seeds_shape = list(seeds_dset.shape)
-            seeds_shape[0] = new_shape
-            seeds_dset.resize(seeds_shape)
-
-            time_shape = list(time_dset.shape)
-            time_shape[0] = new_shape
-            time_dset.resize(time_shape)
-
-        # If nothing to write, just return
-        if len(self.mat_to_ind) == 0:
-            return
+        if number_dset.shape[0] < new_shape:
+            if number_dset.maxshape[0] is not None:
+                raise ValueError("Step {} is past the {} steps allocated"
+                                 .format(index, number_dset.shape[0]))
+            for dset in dsets:
+                shape = list(dset.shape)
+                shape[0] = new_shape
+                dset.resize(shape)
 
         # Add data
         # Note, for the last step, self.n_stages = 1, even if n_stages != 1.
-        n_stages = self.n_stages
-        inds = [self.mat_to_hdf5_ind[mat] for mat in self.mat_to_ind]
-        low = min(inds)
-        high = max(inds)
-        for i in range(n_stages):
-            number_dset[index, i, low:high+1, :] = self.data[i, :, :]
-            rxn_dset[index, i, low:high+1, :, :] = self.rates[i][:, :, :]
-            if comm.rank == 0:
-                eigenvalues_dset[index, i] = self.k[i]
-                seeds_dset[index, i] = self.seeds[i]
+        # Materials are written in the order of their file index.
+        hdf5_ind = np.array([self.mat_to_hdf5_ind[mat]
+                             for mat in self.mat_to_ind], dtype=int)
+        order = np.argsort(hdf5_ind)
+        runs = _index_runs(hdf5_ind[order])
+        collective = handle.file.driver == "mpio"
+
+        _write_materials(number_dset, index, runs, self.data[:, order, :],
+                         collective)
+
+        if rxn_dset is not None:
+            if rxn_dset.ndim == 4:
+                rates = np.stack([rate.compact() for rate in self.rates])
+            else:
+                rates = np.stack([rate[:, :, :] for rate in self.rates])
+            _write_materials(rxn_dset, index, runs, rates[:, order],
+                             collective)
+
+        from . import comm
+
         if comm.rank == 0:
+            n_stages = self.n_stages
+            eigenvalues_dset[index, :n_stages] = self.k[:n_stages]
+            seeds_dset[index, :n_stages] = self.seeds[:n_stages]
             time_dset[index, :] = self.time
 
-    def from_hdf5(self, handle, index):
+            steps_dset = handle["/steps"]
+            steps_dset[()] = max(steps_dset[()], index + 1)
+
+    def from_hdf5(self, handle, index, metadata=None):
         """ Loads results object from HDF5.
 
         Parameters
@@ -310,8 +530,14 @@ class Results(object):
             An hdf5 file or group type to load from.
         index : int
             What step is this?
+        metadata : tuple, optional
+            Index dictionaries as returned by read_metadata.  Read from handle
+            if not given.
         """
 
+        if metadata is None:
+            metadata = read_metadata(handle)
+
         # Grab handles
         number_dset = handle["/number"]
         eigenvalues_dset = handle["/eigenvalues"]
@@ -323,40 +549,646 @@ class Results(object):
         self.seeds = seeds_dset[index, :]
         self.time = time_dset[index, :]
 
-        # Reconstruct dictionaries
-        self.volume = OrderedDict()
-        self.mat_to_ind = OrderedDict()
-        self.nuc_to_ind = OrderedDict()
-        rxn_nuc_to_ind = OrderedDict()
-        rxn_to_ind = OrderedDict()
+        self.volume, self.mat_to_ind, self.nuc_to_ind, rxn_nuc_to_ind, \
+            rxn_to_ind = metadata
 
-        for mat in handle["/cells"]:
-            mat_handle = handle["/cells/" + mat]
-            vol = mat_handle.attrs["volume"]
-            ind = mat_handle.attrs["index"]
+        self.rates = []
+        if "/reaction rates" not in handle:
+            return
 
-            self.volume[mat] = vol
-            self.mat_to_ind[mat] = ind
+        # Reconstruct reactions, which may be stored for the first stage only
+        # and for the nuclide and reaction pairs of the chain only
+        rates = handle["/reaction rates"][index]
+        pairs = _read_pairs(handle)
+        for i in range(rates.shape[0]):
+            rate = ReactionRates(self.mat_to_ind, rxn_nuc_to_ind, rxn_to_ind,
+                                 pairs)
+
+            if pairs is None:
+                rate.rates = rates[i]
+            else:
+                rate.set_compact(rates[i])
+            self.rates.append(rate)
 
-        for nuc in handle["/nuclides"]:
-            nuc_handle = handle["/nuclides/" + nuc]
-            ind_atom = nuc_handle.attrs["atom number index"]
-            self.nuc_to_ind[nuc] = ind_atom
 
-            if "reaction rate index" in nuc_handle.attrs:
-                rxn_nuc_to_ind[nuc] = nuc_handle.attrs["reaction rate index"]
+class ResultsFile(object):
+    """ Lazy, read-only access to a results file.
 
-        for rxn in handle["/reactions"]:
-            rxn_handle = handle["/reactions/" + rxn]
-            rxn_to_ind[rxn] = rxn_handle.attrs["index"]
+    The file is kept open and the index dictionaries are read once.  The
+    number and reaction rate datasets are exposed without being loaded, so
+    only what is indexed is read.  Contiguous, unfiltered datasets are
+    memory-mapped; chunked ones are returned as h5py datasets.  Indexing or
+    iterating over the file materializes Results one step at a time.
 
-        self.rates = []
-        # Reconstruct reactions
-        for i in range(self.n_stages):
-            rate = ReactionRates(self.mat_to_ind, rxn_nuc_to_ind, rxn_to_ind)
+    Parameters
+    ----------
+    filename : str or h5py.File
+        The filename to read from, or a file already open for reading.  An
+        open file is left open by close.
+    swmr : bool, optional
+        Whether to open the file as a single-writer/multiple-reader (SWMR)
+        reader, so that steps written by a running ResultsWriter with swmr
+        enabled can be followed with tail.
+
+    Attributes
+    ----------
+    filename : str
+        The filename read from.
+    handle : h5py.File
+        The open file, or None if closed.
+    n_steps : int
+        Number of steps written to the file.
+    number : h5py.Dataset or numpy.memmap
+        Atom quantity, indexed by step, stage, mat, then nuclide.
+    rates : h5py.Dataset, numpy.memmap or CompactRates
+        Reaction rates, indexed by step, stage, mat, nuclide, then reaction.
+        A CompactRates view if only the rates of the nuclide and reaction
+        pairs of the chain were stored.  None if reaction rates were not
+        stored.
+    k : numpy.array
+        Eigenvalues, indexed by step then stage.
+    seeds : numpy.array
+        Seeds, indexed by step then stage.
+    time : numpy.array
+        Time at beginning, end of each step, in seconds.
+    volume : OrderedDict of str to float
+        Dictionary mapping mat id to volume.
+    mat_to_ind : OrderedDict of str to int
+        A dictionary mapping mat ID as string to index.
+    nuc_to_ind : OrderedDict of str to int
+        A dictionary mapping nuclide name as string to index in number.
+    rxn_nuc_to_ind : OrderedDict of str to int
+        A dictionary mapping nuclide name as string to index in rates.
+    rxn_to_ind : OrderedDict of str to int
+        A dictionary mapping reaction name as string to index in rates.
+    """
+
+    def __init__(self, filename, swmr=False):
+        if isinstance(filename, h5py.File):
+            self.handle = filename
+            self.filename = filename.filename
+            self._owns_handle = False
+        elif swmr:
+            self.handle = h5py.File(filename, "r", libver="latest", swmr=True)
+            self.filename = filename
+            self._owns_handle = True
+        else:
+            self.handle = h5py.File(filename, "r")
+            self.filename = filename
+            self._owns_handle = True
+
+        self.swmr = self.handle.swmr_mode
+
+        # Datasets refreshed by an SWMR reader.  Refreshing requires that no
+        # other identifier of the same dataset is open, so these are kept.
+        self._dsets = {}
+        if self.swmr:
+            for name, dset in self.handle.items():
+                if isinstance(dset, h5py.Dataset):
+                    self._dsets[name] = dset
+
+        version = self.handle["/version"][()]
+        assert RESULTS_VERSION_MIN <= version <= RESULTS_VERSION
+
+        self.metadata = read_metadata(self.handle)
+        self.volume, self.mat_to_ind, self.nuc_to_ind, self.rxn_nuc_to_ind, \
+            self.rxn_to_ind = self.metadata
+
+        self.number = self._dsets.get("number", self.handle["/number"])
+        self.rates = self._dsets.get("reaction rates",
+                                     self.handle.get("/reaction rates"))
+
+        # Data in a file that is still being written must not be mapped
+        if not self.swmr:
+            self.number = _dataset_view(self.filename, self.number)
+            if self.rates is not None:
+                self.rates = _dataset_view(self.filename, self.rates)
+
+        pairs = _read_pairs(self.handle)
+        if self.rates is not None and pairs is not None:
+            self.rates = CompactRates(self.rates, pairs,
+                                      len(self.rxn_nuc_to_ind),
+                                      len(self.rxn_to_ind))
+
+        self._k = None
+        self._seeds = None
+        self._time = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.n_steps
+
+    def __getitem__(self, index):
+        """ Materializes a single step.
+
+        Parameters
+        ----------
+        index : int
+            What step is this?
+
+        Returns
+        -------
+        Results
+            The results of that step.
+        """
+
+        if index < 0:
+            index += self.n_steps
+        if not 0 <= index < self.n_steps:
+            raise IndexError("step {} out of range".format(index))
+
+        result = Results()
+        result.from_hdf5(self.handle, index, self.metadata)
+
+        return result
+
+    def __iter__(self):
+        for i in range(self.n_steps):
+            yield self[i]
+
+    def close(self):
+        """ Closes the file, unless it was opened by the caller. """
+
+        if self.handle is not None:
+            self._dsets = {}
+            if self._owns_handle:
+                self.handle.close()
+            self.handle = None
+
+    def refresh(self):
+        """ Makes steps written since opening visible to an SWMR reader.
+
+        The cached eigenvalues, seeds and times are dropped.
+        """
+
+        for dset in self._dsets.values():
+            dset.refresh()
+
+        self._k = None
+        self._seeds = None
+        self._time = None
+
+    def tail(self, poll_interval=1.0, timeout=None, start=0):
+        """ Yields steps as they are written.
+
+        The file is polled for new steps, and only the steps not yet yielded
+        are read.  Iteration ends once every preallocated step has been
+        written, or if no new step is written within timeout.
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            Seconds to wait between polls.
+        timeout : float, optional
+            Seconds without a new step after which to stop.  Waits forever if
+            not given.
+        start : int, optional
+            First step to yield.
+
+        Yields
+        ------
+        Results
+            The results of each step, in order.
+        """
+
+        index = start
+        last_step = time.time()
+
+        while True:
+            self.refresh()
+
+            n_steps = self.n_steps
+            while index < n_steps:
+                yield self[index]
+                index += 1
+                last_step = time.time()
+
+            if index >= self.number.shape[0]:
+                return
+            if timeout is not None and time.time() - last_step > timeout:
+                return
+
+            time.sleep(poll_interval)
+
+    @property
+    def n_steps(self):
+        """Number of steps written to the file."""
+        if "/steps" in self.handle:
+            return int(self.handle["/steps"][()])
+        return self.handle["/number"].shape[0]
+
+    @property
+    def k(self):
+        """Eigenvalues, indexed by step then stage."""
+        if self._k is None:
+            self._k = self.handle["/eigenvalues"][:self.n_steps]
+        return self._k
+
+    @property
+    def seeds(self):
+        """Seeds, indexed by step then stage."""
+        if self._seeds is None:
+            self._seeds = self.handle["/seeds"][:self.n_steps]
+        return self._seeds
+
+    @property
+    def time(self):
+        """Time at beginning, end of each step, in seconds."""
+        if self._time is None:
+            self._time = self.handle["/time"][:self.n_steps]
+        return self._time
+
+
+def read_metadata(handle):
+    """ Reads the index dictionaries shared by every step of a results file.
+
+    Files since version 3 store the names and indices as parallel arrays,
+    which are read in one call each.  Version 2 files, with one group per entry, are
+    also supported.
+
+    Parameters
+    ----------
+    handle : h5py.File or h5py.Group
+        An hdf5 file or group type to load from.
+
+    Returns
+    -------
+    volume : OrderedDict of str to float
+        Dictionary mapping mat id to volume.
+    mat_to_ind : OrderedDict of str to int
+        A dictionary mapping mat ID as string to index.
+    nuc_to_ind : OrderedDict of str to int
+        A dictionary mapping nuclide name as string to index in number.
+    rxn_nuc_to_ind : OrderedDict of str to int
+        A dictionary mapping nuclide name as string to index in reaction rates.
+    rxn_to_ind : OrderedDict of str to int
+        A dictionary mapping reaction name as string to index in reaction
+        rates.
+    """
+
+    if handle["/version"][()] < 3:
+        return _read_metadata_v2(handle)
+
+    volume = OrderedDict()
+    mat_to_ind = OrderedDict()
+    nuc_to_ind = OrderedDict()
+    rxn_nuc_to_ind = OrderedDict()
+    rxn_to_ind = OrderedDict()
+
+    mat_group = handle["/cells"]
+    mat_names = _decode_names(mat_group["names"])
+    for mat, ind, vol in zip(mat_names, mat_group["index"][()],
+                             mat_group["volume"][()]):
+        volume[mat] = vol
+        mat_to_ind[mat] = ind
+
+    nuc_group = handle["/nuclides"]
+    nuc_names = _decode_names(nuc_group["names"])
+    for nuc, ind_atom, ind_rxn in zip(nuc_names,
+                                      nuc_group["atom number index"][()],
+                                      nuc_group["reaction rate index"][()]):
+        nuc_to_ind[nuc] = ind_atom
+        if ind_rxn >= 0:
+            rxn_nuc_to_ind[nuc] = ind_rxn
+
+    rxn_group = handle["/reactions"]
+    rxn_names = _decode_names(rxn_group["names"])
+    for rxn, ind in zip(rxn_names, rxn_group["index"][()]):
+        rxn_to_ind[rxn] = ind
+
+    return volume, mat_to_ind, nuc_to_ind, rxn_nuc_to_ind, rxn_to_ind
+
+
+def _read_metadata_v2(handle):
+    """ Reads the index dictionaries from a version 2 results file.
+
+    Version 2 files store one group per cell, nuclide and reaction, with the
+    indices and volumes as attributes.
+
+    Parameters
+    ----------
+    handle : h5py.File or h5py.Group
+        An hdf5 file or group type to load from.
+
+    Returns
+    -------
+    tuple
+        As returned by read_metadata.
+    """
+
+    volume = OrderedDict()
+    mat_to_ind = OrderedDict()
+    nuc_to_ind = OrderedDict()
+    rxn_nuc_to_ind = OrderedDict()
+    rxn_to_ind = OrderedDict()
+
+    for mat in handle["/cells"]:
+        mat_handle = handle["/cells/" + mat]
+        vol = mat_handle.attrs["volume"]
+        ind = mat_handle.attrs["index"]
+
+        volume[mat] = vol
+        mat_to_ind[mat] = ind
+
+    for nuc in handle["/nuclides"]:
+        nuc_handle = handle["/nuclides/" + nuc]
+        ind_atom = nuc_handle.attrs["atom number index"]
+        nuc_to_ind[nuc] = ind_atom
+
+        if "reaction rate index" in nuc_handle.attrs:
+            rxn_nuc_to_ind[nuc] = nuc_handle.attrs["reaction rate index"]
+
+    for rxn in handle["/reactions"]:
+        rxn_handle = handle["/reactions/" + rxn]
+        rxn_to_ind[rxn] = rxn_handle.attrs["index"]
+
+    return volume, mat_to_ind, nuc_to_ind, rxn_nuc_to_ind, rxn_to_ind
+
+
+def _decode_names(dset):
+    """ Reads a dataset of fixed-length byte strings as a list of str. """
+
+    return [name.decode() for name in dset[()]]
 
-            rate.rates = handle["/reaction rates"][index, i, :, :, :]
-            self.rates.append(rate)
+
+def _read_pairs(handle):
+    """ Reads the nuclide and reaction index pairs of stored reaction rates.
+
+    Returns
+    -------
+    numpy.ndarray of int
+        Pairs indexing the last axis of the reaction rates, None if the rates
+        of every nuclide and reaction are stored.
+    """
+
+    pairs = handle.get("/reactions/pairs")
+    if pairs is None:
+        return None
+
+    return pairs[()].reshape(-1, 2)
+
+
+def _select_pairs(pairs, nuc_ind):
+    """ Restricts nuclide and reaction index pairs to a subset of nuclides.
+
+    Parameters
+    ----------
+    pairs : numpy.ndarray of int
+        Nuclide and reaction index pairs, or None.
+    nuc_ind : list of int
+        Sorted indices of the nuclides kept, which become 0, 1, ...
+
+    Returns
+    -------
+    numpy.ndarray of int
+        Pairs of the kept nuclides, renumbered, or None if pairs is None.
+    """
+
+    if pairs is None:
+        return None
+
+    nuc_ind = np.asarray(nuc_ind, dtype=int)
+    kept = np.isin(pairs[:, 0], nuc_ind)
+
+    return np.column_stack((np.searchsorted(nuc_ind, pairs[kept, 0]),
+                            pairs[kept, 1]))
+
+
+class CompactRates(object):
+    """ Dense view of reaction rates stored for index pairs only.
+
+    Results files from version 4 on store the rates of the nuclide and
+    reaction pairs of the depletion chain only.  This view indexes them as if
+    the full array were stored, by step, stage, mat, nuclide, then reaction,
+    and returns zero for every other pair.  Only the selected steps, stages
+    and materials are read.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset or numpy.memmap
+        Stored rates, indexed by step, stage, mat, then pair.
+    pairs : numpy.ndarray of int
+        Nuclide and reaction index of each pair.
+    n_nuc : int
+        Number of nuclides with reaction rates.
+    n_rxn : int
+        Number of reactions.
+
+    Attributes
+    ----------
+    dset : h5py.Dataset or numpy.memmap
+        Stored rates, indexed by step, stage, mat, then pair.
+    pairs : numpy.ndarray of int
+        Nuclide and reaction index of each pair.
+    """
+
+    def __init__(self, dset, pairs, n_nuc, n_rxn):
+        self.dset = dset
+        self.pairs = pairs
+        self._n_nuc = n_nuc
+        self._n_rxn = n_rxn
+
+        # Position of each nuclide and reaction in the stored pairs, -1 if
+        # not stored
+        self._pair_ind = np.full((n_nuc, n_rxn), -1, dtype=int)
+        self._pair_ind[pairs[:, 0], pairs[:, 1]] = np.arange(len(pairs))
+
+    @property
+    def shape(self):
+        """Shape of the dense rates."""
+        return tuple(self.dset.shape[:3]) + (self._n_nuc, self._n_rxn)
+
+    @property
+    def ndim(self):
+        """Number of dimensions of the dense rates."""
+        return 5
+
+    @property
+    def dtype(self):
+        """Data type of the rates."""
+        return self.dset.dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, pos):
+        if not isinstance(pos, tuple):
+            pos = (pos,)
+        pos = pos + (slice(None),) * (5 - len(pos))
+        lead, nuc, rxn = pos[:3], pos[3], pos[4]
+
+        # A single rate is one column of the stored array
+        if isinstance(nuc, (int, np.integer)) and \
+                isinstance(rxn, (int, np.integer)):
+            column = self._pair_ind[nuc, rxn]
+            data = np.asarray(self.dset[lead + (max(column, 0),)])
+            if column < 0:
+                return np.zeros_like(data)
+            return data
+
+        data = np.asarray(self.dset[lead + (slice(None),)])
+        dense = np.zeros(data.shape[:-1] + (self._n_nuc, self._n_rxn),
+                         dtype=data.dtype)
+        dense[..., self.pairs[:, 0], self.pairs[:, 1]] = data
+
+        return dense[..., nuc, rxn]
+
+
+def _dataset_view(filename, dset):
+    """ Memory-maps a dataset if its layout allows it.
+
+    Parameters
+    ----------
+    filename : str
+        File the dataset lives in.
+    dset : h5py.Dataset
+        The dataset to map.
+
+    Returns
+    -------
+    numpy.memmap or h5py.Dataset
+        A read-only memory map for contiguous, unfiltered datasets that have
+        been allocated, otherwise dset itself.
+    """
+
+    if dset.chunks is not None or dset.compression is not None:
+        return dset
+
+    offset = dset.id.get_offset()
+    if offset is None or dset.file.driver not in ("sec2", "stdio"):
+        return dset
+
+    return np.memmap(filename, dtype=dset.dtype, mode="r", offset=offset,
+                     shape=dset.shape)
+
+
+def _index_runs(inds):
+    """ Splits sorted indices into runs of consecutive indices.
+
+    Parameters
+    ----------
+    inds : numpy.ndarray
+        Sorted, unique indices.
+
+    Returns
+    -------
+    list of tuple of int
+        Start and length of each run.
+    """
+
+    if len(inds) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(inds) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(inds)]))
+
+    return [(int(inds[a]), int(b - a)) for a, b in zip(starts, ends)]
+
+
+def _write_materials(dset, index, runs, data, collective):
+    """ Writes the materials of one process for every stage of a step.
+
+    The file selection is the union of one hyperslab per run of materials,
+    so that the whole step is a single transfer.  An empty data array still
+    takes part in collective transfers with an empty selection.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset
+        Dataset indexed by step, stage, material, then any further axes.
+    index : int
+        What step is this?
+    runs : list of tuple of int
+        Start and length of each run of consecutive materials in the file.
+    data : numpy.ndarray
+        Data indexed by stage, material, then any further axes, with the
+        materials in the order of runs.
+    collective : bool
+        Whether to use a collective MPI-IO transfer.
+    """
+
+    data = np.ascontiguousarray(data, dtype=dset.dtype)
+    n_stages = data.shape[0]
+    tail = dset.shape[3:]
+
+    file_space = dset.id.get_space()
+    file_space.select_none()
+    for start, count in runs:
+        file_space.select_hyperslab(
+            (index, 0, start) + (0,) * len(tail), (1, n_stages, count) + tail,
+            op=h5s.SELECT_OR)
+
+    mem_space = h5s.create_simple(data.shape)
+    if data.size == 0:
+        mem_space.select_none()
+
+    dxpl = h5p.create(h5p.DATASET_XFER)
+    if collective:
+        dxpl.set_dxpl_mpio(h5fd.MPIO_COLLECTIVE)
+
+    dset.id.write(mem_space, file_space, data, dxpl=dxpl)
+
+
+def _storage(shape, chunks, extendable, filters):
+    """ Returns the layout arguments of a number or reaction rate dataset.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the dataset, indexed by step first.
+    chunks : tuple of int
+        Chunk shape, if the dataset is chunked.
+    extendable : bool
+        Whether the dataset can be extended along the step axis.
+    filters : dict
+        Compression arguments of create_dataset.
+
+    Returns
+    -------
+    dict
+        Arguments of create_dataset.  Empty for a contiguous dataset, which
+        is only possible if it is neither extendable nor filtered.
+    """
+
+    if not extendable and filters['compression'] is None \
+            and not filters['shuffle']:
+        return {}
+
+    maxshape = (None,) + shape[1:] if extendable else shape
+    return dict(maxshape=maxshape, chunks=chunks, **filters)
+
+
+def _chunk_shape(shape, itemsize):
+    """ Splits a 2D block into chunks of at most CHUNK_BYTES.
+
+    The largest axis is halved until the chunk fits, which keeps chunks
+    roughly square in materials and nuclides.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Number of materials and nuclides.
+    itemsize : int
+        Bytes per (material, nuclide) entry.
+
+    Returns
+    -------
+    tuple of int
+        Chunk extent along each axis.
+    """
+
+    chunks = [max(n, 1) for n in shape]
+    while chunks[0] * chunks[1] * itemsize > CHUNK_BYTES:
+        axis = 0 if chunks[0] >= chunks[1] else 1
+        chunks[axis] = (chunks[axis] + 1) // 2
+
+    return tuple(chunks)
 
 
 def get_dict(number):
@@ -393,6 +1225,33 @@ def get_dict(number):
     return mat_to_ind, nuc_to_ind
 
 
+def tail_results(filename, poll_interval=1.0, timeout=None):
+    """ Yields results steps from a file as a running simulation writes them.
+
+    The file must be written by a ResultsWriter with swmr enabled, and have
+    its first step written.  It is opened once, as an SWMR reader, and
+    earlier steps are not reread.
+
+    Parameters
+    ----------
+    filename : str
+        The filename to follow.
+    poll_interval : float, optional
+        Seconds to wait between polls for new steps.
+    timeout : float, optional
+        Seconds without a new step after which to stop.  Waits until every
+        step is written if not given.
+
+    Yields
+    ------
+    Results
+        The results of each step, in order.
+    """
+
+    with ResultsFile(filename, swmr=True) as res_file:
+        yield from res_file.tail(poll_interval, timeout)
+
+
 def write_results(result, filename, index):
     """ Outputs result to an .hdf5 file.
 
@@ -406,6 +1265,8 @@ def write_results(result, filename, index):
         What step is this?
     """
 
+    from . import comm, have_mpi
+
     if have_mpi and h5py.get_config().mpi:
         kwargs = {'driver': 'mpio', 'comm': comm}
     else:
@@ -417,6 +1278,120 @@ def write_results(result, filename, index):
         result.to_hdf5(handle, index)
 
 
+class ResultsWriter(object):
+    """ Writes results to an HDF5 file kept open for an entire run.
+
+    Unlike write_results, the file is opened once, all datasets are
+    preallocated for every step when the first step is written, and each
+    step only flushes the file.  Unless filtered or followed with swmr, the
+    number and reaction rate datasets are contiguous, such that ResultsFile
+    memory-maps them.  Intended to be used as a context manager.
+
+    Parameters
+    ----------
+    filename : str
+        Target filename.  Any existing file is overwritten.
+    n_steps : int
+        Number of steps to preallocate, usually len(dt_vec) + 1.  Only an
+        swmr file can be extended past this.
+    nuclides : list of str, optional
+        Nuclides to store.  All are stored if not given.
+    materials : list of str, optional
+        Materials to store.  All are stored if not given.
+    rates : str, optional
+        Which reaction rates to store, "all" stages (default), only the
+        beginning of step ("bos") or "none".
+    swmr : bool, optional
+        Whether to switch the file to single-writer/multiple-reader (SWMR)
+        mode once the datasets are created, such that readers can safely
+        follow the run with tail_results.  Not supported with parallel HDF5
+        over more than one process.
+    **kwargs
+        Storage options passed to Results.create_hdf5, such as compression,
+        compression_opts, shuffle and rates_dtype.
+
+    Attributes
+    ----------
+    filename : str
+        Target filename.
+    n_steps : int
+        Number of steps to preallocate.
+    selection : dict
+        Output selection passed to Results.allocate.
+    swmr : bool
+        Whether the file is written in SWMR mode.
+    options : dict
+        Storage options passed to Results.create_hdf5.
+    handle : h5py.File
+        The open file, or None if closed.
+    """
+
+    def __init__(self, filename, n_steps, nuclides=None, materials=None,
+                 rates="all", swmr=False, **kwargs):
+        self.filename = filename
+        self.n_steps = n_steps
+        self.selection = {'nuclides': nuclides, 'materials': materials,
+                          'rates': rates}
+        self.swmr = swmr
+        self.options = kwargs
+        self.handle = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        """ Opens the file, collectively if running under MPI. """
+
+        from . import comm, have_mpi
+
+        parallel = have_mpi and h5py.get_config().mpi
+
+        if self.swmr and parallel and comm.size > 1:
+            raise ValueError("SWMR output is not supported with parallel HDF5")
+
+        if self.swmr:
+            kwargs = {'libver': 'latest'}
+        elif parallel:
+            kwargs = {'driver': 'mpio', 'comm': comm}
+        else:
+            kwargs = {}
+
+        self.handle = h5py.File(self.filename, mode="w", **kwargs)
+
+    def close(self):
+        """ Closes the file. """
+
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+    def write(self, result, index):
+        """ Writes a single step and flushes the file.
+
+        Parameters
+        ----------
+        result : Results
+            Object to be stored in the file.
+        index : int
+            What step is this?
+        """
+
+        # All steps are preallocated, so that datasets can be contiguous,
+        # except while readers follow the file
+        if "/number" not in self.handle:
+            result.create_hdf5(self.handle, self.n_steps,
+                               extendable=self.swmr, **self.options)
+            if self.swmr:
+                self.handle.swmr_mode = True
+
+        result.to_hdf5(self.handle, index)
+        self.handle.flush()
+
+
 def read_results(filename):
     """ Reads out a list of results objects from an hdf5 file.
 
@@ -431,24 +1406,7 @@ def read_results(filename):
         The result objects.
     """
 
-    file = h5py.File(filename, "r")
-
-    assert file["/version"].value == RESULTS_VERSION
-
-    # Grab handles
-    number_dset = file["/number"]
-
-    # Get number of results stored
-    number_shape = list(number_dset.shape)
-    number_results = number_shape[0]
-
-    results = []
-
-    for i in range(number_results):
-        result = Results()
-        result.from_hdf5(file, i)
-        results.append(result)
-
-    file.close()
+    with ResultsFile(filename) as file:
+        results = list(file)
 
     return results
@@ -1,11 +1,19 @@
 """ The utilities module.
 
 Contains functions that can be used to post-process objects that come out of
-the results module.
+the results module.  The evaluate functions work on a list of loaded Results,
+while the series functions read time series directly from a results file,
+touching only the requested entries.
 """
 
+from collections import OrderedDict
+from contextlib import contextmanager
+import copy
+
 import numpy as np
 
+from .results import ResultsFile
+
 def evaluate_single_nuclide(results, cell, nuc):
     """ Evaluates a single nuclide in a single cell from a results list.
 
@@ -13,27 +21,24 @@ def evaluate_single_nuclide(results, cell, nuc):
     ----------
     results : list of results
         The results to extract data from.  Must be sorted and continuous.
-    cell : str
-        Cell name to evaluate
-    nuc : str
-        Nuclide name to evaluate
+    cell : str or list of str
+        Cell name or names to evaluate
+    nuc : str or list of str
+        Nuclide name or names to evaluate
 
     Returns
     -------
     time : numpy.array
         Time vector.
     concentration : numpy.array
-        Total number of atoms in the cell.
+        Total number of atoms in the cell, indexed by time, then by cell and
+        nuclide if lists are given.
     """
 
-    n_points = len(results)
-    time = np.zeros(n_points)
-    concentration = np.zeros(n_points)
+    time = np.array([result.time[0] for result in results])
 
     # Evaluate value in each region
-    for i, result in enumerate(results):
-        time[i] = result.time[0]
-        concentration[i] = result[0, cell, nuc]
+    concentration = np.array([result[0, cell, nuc] for result in results])
 
     return time, concentration
 
@@ -44,10 +49,10 @@ def evaluate_reaction_rate(results, cell, nuc, rxn):
     ----------
     results : list of Results
         The results to extract data from.  Must be sorted and continuous.
-    cell : str
-        Cell name to evaluate
-    nuc : str
-        Nuclide name to evaluate
+    cell : str or list of str
+        Cell name or names to evaluate
+    nuc : str or list of str
+        Nuclide name or names to evaluate
     rxn : str
         Reaction rate to evaluate
 
@@ -56,16 +61,15 @@ def evaluate_reaction_rate(results, cell, nuc, rxn):
     time : numpy.array
         Time vector.
     rate : numpy.array
-        Reaction rate.
+        Reaction rate, indexed by time, then by cell and nuclide if lists are
+        given.
     """
 
-    n_points = len(results)
-    time = np.zeros(n_points)
-    rate = np.zeros(n_points)
+    time = np.array([result.time[0] for result in results])
+
     # Evaluate value in each region
-    for i, result in enumerate(results):
-        time[i] = result.time[0]
-        rate[i] = result.rates[0][cell, nuc, rxn] * result[0, cell, nuc]
+    rate = np.array([result.rates[0][cell, nuc, rxn] * result[0, cell, nuc]
+                     for result in results])
 
     return time, rate
 
@@ -96,3 +100,361 @@ def evaluate_eigenvalue(results):
         eigenvalue[i] = result.k[0]
 
     return time, eigenvalue
+
+
+def nuclide_series(source, cells, nucs):
+    """ Reads total atoms of nuclides in cells from a results file.
+
+    Each nuclide is read as a single strided hyperslab over all steps, so
+    nothing else in the file is loaded.
+
+    Parameters
+    ----------
+    source : str, h5py.File or ResultsFile
+        Results file path or open handle.
+    cells : str or list of str
+        Cell name or names to evaluate.
+    nucs : str or list of str
+        Nuclide name or names to evaluate.
+
+    Returns
+    -------
+    time : numpy.array
+        Time vector.
+    concentration : numpy.array
+        Total number of atoms, indexed by step, then cell, then nuclide.  The
+        cell or nuclide axis is dropped if a single name is given, such that
+        a list of cells and one nuclide gives a 2-D array.
+    """
+
+    with _open_results(source) as res_file:
+        n_steps = len(res_file)
+        mat_ind = [res_file.mat_to_ind[cell] for cell in _as_list(cells)]
+        nuc_ind = [res_file.nuc_to_ind[nuc] for nuc in _as_list(nucs)]
+
+        concentration = _read_series(res_file.number, n_steps, mat_ind,
+                                     nuc_ind)
+        time = res_file.time[:, 0]
+
+    return time, _squeeze(concentration, cells, nucs)
+
+def reaction_rate_series(source, cells, nucs, rxn):
+    """ Reads total reaction rates of nuclides in cells from a results file.
+
+    Parameters
+    ----------
+    source : str, h5py.File or ResultsFile
+        Results file path or open handle.
+    cells : str or list of str
+        Cell name or names to evaluate.
+    nucs : str or list of str
+        Nuclide name or names to evaluate.
+    rxn : str
+        Reaction rate to evaluate.
+
+    Returns
+    -------
+    time : numpy.array
+        Time vector.
+    rate : numpy.array
+        Reaction rate, indexed by step, then cell, then nuclide.  The cell or
+        nuclide axis is dropped if a single name is given.
+
+    Raises
+    ------
+    ValueError
+        If the file was written without reaction rates.
+    """
+
+    with _open_results(source) as res_file:
+        if res_file.rates is None:
+            raise ValueError("Results do not store reaction rates")
+
+        n_steps = len(res_file)
+        mat_ind = [res_file.mat_to_ind[cell] for cell in _as_list(cells)]
+        nuc_ind = [res_file.nuc_to_ind[nuc] for nuc in _as_list(nucs)]
+        rate_ind = [res_file.rxn_nuc_to_ind[nuc] for nuc in _as_list(nucs)]
+        rxn_ind = res_file.rxn_to_ind[rxn]
+
+        number = _read_series(res_file.number, n_steps, mat_ind, nuc_ind)
+        rate = _read_series(res_file.rates, n_steps, mat_ind, rate_ind,
+                            rxn_ind)
+        time = res_file.time[:, 0]
+
+    return time, _squeeze(rate * number, cells, nucs)
+
+def eigenvalue_series(source):
+    """ Reads the eigenvalue from a results file.
+
+    Parameters
+    ----------
+    source : str, h5py.File or ResultsFile
+        Results file path or open handle.
+
+    Returns
+    -------
+    time : numpy.array
+        Time vector.
+    eigenvalue : numpy.array
+        Eigenvalue.
+    """
+
+    with _open_results(source) as res_file:
+        time = res_file.time[:, 0]
+        eigenvalue = res_file.k[:, 0]
+
+    return time, eigenvalue
+
+def dense_output(source, chain, times, integrator="predictor",
+                 solver="cram48", fission_yield_energy=None):
+    """ Reconstructs the atoms of every material at arbitrary times.
+
+    Within a step, the composition is the exponential of the step's
+    depletion matrix applied to the beginning of step atoms, with the matrix
+    formed from the stored stage reaction rates as the integrator did: the
+    beginning of step rates for "predictor", the midpoint rates for "cecm",
+    and the particle weighted average of the iterations for "sie".  Substep
+    power normalization is not reproduced.  The materials of a step are
+    solved together, as one block diagonal matrix per time.
+
+    The file must store every nuclide and material, and for "cecm" and
+    "sie" the reaction rates of all stages.  As for ReplayOperator, the
+    matrices use the reaction rate indices of the file, which are set on a
+    copy of the chain.
+
+    Results files do not store the energies fission yields were interpolated
+    to, so a run that set Settings.fission_yield_energy is only reproduced
+    if the same value is given here.
+
+    Parameters
+    ----------
+    source : str, h5py.File or ResultsFile
+        Results file path or open handle.
+    chain : DepletionChain
+        Depletion chain used for the simulation.  It is not modified.
+    times : float or iterable of float
+        Times to evaluate at, in seconds, between the first and last time in
+        the file.
+    integrator : str, optional
+        Integrator that produced the file, "predictor", "cecm" or "sie".
+    solver : str, optional
+        Matrix exponential solver, "cram48" or "cram16".
+    fission_yield_energy : float or dict of str to float, optional
+        Energy in eV at which fission yields are interpolated, for every
+        material or by material ID, as in Settings.  Thermal yields are used
+        if None (default), and for materials missing from a dict.
+
+    Returns
+    -------
+    numpy.ndarray
+        Total atoms, indexed by time, material, then nuclide, following the
+        mat_to_ind and nuc_to_ind of the file.
+    """
+
+    # Imported here, such that reading results does not load the integrators
+    import scipy.sparse as sp
+    from .integrator.cram import CRAM16, CRAM48
+
+    if solver == "cram48":
+        cram = CRAM48
+    elif solver == "cram16":
+        cram = CRAM16
+    else:
+        raise ValueError('Unknown depletion solver "{}"'.format(solver))
+
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+
+    with _open_results(source) as res_file:
+        n_steps = len(res_file)
+        starts = res_file.time[:, 0]
+        n_mats, n_nuc = res_file.number.shape[2:]
+
+        if hasattr(chain, "nuclide_dict") and len(chain.nuclide_dict) != n_nuc:
+            raise ValueError("Results do not store every nuclide of the chain")
+        if res_file.rates is None:
+            raise ValueError("Results do not store reaction rates")
+
+        # The columns of the stored rates, set on a copy such that the
+        # caller's chain keeps its own
+        chain = copy.copy(chain)
+        chain.nuc_to_react_ind = OrderedDict(sorted(
+            res_file.rxn_nuc_to_ind.items(), key=lambda item: item[1]))
+        chain.react_to_ind = OrderedDict(sorted(
+            res_file.rxn_to_ind.items(), key=lambda item: item[1]))
+
+        yield_weights = [None] * n_mats
+        if fission_yield_energy is not None:
+            yield_weights = chain.yield_weights(_material_energy(
+                fission_yield_energy, res_file.mat_to_ind, n_mats))
+
+        # Step each time falls in, the final time belongs to the last entry
+        steps = np.searchsorted(starts, times, side="right") - 1
+        final = times == starts[-1]
+        if np.any(steps < 0) or np.any((steps == n_steps - 1) & ~final):
+            raise ValueError("Times must lie within [{}, {}]".format(
+                starts[0], starts[-1]))
+
+        number = np.empty((len(times), n_mats, n_nuc))
+
+        for step in np.unique(steps):
+            inds = np.flatnonzero(steps == step)
+            number_bos = res_file.number[step, 0]
+
+            if step == n_steps - 1:
+                number[inds] = number_bos
+                continue
+
+            weights = _stage_weights(integrator, res_file.rates.shape[1])
+            rates = np.tensordot(weights,
+                                 res_file.rates[step, :len(weights)], axes=1)
+
+            matrices = []
+            for mat, mat_weights in enumerate(yield_weights):
+                if mat_weights is None:
+                    matrices.append(chain.form_matrix(rates[mat]))
+                else:
+                    matrices.append(chain.form_matrix(rates[mat],
+                                                      mat_weights))
+            A = sp.block_diag(matrices, format="csr")
+
+            x = number_bos.reshape(-1)
+            for i in inds:
+                number[i] = cram(A, x, times[i] - starts[step]).reshape(
+                    n_mats, n_nuc)
+
+    return number
+
+def _material_energy(energy, mat_to_ind, n_mats):
+    """ Returns the fission yield energy of each material.
+
+    Parameters
+    ----------
+    energy : float or dict of str to float
+        Energy for every material, or by material ID as str or int.
+        Materials missing from a dict are thermal.
+    mat_to_ind : dict of str to int
+        Maps material ID to index.
+    n_mats : int
+        Number of materials.
+
+    Returns
+    -------
+    numpy.ndarray
+        Energy of each material.
+    """
+
+    if not isinstance(energy, dict):
+        return np.full(n_mats, float(energy))
+
+    energy = {str(mat): value for mat, value in energy.items()}
+    mat_energy = np.zeros(n_mats)
+    for mat, i in mat_to_ind.items():
+        mat_energy[i] = energy.get(mat, 0.0)
+
+    return mat_energy
+
+def _stage_weights(integrator, n_stages):
+    """ Returns the weights of the stage rates forming a step's matrix.
+
+    Parameters
+    ----------
+    integrator : str
+        Integrator that produced the file, "predictor", "cecm" or "sie".
+    n_stages : int
+        Number of stages with stored reaction rates.
+
+    Returns
+    -------
+    numpy.array
+        Weight of each stage, starting at the first.
+    """
+
+    required = {"predictor": 1, "cecm": 2, "sie": 2}
+    if integrator not in required:
+        raise ValueError('Unknown integrator "{}"'.format(integrator))
+
+    if n_stages < required[integrator]:
+        raise ValueError('Reaction rates of all stages are required for "{}"'
+                         .format(integrator))
+
+    if integrator == "predictor":
+        return np.array([1.0])
+    elif integrator == "cecm":
+        return np.array([0.0, 1.0])
+
+    # Iteration j of the stochastic implicit Euler method uses j times the
+    # particles, and the beginning of step rates are not used
+    weights = np.arange(n_stages, dtype=float)
+    return weights / np.sum(weights)
+
+@contextmanager
+def _open_results(source):
+    """ Yields a ResultsFile for source, closing it only if opened here. """
+
+    if isinstance(source, ResultsFile):
+        yield source
+    else:
+        res_file = ResultsFile(source)
+        try:
+            yield res_file
+        finally:
+            res_file.close()
+
+def _as_list(names):
+    """ Wraps a single name in a list. """
+
+    if isinstance(names, str):
+        return [names]
+    return list(names)
+
+def _squeeze(data, cells, nucs):
+    """ Drops the cell and nuclide axes given as a single name. """
+
+    if isinstance(nucs, str):
+        data = data[:, :, 0]
+    if isinstance(cells, str):
+        data = data[:, 0, ...]
+    return data
+
+def _read_series(dset, n_steps, mat_ind, nuc_ind, *extra):
+    """ Reads the first stage of every step for the given entries.
+
+    Each nuclide is a single hyperslab read.  The materials are read as a
+    slice if they are contiguous and as a sorted point selection otherwise,
+    as HDF5 requires.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset or numpy.memmap
+        Dataset indexed by step, stage, material, nuclide, then extra.
+    n_steps : int
+        Number of steps to read.
+    mat_ind : list of int
+        Material indices to read.
+    nuc_ind : list of int
+        Nuclide indices to read.
+    extra : int
+        Indices into any trailing axes.
+
+    Returns
+    -------
+    numpy.ndarray
+        The data, indexed by step, then material, then nuclide.  Empty if no
+        material or nuclide is given.
+    """
+
+    data = np.empty((n_steps, len(mat_ind), len(nuc_ind)))
+    if data.size == 0:
+        return data
+
+    mats, inverse = np.unique(mat_ind, return_inverse=True)
+    if mats[-1] - mats[0] + 1 == len(mats):
+        mat_sel = slice(int(mats[0]), int(mats[-1]) + 1)
+    else:
+        mat_sel = mats.tolist()
+
+    for j, nuc in enumerate(nuc_ind):
+        index = (slice(0, n_steps), 0, mat_sel, int(nuc)) + extra
+        data[:, :, j] = dset[index][:, inverse]
+
+    return data
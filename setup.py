@@ -9,7 +9,9 @@ except ImportError:
 
 kwargs = {'name': 'opendeplete',
           'version': '0.1',
-          'packages': ['opendeplete', 'opendeplete.integrator'],
+          'packages': ['opendeplete', 'opendeplete.benchmarks',
+                       'opendeplete.integrator'],
+          'package_data': {'opendeplete.benchmarks': ['baseline.json']},
           'scripts': [],
 
           # Metadata
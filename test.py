@@ -19,13 +19,20 @@ import argparse
 
 SUITE_NORMAL = [
     "test.test_atom_number",
+    "test.test_benchmarks",
     "test.test_cecm_regression",
     "test.test_cram",
+    "test.test_deplete",
     "test.test_depletion_chain",
+    "test.test_fake_capi",
     "test.test_integrator",
     "test.test_nuclide",
     "test.test_predictor_regression",
     "test.test_reaction_rates",
+    "test.test_replay",
+    "test.test_results",
+    "test.test_sie_regression",
+    "test.test_tta",
     "test.test_utilities"
     ]
 
@@ -35,7 +35,7 @@ class DummyGeometry(Operator):
 
         Parameters
         ----------
-        vec : list of numpy.array
+        vec : numpy.ndarray
             Total atoms to be used in function.
         print_out : bool, optional, ignored
             Whether or not to print out time.
@@ -63,7 +63,7 @@ class DummyGeometry(Operator):
 
         return 0.0, reaction_rates, 0
 
-    def form_matrix(self, rates):
+    def form_matrix(self, rates, yield_weights=None):
         """ Forms the f(y) matrix in y' = f(y)y.
 
         Nominally a depletion matrix, this is abstracted on the off chance
@@ -73,6 +73,8 @@ class DummyGeometry(Operator):
         ----------
         rates : numpy.ndarray
             Slice of reaction rates for a single material
+        yield_weights : numpy.ndarray, optional
+            Ignored, as there are no fission yields.
 
         Returns
         -------
@@ -141,11 +143,11 @@ class DummyGeometry(Operator):
 
         Returns
         -------
-        list of numpy.array
+        numpy.ndarray
             Total density for initial conditions.
         """
 
-        return [np.array((1.0, 1.0))]
+        return np.array([[1.0, 1.0]])
 
     def get_results_info(self):
         """ Returns volume list, cell lists, and nuc lists.
@@ -40,6 +40,44 @@ class TestAtomNumber(unittest.TestCase):
         self.assertEqual(number[0, 0], 5.0)
         self.assertEqual(number["10000", "U238"], 5.0)
 
+    def test_list_indexing(self):
+        """ Tests indexing by lists and arrays of names. """
+
+        mat_to_ind = {"10000" : 0, "10001" : 1, "10002" : 2}
+        nuc_to_ind = {"U238" : 0, "U235" : 1, "U234" : 2}
+        volume = {"10000" : 0.38, "10001" : 0.21, "10002" : 0.5}
+
+        number = atom_number.AtomNumber(mat_to_ind, nuc_to_ind, volume, 3, 3)
+        number.number[:] = np.arange(9.0).reshape(3, 3)
+
+        # One list selects along its axis
+        np.testing.assert_array_equal(number["10001", ["U234", "U238"]],
+                                      [5.0, 3.0])
+        np.testing.assert_array_equal(number[:, np.array(["U235"])],
+                                      [[1.0], [4.0], [7.0]])
+
+        # Lists on both axes select every nuclide in every material
+        np.testing.assert_array_equal(
+            number[["10002", "10000"], ["U235", "U238"]],
+            [[7.0, 6.0], [1.0, 0.0]])
+
+        number[["10000", "10001"], ["U234", "U235"]] = -1.0
+        np.testing.assert_array_equal(number.number[:2, 1:], -1.0)
+
+        # Densities divide each material by its volume
+        np.testing.assert_allclose(
+            number.get_atom_density(["10000", "10002"], ["U238", "U234"]),
+            [[0.0, -1.0 / 0.38], [6.0 / 0.5, 8.0 / 0.5]])
+        np.testing.assert_allclose(number.get_atom_density(np.s_[:], [0, 2]),
+                                   number.number[:, [0, 2]] /
+                                   number.volume[:, np.newaxis])
+
+        number.set_atom_density(np.s_[:], ["U238"], 2.0)
+        np.testing.assert_allclose(number.number[:, 0], 2.0 * number.volume)
+
+        with self.assertRaises(KeyError):
+            number["10000", ["U238", "Pu239"]]
+
     def test_n_mat(self):
         """ Test number of materials property. """
         mat_to_ind = {"10000" : 0, "10001" : 1}
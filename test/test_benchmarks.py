@@ -0,0 +1,112 @@
+""" Tests for the benchmarks package """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import opendeplete
+from opendeplete import benchmarks
+
+
+class TestSyntheticChain(unittest.TestCase):
+    """ Tests for synthetic_chain. """
+
+    def test_structure(self):
+        """ Tests the size and consistency of a synthetic chain. """
+
+        chain = benchmarks.synthetic_chain(50, seed=3)
+
+        self.assertEqual(len(chain.nuclides), 50)
+        self.assertEqual(list(chain.nuclide_dict),
+                         ["Syn{}".format(i) for i in range(50)])
+
+        n_fissionable = 0
+        for nuc in chain.nuclides:
+            for mode in nuc.decay_modes:
+                self.assertNotEqual(mode.target, nuc.name)
+                self.assertIn(mode.target, chain.nuclide_dict)
+            if nuc.decay_modes:
+                self.assertAlmostEqual(
+                    sum(mode.branching_ratio for mode in nuc.decay_modes), 1.0)
+            if nuc.yield_data:
+                n_fissionable += 1
+                self.assertAlmostEqual(
+                    sum(y for _, y in nuc.yield_data[0.0253]), 2.0)
+
+        self.assertEqual(n_fissionable, 1)
+
+    def test_seed(self):
+        """ Tests that a seed reproduces the same chain. """
+
+        chain_1 = benchmarks.synthetic_chain(30, seed=5)
+        chain_2 = benchmarks.synthetic_chain(30, seed=5)
+
+        for nuc_1, nuc_2 in zip(chain_1.nuclides, chain_2.nuclides):
+            self.assertEqual(nuc_1.half_life, nuc_2.half_life)
+            self.assertEqual(nuc_1.decay_modes, nuc_2.decay_modes)
+            self.assertEqual(nuc_1.reactions, nuc_2.reactions)
+
+
+class TestSuite(unittest.TestCase):
+    """ Tests for the benchmark suite. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_synthetic_operator(self):
+        """ Tests depleting a synthetic problem. """
+
+        settings = opendeplete.Settings()
+        settings.dt_vec = [3600.0]
+        settings.output_dir = self.tmp_dir
+
+        chain = benchmarks.synthetic_chain(20)
+        op = benchmarks.SyntheticOperator(settings, chain, 3)
+
+        opendeplete.predictor(op, print_out=False)
+
+        res = opendeplete.read_results(
+            os.path.join(self.tmp_dir, "results.h5"))
+        self.assertEqual(len(res), 2)
+        self.assertTrue(np.all(np.isfinite(res[1].data[0])))
+
+    def test_run_suite(self):
+        """ Tests a run of the suite against a saved baseline. """
+
+        config = {"n_nuclides": 20, "n_materials": 3, "n_steps": 1,
+                  "repeat": 1, "n_sample": 2}
+        results = benchmarks.run_suite(**config)
+
+        self.assertEqual(list(results),
+                         ["xml_read", "form_matrix", "cram16", "cram48",
+                          "save_results", "read_results", "read_series",
+                          "read_series_gzip", "predictor"])
+        for entry in results.values():
+            self.assertGreater(entry["throughput"], 0.0)
+
+        filename = os.path.join(self.tmp_dir, "baseline.json")
+        benchmarks.save_baseline(filename, config, results)
+        config_read, baseline = benchmarks.load_baseline(filename)
+
+        self.assertEqual(config_read, config)
+        ratios = benchmarks.compare(results, baseline)
+        for ratio in ratios.values():
+            self.assertAlmostEqual(ratio, 1.0)
+
+    def test_shipped_baseline(self):
+        """ Tests that the shipped baseline covers every benchmark. """
+
+        config, baseline = benchmarks.load_baseline()
+
+        self.assertEqual(config["n_nuclides"], 200)
+        self.assertIn("predictor", baseline)
+
+
+if __name__ == '__main__':
+    unittest.main()
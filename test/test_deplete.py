@@ -0,0 +1,182 @@
+""" Tests for deplete.py """
+
+import importlib
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+import opendeplete
+from opendeplete import depletion_chain, nuclide, reaction_rates
+from opendeplete.integrator import CRAM48, deplete, fission_power
+
+# The deplete function shadows its module in opendeplete.integrator
+deplete_module = importlib.import_module("opendeplete.integrator.deplete")
+
+
+class TestDeplete(unittest.TestCase):
+    """ Tests for deplete.py using chain_test. """
+
+    def setUp(self):
+        """ Build an operator around chain_test with a fission rate in C. """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+
+        cell_ind = {"10000": 0}
+        nuc_ind = {"A": 0, "B": 1, "C": 2}
+
+        dep.nuc_to_react_ind = nuc_ind
+
+        self.rates = reaction_rates.ReactionRates(cell_ind, nuc_ind,
+                                                  dep.react_to_ind)
+        self.rates["10000", "C", "fission"] = 1.0e-5
+
+        self.op = MagicMock()
+        self.op.chain = dep
+        self.op.settings = opendeplete.Settings()
+
+        self.x = np.array([[0.0, 0.0, 1.0e3]])
+
+    def test_fission_power(self):
+        """ Test fission power against the chain_test Q value. """
+
+        power = fission_power(self.op.chain, self.x, self.rates)
+
+        self.assertAlmostEqual(power, 2.0e8 * 1.0e-5 * 1.0e3)
+
+    def test_deplete(self):
+        """ Test that a single substep is a plain CRAM48 solve. """
+
+        x = deplete(self.op, self.x, self.rates, 1.0e4, print_out=False)
+
+        mat = self.op.chain.form_matrix(self.rates[0, :, :])
+        x0 = CRAM48(mat, self.x[0], 1.0e4)
+
+        np.testing.assert_array_equal(x[0], x0)
+
+    def test_deplete_compact(self):
+        """ Test that rates of the chain's pairs deplete as dense rates. """
+
+        dep = self.op.chain
+        rates = reaction_rates.ReactionRates({"10000": 0},
+                                             dep.nuc_to_react_ind,
+                                             dep.react_to_ind,
+                                             dep.reaction_pairs())
+        rates["10000", "C", "fission"] = 1.0e-5
+
+        self.op.settings.substeps = 2
+        for rate in (rates, self.rates):
+            self.assertIs(deplete_module._material_rates(dep, rate) is
+                          rate.rates, rate is rates)
+
+        np.testing.assert_array_equal(
+            deplete(self.op, self.x, rates, 1.0e4, print_out=False),
+            deplete(self.op, self.x, self.rates, 1.0e4, print_out=False))
+
+    def test_deplete_yield_energy(self):
+        """ Test that each material uses the yields at its energy. """
+
+        dep = self.op.chain
+        dep.nuclides[2].yield_data[1.0e6] = [("A", 0.01), ("B", 0.02)]
+
+        rates = reaction_rates.ReactionRates({"1": 0, "2": 1},
+                                             dep.nuc_to_react_ind,
+                                             dep.react_to_ind)
+        rates[:, "C", "fission"] = 1.0e-5
+        rates.fission_energy = np.array([0.0, 1.0e6])
+
+        x0 = np.repeat(self.x, 2, axis=0)
+        x = deplete(self.op, x0, rates, 1.0e4, print_out=False)
+
+        for i, weights in enumerate([[1.0, 0.0], [0.0, 1.0]]):
+            mat = dep.form_matrix(rates[i, :, :], np.array(weights))
+            np.testing.assert_array_equal(x[i], CRAM48(mat, x0[i], 1.0e4))
+
+        self.assertNotEqual(x[0, 0], x[1, 0])
+
+    def test_deplete_thread(self):
+        """ Test that the thread backend matches the process backend. """
+
+        x = deplete(self.op, self.x, self.rates, 1.0e4, print_out=False)
+
+        self.op.settings.backend = "thread"
+        self.op.settings.n_workers = 2
+        x_thread = deplete(self.op, self.x, self.rates, 1.0e4, print_out=False)
+
+        np.testing.assert_array_equal(x_thread, x)
+
+    def test_deplete_serial(self):
+        """ Test that the serial backend matches the process backend. """
+
+        self.op.settings.n_workers = 2
+        x = deplete(self.op, self.x, self.rates, 1.0e4, print_out=False)
+
+        self.op.settings.backend = "serial"
+        x_serial = deplete(self.op, self.x, self.rates, 1.0e4, print_out=False)
+
+        np.testing.assert_array_equal(x_serial, x)
+
+    def test_default_workers(self):
+        """ Test that bound cores are not divided between ranks again. """
+
+        with patch("os.cpu_count", return_value=8), \
+                patch.object(deplete_module, "ranks_per_node",
+                             return_value=4) as ranks:
+            with patch("os.sched_getaffinity", return_value=set(range(8)),
+                       create=True):
+                self.assertEqual(deplete_module.default_workers(), 2)
+            with patch("os.sched_getaffinity", return_value={0, 1, 2},
+                       create=True):
+                self.assertEqual(deplete_module.default_workers(), 3)
+
+        # The collective call is made by bound ranks too
+        self.assertEqual(ranks.call_count, 2)
+
+    def test_serial_pool(self):
+        """ Test that the serial backend does not count workers. """
+
+        self.op.settings.backend = "serial"
+        with patch.object(deplete_module, "default_workers") as workers:
+            pool = deplete_module.get_pool(self.op.settings)
+
+        self.assertIsInstance(pool, deplete_module._SerialPool)
+        workers.assert_not_called()
+
+    def test_deplete_substeps(self):
+        """ Test that substeps hold fission power constant. """
+
+        # Single fissile nuclide with no products
+        nuc = nuclide.Nuclide()
+        nuc.name = "C"
+        nuc.reactions = [nuclide.ReactionTuple("fission", None, 2.0e8, 1.0)]
+        nuc.yield_energies = [0.0253]
+        nuc.yield_data = {0.0253: []}
+
+        dep = depletion_chain.DepletionChain()
+        dep.nuclides = [nuc]
+        dep.nuclide_dict["C"] = 0
+        dep.react_to_ind["fission"] = 0
+        dep.nuc_to_react_ind = {"C": 0}
+
+        rates = reaction_rates.ReactionRates({"10000": 0}, {"C": 0},
+                                             dep.react_to_ind)
+        rates["10000", "C", "fission"] = 1.0e-5
+
+        self.op.chain = dep
+        self.op.settings.substeps = 4
+
+        dt = 1.0e4
+        x = deplete(self.op, np.array([[1.0e3]]), rates, dt, print_out=False)
+
+        # Each substep is a single exponential with the rate renormalized to
+        # the initial power.
+        n_c = 1.0e3
+        power = 1.0e-5 * n_c
+        for _ in range(4):
+            n_c *= np.exp(-power / n_c * dt / 4)
+
+        self.assertAlmostEqual(x[0][0] / n_c, 1.0, places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -182,6 +182,92 @@ class TestDepletionChain(unittest.TestCase):
         self.assertEqual(mat[1, 2], mat12)
         self.assertEqual(mat[2, 2], mat22)
 
+        # The rates of the pairs alone give the same matrix
+        pairs = dep.reaction_pairs()
+        compact = react.rates[0, pairs[:, 0], pairs[:, 1]]
+        np.testing.assert_array_equal(dep.form_matrix(compact).toarray(),
+                                      mat.toarray())
+
+    def test_form_matrix_reindexed(self):
+        """ Tests that the matrix follows a change of nuc_to_react_ind. """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+
+        react = np.zeros((3, len(dep.react_to_ind)))
+        react[0, dep.react_to_ind["(n,gamma)"]] = 2.0
+
+        dep.nuc_to_react_ind = {"A": 0, "B": 1, "C": 2}
+        mat = dep.form_matrix(react)
+        self.assertEqual(mat[2, 0], np.log(2) / 2.36520E+04 * 0.4 + 2)
+        self.assertEqual(mat[2, 1], 0.0)
+
+        dep.nuc_to_react_ind = {"B": 0}
+        mat = dep.form_matrix(react)
+        self.assertEqual(mat[2, 0], np.log(2) / 2.36520E+04 * 0.4)
+        self.assertEqual(mat[2, 1], 2.0)
+
+    def test_form_matrix_yield_energies(self):
+        """ Tests interpolating fission yields between energies. """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+        dep.nuclides[2].yield_data[1.0e6] = [("A", 0.01), ("C", 0.5)]
+        dep.nuc_to_react_ind = {"A": 0, "B": 1, "C": 2}
+
+        np.testing.assert_array_equal(dep.yield_energies, [0.0253, 1.0e6])
+        np.testing.assert_allclose(dep.yield_weights([0.0, 5.0e5, 2.0e6]),
+                                   [[1.0, 0.0], [0.5, 0.5], [0.0, 1.0]],
+                                   atol=1.0e-7)
+
+        react = np.zeros((3, len(dep.react_to_ind)))
+        react[2, dep.react_to_ind["fission"]] = 1.0
+
+        # Thermal yields by default, with no C produced
+        mat = dep.form_matrix(react)
+        self.assertEqual(mat[0, 2], 0.0292737)
+        self.assertEqual(mat[1, 2], 0.002566345)
+        self.assertEqual(mat[2, 2], -1.0)
+
+        mat = dep.form_matrix(react, np.array([0.5, 0.5]))
+        self.assertAlmostEqual(mat[0, 2], 0.5 * (0.0292737 + 0.01))
+        self.assertAlmostEqual(mat[1, 2], 0.5 * 0.002566345)
+        self.assertAlmostEqual(mat[2, 2], -0.75)
+
+    def test_reaction_pairs(self):
+        """ Tests the nuclide and reaction pairs used by the matrix. """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+
+        dep.nuc_to_react_ind = {"A": 0, "B": 1, "C": 2}
+        np.testing.assert_array_equal(dep.reaction_pairs(),
+                                      [[0, 0], [1, 0], [2, 0], [2, 1]])
+
+        dep.nuc_to_react_ind = {"C": 0}
+        np.testing.assert_array_equal(dep.reaction_pairs(), [[0, 0], [0, 1]])
+
+    def test_structure_changes(self):
+        """ Tests that the matrix follows changes made in place. """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+
+        react = np.zeros((3, len(dep.react_to_ind)))
+        react[0, dep.react_to_ind["(n,gamma)"]] = 2.0
+
+        dep.nuc_to_react_ind = {"A": 0, "B": 1, "C": 2}
+        self.assertEqual(dep.form_matrix(react)[2, 1], 0.0)
+
+        dep.nuc_to_react_ind["B"] = 0
+        del dep.nuc_to_react_ind["A"]
+        self.assertEqual(dep.form_matrix(react)[2, 1], 2.0)
+        self.assertEqual(dep.form_matrix(react)[2, 0],
+                         np.log(2) / 2.36520E+04 * 0.4)
+
+        # A new nuclide without decay in place of A
+        a_stable = nuclide.Nuclide()
+        a_stable.name = "A"
+        a_stable.reactions = dep.nuclides[0].reactions
+        dep.nuclides[0] = a_stable
+        self.assertEqual(dep.form_matrix(react)[2, 0], 0.0)
+
     def test_nuc_by_ind(self):
         """ Test nuc_by_ind converter function. """
         dep = depletion_chain.DepletionChain()
@@ -0,0 +1,180 @@
+""" Tests for fake_capi.py """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+try:
+    import openmc
+    _have_openmc = hasattr(openmc, "Geometry")
+except ImportError:
+    _have_openmc = False
+
+import opendeplete
+from opendeplete import FakeCapi
+
+
+class TestFakeCapi(unittest.TestCase):
+    """ Tests for the FakeCapi class. """
+
+    def setUp(self):
+        self.capi = FakeCapi(keff=1.1, seed=2)
+
+        mats = [self.capi.materials[10], self.capi.materials[11]]
+        mats[0].set_densities(["U235", "U238"], [1.0e-3, 2.0e-2])
+        mats[1].set_densities(["U238"], [3.0e-2])
+
+        tally = self.capi.Tally(1)
+        tally.scores = ["fission", "(n,gamma)"]
+        tally.filters = [self.capi.MaterialFilter(mats, 1)]
+        tally.nuclides = ["U235", "U238"]
+
+    def test_results(self):
+        """ Tests the shape and values of tally results. """
+
+        self.capi.reset()
+        self.capi.run()
+
+        results = self.capi.tallies[1].results
+        self.assertEqual(results.shape, (2, 4, 3))
+        self.assertEqual(self.capi.n_runs, 1)
+        self.assertEqual(self.capi.keff(), (1.1, 0.0))
+
+        # Nuclide major, then score, proportional to density
+        xs_u238 = results[0, 2:, 1] / 2.0e-2
+        np.testing.assert_allclose(results[1, 2:, 1], 3.0e-2 * xs_u238)
+        np.testing.assert_array_equal(results[1, :2, 1], 0.0)
+        self.assertTrue(np.all(results[0, :, 1] > 0.0))
+
+    def test_order_independent(self):
+        """ Tests that results do not depend on the order of nuclides. """
+
+        self.capi.run()
+        results = self.capi.tallies[1].results[:, :, 1].copy()
+
+        self.capi.tallies[1].nuclides = ["U238", "U235"]
+        self.capi.run()
+
+        np.testing.assert_array_equal(
+            self.capi.tallies[1].results[:, :, 1],
+            results[:, [2, 3, 0, 1]])
+
+    def test_init(self):
+        """ Tests loading materials from materials.xml. """
+
+        cwd = os.getcwd()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            os.chdir(tmp_dir)
+            with open("materials.xml", "w") as fh:
+                fh.write('<materials><material id="3" />'
+                         '<material id="7" /></materials>')
+
+            capi = FakeCapi()
+            capi.init()
+            self.assertEqual(sorted(capi.materials), [3, 7])
+
+            capi.finalize()
+            self.assertEqual(len(capi.materials), 0)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp_dir)
+
+
+@unittest.skipUnless(_have_openmc, "requires the OpenMC Python API")
+class TestOpenMCOperator(unittest.TestCase):
+    """ Tests OpenMCOperator with a FakeCapi backend. """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cross_sections = os.environ.get("OPENMC_CROSS_SECTIONS")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+        if self.cross_sections is None:
+            os.environ.pop("OPENMC_CROSS_SECTIONS", None)
+        else:
+            os.environ["OPENMC_CROSS_SECTIONS"] = self.cross_sections
+
+    def _operator(self, capi):
+        """ Creates an operator of a one pin problem on capi. """
+
+        import test.example_geometry as example_geometry
+
+        geometry, lower_left, upper_right = \
+            example_geometry.generate_problem(n_rings=1, n_wedges=1)
+
+        # Every nuclide in the problem participates
+        initial_density = example_geometry.generate_initial_number_density()[2]
+        nuclides = sorted({nuc for density in initial_density.values()
+                           for nuc in density})
+        filename = os.path.join(self.tmp_dir, "cross_sections.xml")
+        with open(filename, "w") as fh:
+            fh.write('<cross_sections><library materials="{}" /></cross_sections>'
+                     .format(" ".join(nuclides)))
+        os.environ["OPENMC_CROSS_SECTIONS"] = filename
+
+        settings = opendeplete.OpenMCSettings()
+        settings.chain_file = os.path.join(self.cwd, "chains/chain_simple.xml")
+        settings.particles = 100
+        settings.batches = 10
+        settings.inactive = 5
+        settings.lower_left = lower_left
+        settings.upper_right = upper_right
+        settings.constant_seed = 1
+        settings.power = 1.0e4
+        settings.dt_vec = [3600.0]
+        settings.output_dir = os.path.join(self.tmp_dir, "output")
+
+        os.chdir(self.tmp_dir)
+        return opendeplete.OpenMCOperator(geometry, settings, capi=capi)
+
+    def test_predictor(self):
+        """ Tests a depletion step through the OpenMC operator. """
+
+        capi = FakeCapi(keff=1.2)
+        op = self._operator(capi)
+        opendeplete.predictor(op, print_out=False)
+
+        self.assertEqual(capi.n_runs, 2)
+        self.assertEqual(capi.settings.particles, 100)
+
+        res = opendeplete.read_results(
+            os.path.join(op.settings.output_dir, "results.h5"))
+        self.assertEqual(res[0].k[0], 1.2)
+        self.assertTrue(np.all(res[0].rates[0][:, :, :] >= 0.0))
+
+    def test_rate_buffers(self):
+        """ Tests that eval fills a ring of rate buffers. """
+
+        op = self._operator(FakeCapi())
+        op.reserve_rates(3)
+        vec = op.initial_condition()
+
+        rates = [op.eval(vec, print_out=False)[1] for _ in range(4)]
+
+        self.assertEqual(len(op.rate_buffers), 3)
+        self.assertEqual(len({id(rate) for rate in rates[:3]}), 3)
+        self.assertIs(rates[3], rates[0])
+        self.assertIs(rates[1].nuc_to_ind, rates[0].nuc_to_ind)
+        self.assertIs(rates[1].pairs, rates[0].pairs)
+        np.testing.assert_array_equal(rates[1].rates, rates[0].rates)
+
+    def test_fission_yield_energy(self):
+        """ Tests that yield energies may be keyed by int material ID. """
+
+        op = self._operator(FakeCapi())
+        mat = op.number.burn_mat_list[0]
+        op.settings.fission_yield_energy = {int(mat): 1.0e6}
+
+        rates = op.eval(op.initial_condition(), print_out=False)[1]
+
+        self.assertEqual(rates.fission_energy[rates.mat_to_ind[mat]], 1.0e6)
+
+
+if __name__ == '__main__':
+    unittest.main()
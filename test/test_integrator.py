@@ -111,6 +111,238 @@ class TestIntegrator(unittest.TestCase):
         if comm.rank == 0:
             os.remove("results.h5")
 
+    def test_save_results_writer(self):
+        """ Test data save module with a preallocated ResultsWriter """
+
+        np.random.seed(comm.rank)
+
+        # Mock geometry
+        op = MagicMock()
+
+        vol_dict = {}
+        full_burn_dict = {}
+
+        for i in range(comm.size):
+            vol_dict[str(i)] = 1.2
+            full_burn_dict[str(i)] = i
+
+        burn_list = [str(comm.rank)]
+        nuc_list = ["na", "nb"]
+
+        op.get_results_info.return_value = vol_dict, nuc_list, burn_list, full_burn_dict
+
+        x = [np.random.rand(1, 2), np.random.rand(1, 2)]
+
+        r1 = ReactionRates({burn_list[0]: 0}, {"na":0, "nb":1}, {"ra":0})
+        r1.rates = np.random.rand(1, 2, 1)
+
+        # Preallocate more steps than are written
+        with results.ResultsWriter("results.h5", 3) as writer:
+            for i in range(2):
+                integrator.save_results(op, x[i:i+1], [r1], [1.0], [i],
+                                        [i, i + 1.0], i, writer)
+
+        res = results.read_results("results.h5")
+
+        self.assertEqual(len(res), 2)
+        for i in range(2):
+            np.testing.assert_array_equal(res[i][0, burn_list[0], :], x[i][0])
+            np.testing.assert_array_equal(res[i].time, [i, i + 1.0])
+
+        # Delete files
+        comm.barrier()
+        if comm.rank == 0:
+            os.remove("results.h5")
+
+    def test_save_results_compressed(self):
+        """ Test data save module with compression and float32 rates """
+
+        np.random.seed(comm.rank)
+
+        # Mock geometry
+        op = MagicMock()
+
+        vol_dict = {}
+        full_burn_dict = {}
+
+        for i in range(comm.size):
+            vol_dict[str(i)] = 1.2
+            full_burn_dict[str(i)] = i
+
+        burn_list = [str(comm.rank)]
+        nuc_list = ["na", "nb"]
+
+        op.get_results_info.return_value = vol_dict, nuc_list, burn_list, full_burn_dict
+
+        x = np.random.rand(1, 1, 2)
+
+        r1 = ReactionRates({burn_list[0]: 0}, {"na":0, "nb":1}, {"ra":0})
+        r1.rates = np.random.rand(1, 2, 1)
+
+        with results.ResultsWriter("results.h5", 1, compression="gzip",
+                                   shuffle=True, rates_dtype="float32") as writer:
+            integrator.save_results(op, x, [r1], [1.0], [0], [0.0, 1.0], 0,
+                                    writer)
+
+            self.assertEqual(writer.handle["number"].compression, "gzip")
+            self.assertTrue(writer.handle["number"].shuffle)
+            self.assertEqual(writer.handle["reaction rates"].dtype, np.float32)
+
+        res = results.read_results("results.h5")
+
+        np.testing.assert_array_equal(res[0][0, burn_list[0], :], x[0, 0])
+        np.testing.assert_allclose(res[0].rates[0][burn_list[0], :, :],
+                                   r1.rates[0], rtol=1.0e-7)
+
+        # Delete files
+        comm.barrier()
+        if comm.rank == 0:
+            os.remove("results.h5")
+
+    def test_save_results_selection(self):
+        """ Test data save module with nuclide, material and rate filters """
+
+        np.random.seed(comm.rank)
+
+        # Mock geometry, with three materials per process of which the middle
+        # one is not stored
+        op = MagicMock()
+
+        vol_dict = {}
+        full_burn_dict = {}
+
+        for i in range(3 * comm.size):
+            vol_dict[str(i)] = 1.0 + i
+            full_burn_dict[str(i)] = i
+
+        burn_list = [str(i) for i in range(3*comm.rank, 3*comm.rank + 3)]
+        nuc_list = ["na", "nb", "nc"]
+        materials = [str(i) for i in range(3 * comm.size) if i % 3 != 1]
+
+        op.get_results_info.return_value = vol_dict, nuc_list, burn_list, full_burn_dict
+
+        x = np.random.rand(2, 3, 3)
+
+        cell_dict = {s: i for i, s in enumerate(burn_list)}
+        r1 = ReactionRates(cell_dict, {"nc": 0, "na": 1}, {"ra": 0, "rb": 1})
+        r1.rates = np.random.rand(3, 2, 2)
+        r2 = copy.deepcopy(r1)
+        r2.rates = np.random.rand(3, 2, 2)
+
+        with results.ResultsWriter("results.h5", 1, nuclides=["nc", "na"],
+                                   materials=materials, rates="bos") as writer:
+            integrator.save_results(op, x, [r1, r2], [1.0, 1.1], [0, 1],
+                                    [0.0, 1.0], 0, writer)
+
+            n_mats = len(materials)
+            self.assertEqual(writer.handle["number"].shape, (1, 2, n_mats, 2))
+            self.assertEqual(writer.handle["reaction rates"].shape,
+                             (1, 1, n_mats, 2, 2))
+
+        res = results.read_results("results.h5")
+
+        self.assertEqual(sorted(res[0].mat_to_ind), sorted(materials))
+        self.assertEqual(sorted(res[0].nuc_to_ind), ["na", "nc"])
+        self.assertEqual(len(res[0].rates), 1)
+
+        for mat_i, mat in enumerate(burn_list):
+            if mat not in materials:
+                continue
+            for nuc_i, nuc in enumerate(nuc_list):
+                if nuc == "nb":
+                    continue
+                np.testing.assert_array_equal(res[0][:, mat, nuc],
+                                              x[:, mat_i, nuc_i])
+                np.testing.assert_array_equal(res[0].rates[0][mat, nuc, :],
+                                              r1[mat, nuc, :])
+
+        # Delete files
+        comm.barrier()
+        if comm.rank == 0:
+            os.remove("results.h5")
+
+    def test_save_results_noncontiguous(self):
+        """ Test data save module with materials out of file order """
+
+        np.random.seed(comm.rank)
+
+        # Mock geometry, where the materials of each process are reversed and
+        # interleaved with those of another process
+        op = MagicMock()
+
+        vol_dict = {}
+        full_burn_dict = {}
+
+        for i in range(3 * comm.size):
+            vol_dict[str(i)] = 1.2
+            full_burn_dict[str(i)] = i
+
+        burn_list = [str(i) for i in (3*comm.rank + 2, 3*comm.rank)]
+        nuc_list = ["na", "nb"]
+
+        op.get_results_info.return_value = vol_dict, nuc_list, burn_list, full_burn_dict
+
+        x = np.random.rand(2, 2, 2)
+
+        cell_dict = {s: i for i, s in enumerate(burn_list)}
+        r1 = ReactionRates(cell_dict, {"na": 0, "nb": 1}, {"ra": 0})
+        r1.rates = np.random.rand(2, 2, 1)
+        r2 = copy.deepcopy(r1)
+        r2.rates = np.random.rand(2, 2, 1)
+
+        with results.ResultsWriter("results.h5", 1) as writer:
+            integrator.save_results(op, x, [r1, r2], [1.0, 1.1], [0, 1],
+                                    [0.0, 1.0], 0, writer)
+
+        res = results.read_results("results.h5")
+
+        for mat_i, mat in enumerate(burn_list):
+            np.testing.assert_array_equal(res[0][:, mat, :], x[:, mat_i, :])
+            np.testing.assert_array_equal(res[0].rates[1][mat, :, :],
+                                          r2[mat, :, :])
+
+        # Materials not on any process are left empty
+        np.testing.assert_array_equal(res[0][:, str(3*comm.rank + 1), :], 0.0)
+        np.testing.assert_array_equal(res[0].k, [1.0, 1.1])
+
+        # Delete files
+        comm.barrier()
+        if comm.rank == 0:
+            os.remove("results.h5")
+
+    def test_save_results_no_rates(self):
+        """ Test data save module without reaction rates """
+
+        # Mock geometry
+        op = MagicMock()
+
+        vol_dict = {str(i): 1.2 for i in range(comm.size)}
+        full_burn_dict = {str(i): i for i in range(comm.size)}
+        burn_list = [str(comm.rank)]
+        nuc_list = ["na", "nb"]
+
+        op.get_results_info.return_value = vol_dict, nuc_list, burn_list, full_burn_dict
+
+        x = np.random.rand(1, 1, 2)
+
+        r1 = ReactionRates({burn_list[0]: 0}, {"na":0, "nb":1}, {"ra":0})
+
+        with results.ResultsWriter("results.h5", 1, rates="none") as writer:
+            integrator.save_results(op, x, [r1], [1.0], [0], [0.0, 1.0], 0,
+                                    writer)
+
+            self.assertNotIn("reaction rates", writer.handle)
+
+        res = results.read_results("results.h5")
+
+        np.testing.assert_array_equal(res[0][0, burn_list[0], :], x[0, 0])
+        self.assertEqual(res[0].rates, [])
+
+        # Delete files
+        comm.barrier()
+        if comm.rank == 0:
+            os.remove("results.h5")
+
 
 if __name__ == '__main__':
     unittest.main()
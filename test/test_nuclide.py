@@ -1,8 +1,11 @@
 """ Tests for nuclide.py. """
 
+import pickle
 import unittest
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 from opendeplete import nuclide
 
 
@@ -117,5 +120,39 @@ class TestNuclide(unittest.TestCase):
         self.assertIsNotNone(element.find('neutron_fission_yields'))
 
 
+class TestFissionYields(unittest.TestCase):
+    """ Tests for the FissionYields class. """
+
+    def test_tuple_view(self):
+        """ Tests the arrays and the (product, yield) view. """
+
+        yields = nuclide.FissionYields(["Xe135", "I135"], [0.002, 0.06])
+
+        np.testing.assert_array_equal(yields.yields, [0.002, 0.06])
+        self.assertEqual(yields.products, ["Xe135", "I135"])
+        self.assertEqual(len(yields), 2)
+        self.assertEqual(yields[1], ("I135", 0.06))
+        self.assertEqual(list(yields), [("Xe135", 0.002), ("I135", 0.06)])
+        self.assertEqual(yields, [("Xe135", 0.002), ("I135", 0.06)])
+
+        other = nuclide.FissionYields(["I135"], [0.06])
+        self.assertEqual(other.product_index[0], yields.product_index[1])
+
+    def test_pickle(self):
+        """ Tests that yields are pickled by product name. """
+
+        nuc = nuclide.Nuclide()
+        nuc.yield_data = {0.0253: [("A", 0.1), ("B", 0.2)]}
+        nuc.yield_data[2.0e6] = [("B", 0.3)]
+
+        self.assertIsInstance(nuc.yield_data[2.0e6], nuclide.FissionYields)
+        with self.assertRaises(AttributeError):
+            nuc.extra = None
+
+        copy = pickle.loads(pickle.dumps(nuc))
+        self.assertEqual(copy.yield_data, nuc.yield_data)
+        self.assertIsInstance(copy.yield_data[0.0253], nuclide.FissionYields)
+
+
 if __name__ == '__main__':
     unittest.main()
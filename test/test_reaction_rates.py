@@ -2,6 +2,8 @@
 
 import unittest
 
+import numpy as np
+
 from opendeplete import reaction_rates
 
 
@@ -51,6 +53,59 @@ class TestReactionRates(unittest.TestCase):
         self.assertEqual(rates[0, 0, 0], 5.0)
         self.assertEqual(rates["10000", "U238", "fission"], 5.0)
 
+    def test_list_indexing(self):
+        """ Tests indexing by lists of names on several axes. """
+
+        mat_to_ind = {"10000" : 0, "10001" : 1}
+        nuc_to_ind = {"U238" : 0, "U235" : 1}
+        react_to_ind = {"fission" : 0, "(n,gamma)" : 1}
+
+        rates = reaction_rates.ReactionRates(mat_to_ind, nuc_to_ind, react_to_ind)
+        rates.rates[:] = np.arange(8.0).reshape(2, 2, 2)
+
+        np.testing.assert_array_equal(
+            rates[["10001", "10000"], ["U235", "U238"], "fission"],
+            [[6.0, 4.0], [2.0, 0.0]])
+        np.testing.assert_array_equal(
+            rates["10000", :, ["(n,gamma)", "fission"]],
+            [[1.0, 0.0], [3.0, 2.0]])
+
+        rates[:, ["U235"], ["fission", "(n,gamma)"]] = 0.0
+        np.testing.assert_array_equal(rates.rates[:, 1, :], 0.0)
+
+    def test_compact(self):
+        """ Tests converting to and from the rates of the pairs. """
+
+        mat_to_ind = {"10000" : 0, "10001" : 1}
+        nuc_to_ind = {"U238" : 0, "U235" : 1}
+        react_to_ind = {"fission" : 0, "(n,gamma)" : 1}
+        pairs = np.array([[0, 1], [1, 0], [1, 1]])
+
+        rates = reaction_rates.ReactionRates(mat_to_ind, nuc_to_ind,
+                                             react_to_ind, pairs)
+        self.assertEqual(rates.rates.shape, (2, 3))
+
+        rates.set_compact([[1.0, 2.0, 3.0], [5.0, 6.0, 7.0]])
+        np.testing.assert_array_equal(
+            rates[:, :, :], [[[0.0, 1.0], [2.0, 3.0]],
+                             [[0.0, 5.0], [6.0, 7.0]]])
+        np.testing.assert_array_equal(rates[:, "U238", "fission"], 0.0)
+        self.assertEqual(rates["10001", "U235", "fission"], 6.0)
+        np.testing.assert_array_equal(
+            rates[["10001", "10000"], "U235", ["(n,gamma)", "fission"]],
+            [[7.0, 6.0], [3.0, 2.0]])
+
+        rates[:, :, :] *= 2.0
+        np.testing.assert_array_equal(rates.compact(), [[2.0, 4.0, 6.0],
+                                                        [10.0, 12.0, 14.0]])
+
+        rates["10000", "U238", :] = 0.0
+        self.assertEqual(rates["10001", "U238", "(n,gamma)"], 10.0)
+        self.assertEqual(rates["10000", "U238", "(n,gamma)"], 0.0)
+
+        with self.assertRaises(ValueError):
+            rates["10000", "U238", "fission"] = 1.0
+
     def test_n_mat(self):
         """ Test number of materials property. """
         mat_to_ind = {"10000" : 0, "10001" : 1}
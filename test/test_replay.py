@@ -0,0 +1,102 @@
+""" Tests for replay.py """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import opendeplete
+from opendeplete import results
+import test.dummy_geometry as dummy_geometry
+
+
+class TestReplayOperator(unittest.TestCase):
+    """ Tests driving integrators from recorded reaction rates. """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def _settings(self, name, dt_vec):
+        settings = opendeplete.Settings()
+        settings.dt_vec = dt_vec
+        settings.output_dir = os.path.join(self.tmp_dir, name)
+        return settings
+
+    def _record(self, integrator, dt_vec):
+        """ Runs the dummy problem and returns the results file name. """
+
+        settings = self._settings("recorded", dt_vec)
+        integrator(dummy_geometry.DummyGeometry(settings), print_out=False)
+
+        return os.path.join(settings.output_dir, "results.h5")
+
+    def _check_replay(self, integrator, name):
+        """ Tests that replaying a run reproduces it exactly. """
+
+        dt_vec = [0.75, 0.75]
+        recorded = self._record(integrator, dt_vec)
+
+        settings = self._settings("replayed", dt_vec)
+        chain = dummy_geometry.DummyGeometry(settings)
+        op = opendeplete.ReplayOperator(settings, recorded, chain, name)
+
+        integrator(op, print_out=False)
+        op.results.close()
+
+        res_ref = results.read_results(recorded)
+        res = results.read_results(
+            os.path.join(settings.output_dir, "results.h5"))
+
+        self.assertEqual(len(res), len(res_ref))
+        for step, step_ref in zip(res, res_ref):
+            np.testing.assert_array_equal(step.data, step_ref.data)
+            np.testing.assert_array_equal(step.k, step_ref.k)
+            np.testing.assert_array_equal(step.rates[0][:, :, :],
+                                          step_ref.rates[0][:, :, :])
+
+    def test_replay_predictor(self):
+        """ Tests replaying a predictor run. """
+        self._check_replay(opendeplete.predictor, "predictor")
+
+    def test_replay_cecm(self):
+        """ Tests replaying a cecm run. """
+        self._check_replay(opendeplete.cecm, "cecm")
+
+    def test_interpolate(self):
+        """ Tests interpolating recorded rates to new time steps. """
+
+        recorded = self._record(opendeplete.predictor, [0.75, 0.75])
+        res_ref = results.read_results(recorded)
+
+        settings = self._settings("replayed", [0.375] * 4)
+        chain = dummy_geometry.DummyGeometry(settings)
+        op = opendeplete.ReplayOperator(settings, recorded, chain,
+                                        interpolate=True)
+
+        x = op.initial_condition()
+        np.testing.assert_array_equal(x, res_ref[0].data[0])
+
+        rates = [op.eval(x)[1] for _ in range(5)]
+        op.results.close()
+
+        np.testing.assert_array_equal(rates[0][:, :, :],
+                                      res_ref[0].rates[0][:, :, :])
+        np.testing.assert_allclose(rates[1][:, :, :],
+                                   0.5 * (res_ref[0].rates[0][:, :, :] +
+                                          res_ref[1].rates[0][:, :, :]))
+        np.testing.assert_array_equal(rates[4][:, :, :],
+                                      res_ref[2].rates[0][:, :, :])
+
+        with self.assertRaises(ValueError):
+            op.eval(x)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,355 @@
+""" Tests for results.py """
+
+import glob
+import importlib
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import h5py
+import numpy as np
+
+from opendeplete import integrator, results, ReactionRates
+
+
+class TestResultsFile(unittest.TestCase):
+    """ Tests the lazy results reader. """
+
+    def test_matches_read_results(self):
+        """ Tests that ResultsFile steps match read_results. """
+
+        res = results.read_results("test/test_reference.h5")
+
+        with results.ResultsFile("test/test_reference.h5") as res_file:
+            self.assertEqual(len(res_file), len(res))
+            self.assertEqual(res_file.mat_to_ind, res[0].mat_to_ind)
+            self.assertEqual(res_file.nuc_to_ind, res[0].nuc_to_ind)
+
+            for ref, step in zip(res, res_file):
+                np.testing.assert_array_equal(step.data, ref.data)
+                np.testing.assert_array_equal(step.k, ref.k)
+                np.testing.assert_array_equal(step.time, ref.time)
+                np.testing.assert_array_equal(step.rates[0][:, :, :],
+                                              ref.rates[0][:, :, :])
+
+            np.testing.assert_array_equal(res_file[-1].data, res[-1].data)
+            with self.assertRaises(IndexError):
+                res_file[len(res)]
+
+    def test_slicing(self):
+        """ Tests slicing the number and rates datasets directly. """
+
+        res = results.read_results("test/test_reference.h5")
+
+        with results.ResultsFile("test/test_reference.h5") as res_file:
+            mat = res_file.mat_to_ind["1"]
+            nuc = res_file.nuc_to_ind["Xe135"]
+
+            xe = res_file.number[:, 0, mat, nuc]
+            xe_ref = [r.data[0, mat, nuc] for r in res]
+            np.testing.assert_array_equal(xe, xe_ref)
+
+            np.testing.assert_array_equal(res_file.k[:, 0],
+                                          [r.k[0] for r in res])
+            np.testing.assert_array_equal(res_file.time[:, 0],
+                                          [r.time[0] for r in res])
+
+        self.assertIsNone(res_file.handle)
+
+    def test_memmap(self):
+        """ Tests that datasets of a fixed number of steps are memory-mapped. """
+
+        tmp_dir = tempfile.mkdtemp()
+
+        op = MagicMock()
+        op.get_results_info.return_value = ({"1": 1.0, "2": 1.0},
+                                            ["na", "nb"], ["1", "2"],
+                                            {"1": 0, "2": 1})
+        rate = ReactionRates({"1": 0, "2": 1}, {"na": 0, "nb": 1}, {"ra": 0})
+        x = [np.random.rand(2, 2)]
+
+        try:
+            for name, options in (("contiguous.h5", {}),
+                                  ("gzip.h5", {"compression": "gzip"})):
+                filename = os.path.join(tmp_dir, name)
+                with results.ResultsWriter(filename, 2, **options) as writer:
+                    for i in range(2):
+                        rate.rates = np.random.rand(2, 2, 1)
+                        integrator.save_results(op, x, [rate], [1.0], [0],
+                                                [i, i + 1.0], i, writer)
+
+                    # Every step is allocated up front
+                    with self.assertRaises(ValueError):
+                        integrator.save_results(op, x, [rate], [1.0], [0],
+                                                [2.0, 3.0], 2, writer)
+
+                with results.ResultsFile(filename) as res_file:
+                    if options:
+                        # Chunks span the steps, for time series reads
+                        self.assertIsInstance(res_file.number, h5py.Dataset)
+                        self.assertEqual(res_file.number.chunks, (2, 1, 2, 2))
+                    else:
+                        self.assertIsInstance(res_file.number, np.memmap)
+                        self.assertIsInstance(res_file.rates, np.memmap)
+                    np.testing.assert_array_equal(res_file.number[1, 0], x[0])
+                    np.testing.assert_array_equal(res_file.rates[1, 0],
+                                                  rate.rates)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestMetadata(unittest.TestCase):
+    """ Tests the results index metadata. """
+
+    def test_array_metadata(self):
+        """ Tests that metadata is stored as arrays and read back. """
+
+        op = MagicMock()
+        vol_dict = {"10": 1.2, "2": 3.4}
+        full_burn_dict = {"2": 0, "10": 1}
+        burn_list = ["2", "10"]
+        nuc_list = ["na", "nb", "nc"]
+        op.get_results_info.return_value = (vol_dict, nuc_list, burn_list,
+                                            full_burn_dict)
+
+        x = np.random.rand(1, 2, 3)
+        r1 = ReactionRates({"2": 0, "10": 1}, {"nc": 0, "na": 1},
+                           {"rb": 0, "ra": 1})
+        r1.rates = np.random.rand(2, 2, 2)
+
+        tmp_dir = tempfile.mkdtemp()
+        filename = os.path.join(tmp_dir, "results.h5")
+
+        try:
+            with results.ResultsWriter(filename, 1) as writer:
+                integrator.save_results(op, x, [r1], [1.0], [0], [0.0, 1.0],
+                                        0, writer)
+
+            with h5py.File(filename, "r") as handle:
+                self.assertEqual(handle["/version"][()],
+                                 results.RESULTS_VERSION)
+                self.assertIsInstance(handle["/nuclides/names"], h5py.Dataset)
+                self.assertEqual(len(handle["/nuclides"]), 3)
+
+            with results.ResultsFile(filename) as res_file:
+                self.assertEqual(dict(res_file.mat_to_ind), full_burn_dict)
+                self.assertEqual(dict(res_file.volume), vol_dict)
+                self.assertEqual(dict(res_file.nuc_to_ind),
+                                 {"na": 0, "nb": 1, "nc": 2})
+                self.assertEqual(dict(res_file.rxn_nuc_to_ind),
+                                 {"nc": 0, "na": 1})
+                self.assertEqual(dict(res_file.rxn_to_ind),
+                                 {"rb": 0, "ra": 1})
+
+                res = res_file[0]
+                np.testing.assert_array_equal(res.data, x)
+                np.testing.assert_array_equal(res.rates[0]["10", "na", "ra"],
+                                              r1["10", "na", "ra"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestCompactRates(unittest.TestCase):
+    """ Tests storing the reaction rates of index pairs only. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "results.h5")
+
+        op = MagicMock()
+        op.get_results_info.return_value = (
+            {"1": 1.0, "2": 1.0}, ["na", "nb", "nc"], ["1", "2"],
+            {"1": 0, "2": 1})
+
+        self.x = [np.random.rand(2, 3), np.random.rand(2, 3)]
+        self.pairs = np.array([[0, 0], [1, 1], [2, 0]])
+        self.rates = []
+        for _ in range(2):
+            rate = ReactionRates({"1": 0, "2": 1},
+                                 {"na": 0, "nb": 1, "nc": 2},
+                                 {"ra": 0, "rb": 1}, self.pairs)
+            rate.set_compact(np.random.rand(2, 3))
+            self.rates.append(rate)
+
+        with results.ResultsWriter(self.filename, 1) as writer:
+            integrator.save_results(op, self.x, self.rates, [1.0, 1.0],
+                                    [0, 0], [0.0, 1.0], 0, writer)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        """ Tests the stored layout and reading the rates back. """
+
+        with h5py.File(self.filename, "r") as handle:
+            self.assertEqual(handle["/reaction rates"].shape, (1, 2, 2, 3))
+            np.testing.assert_array_equal(handle["/reactions/pairs"][()],
+                                          self.pairs)
+
+        res = results.read_results(self.filename)
+        for rate, ref in zip(res[0].rates, self.rates):
+            np.testing.assert_array_equal(rate.pairs, self.pairs)
+            np.testing.assert_array_equal(rate.rates, ref.rates)
+            self.assertEqual(rate[:, "na", "rb"].tolist(), [0.0, 0.0])
+
+    def test_results_file(self):
+        """ Tests the dense view of the stored rates. """
+
+        with results.ResultsFile(self.filename) as res_file:
+            self.assertIsInstance(res_file.rates, results.CompactRates)
+            self.assertEqual(res_file.rates.shape, (1, 2, 2, 3, 2))
+
+            np.testing.assert_array_equal(res_file.rates[0, 1],
+                                          self.rates[1][:, :, :])
+            np.testing.assert_array_equal(res_file.rates[:, 0, 1, 1, 1],
+                                          [self.rates[0][1, 1, 1]])
+            np.testing.assert_array_equal(res_file.rates[:, 0, :, 0, 1],
+                                          [[0.0, 0.0]])
+
+    def test_select_nuclides(self):
+        """ Tests that selecting nuclides renumbers the pairs. """
+
+        res = results.Results()
+        res.allocate({"1": 1.0, "2": 1.0}, ["na", "nb", "nc"], ["1", "2"],
+                     {"1": 0, "2": 1}, 2, nuclides=["nb", "nc"])
+
+        selected = res.select_rates(self.rates)
+        np.testing.assert_array_equal(selected[0].pairs, [[0, 1], [1, 0]])
+        np.testing.assert_array_equal(selected[0].compact(),
+                                      self.rates[0].compact()[:, 1:])
+
+
+def _write_steps(filename, n_steps, first_written, delay):
+    """ Writes n_steps single material steps with an SWMR writer. """
+
+    op = MagicMock()
+    op.get_results_info.return_value = ({"1": 1.0}, ["na", "nb"], ["1"],
+                                        {"1": 0})
+
+    r1 = ReactionRates({"1": 0}, {"na": 0, "nb": 1}, {"ra": 0})
+
+    with results.ResultsWriter(filename, n_steps, swmr=True) as writer:
+        for i in range(n_steps):
+            x = np.full((1, 1, 2), float(i))
+            integrator.save_results(op, x, [r1], [1.0], [i],
+                                    [float(i), i + 1.0], i, writer)
+            first_written.set()
+            time.sleep(delay)
+
+
+class TestTailResults(unittest.TestCase):
+    """ Tests following a results file while it is written. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "results.h5")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_tail_running(self):
+        """ Tests that steps are yielded while the writer is running. """
+
+        n_steps = 4
+        first_written = multiprocessing.Event()
+
+        writer = multiprocessing.Process(
+            target=_write_steps,
+            args=(self.filename, n_steps, first_written, 0.2))
+        writer.start()
+
+        try:
+            self.assertTrue(first_written.wait(30.0))
+
+            steps = list(results.tail_results(self.filename, 0.05, 30.0))
+        finally:
+            writer.join()
+
+        self.assertEqual(writer.exitcode, 0)
+        self.assertEqual(len(steps), n_steps)
+        for i, res in enumerate(steps):
+            np.testing.assert_array_equal(res[0, "1", :], [i, i])
+            np.testing.assert_array_equal(res.time, [i, i + 1.0])
+
+    def test_tail_timeout(self):
+        """ Tests that tail stops if no new step is written. """
+
+        first_written = multiprocessing.Event()
+        _write_steps(self.filename, 2, first_written, 0.0)
+
+        # Pretend more steps were preallocated than written
+        with results.ResultsFile(self.filename, swmr=True) as res_file:
+            self.assertTrue(res_file.swmr)
+            steps = list(res_file.tail(0.01, timeout=0.1, start=1))
+
+        self.assertEqual(len(steps), 1)
+        np.testing.assert_array_equal(steps[0][0, "1", :], [1.0, 1.0])
+
+
+class TestLazyImport(unittest.TestCase):
+    """ Tests that reading results does not import the rest of the package. """
+
+    def test_read_results(self):
+        """ Tests the modules loaded by importing the post-processing API. """
+
+        code = ("import sys\n"
+                "from opendeplete import read_results, nuclide_series\n"
+                "print(' '.join(sorted(sys.modules)))")
+        modules = subprocess.check_output(
+            [sys.executable, "-c", code], universal_newlines=True).split()
+
+        for name in ("openmc", "openmc.capi", "mpi4py", "tqdm",
+                     "scipy.sparse", "opendeplete.integrator",
+                     "opendeplete.openmc_wrapper"):
+            self.assertNotIn(name, modules)
+        self.assertIn("opendeplete.results", modules)
+
+    def test_submodule(self):
+        """ Tests attribute access to submodules not imported yet. """
+
+        code = ("import opendeplete\n"
+                "print(opendeplete.integrator.__name__)\n"
+                "print(opendeplete.integrator.cecm.__module__)\n"
+                "print(hasattr(opendeplete, 'missing'))")
+        output = subprocess.check_output(
+            [sys.executable, "-c", code], universal_newlines=True).split()
+
+        self.assertEqual(output, ["opendeplete.integrator",
+                                  "opendeplete.integrator.cecm", "False"])
+
+    def test_documented_names(self):
+        """ Tests that every name in the API documentation can be accessed. """
+
+        names = []
+        for filename in glob.glob("docs/source/api/*.rst"):
+            with open(filename) as fh:
+                text = fh.read()
+            names += re.findall(r"^\s+(opendeplete(?:\.\w+)+)\s*$", text,
+                                re.MULTILINE)
+            module = re.search(r"currentmodule:: (\S+)", text)
+            if module:
+                names += [module.group(1) + "." + name for name in
+                          re.findall(r"autofunction:: (\w+)", text)]
+
+        self.assertIn("opendeplete.AtomNumber", names)
+        for name in names:
+            module, attr = name.rsplit(".", 1)
+            try:
+                found = hasattr(importlib.import_module(module), attr)
+            except ImportError as err:
+                # Names needing OpenMC cannot be checked without it
+                if not err.name.startswith("openmc"):
+                    raise
+                continue
+            self.assertTrue(found, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+""" Regression tests for sie.py"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import opendeplete
+from opendeplete import results
+from opendeplete import utilities
+import test.dummy_geometry as dummy_geometry
+
+
+class TestSIERegression(unittest.TestCase):
+    """ Regression tests for opendeplete.integrator.sie algorithm.
+
+    These tests integrate a simple test problem described in dummy_geometry.py.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """ Save current directory in case integrator crashes."""
+        cls.cwd = os.getcwd()
+        cls.results = "test_integrator_regression"
+
+    def test_sie(self):
+        """ Integral regression test of integrator algorithm using SIE. """
+
+        settings = opendeplete.Settings()
+        settings.dt_vec = [0.75, 0.75]
+        settings.output_dir = self.results
+
+        op = dummy_geometry.DummyGeometry(settings)
+
+        # Perform simulation using the stochastic implicit Euler algorithm
+        opendeplete.sie(op, m=3, print_out=False)
+
+        # Load the files
+        res = results.read_results(settings.output_dir + "/results.h5")
+
+        _, y1 = utilities.evaluate_single_nuclide(res, "1", "1")
+        _, y2 = utilities.evaluate_single_nuclide(res, "1", "2")
+
+        # Every iteration is saved as a stage
+        self.assertEqual(res[0].n_stages, 4)
+
+        # Solution from scipy.linalg.expm
+        s1 = [1.772281553509788, 1.547042538477874]
+        s2 = [0.495440387441083, 4.260016046530254]
+
+        tol = 1.0e-13
+
+        self.assertLess(np.absolute(y1[1] - s1[0]), tol)
+        self.assertLess(np.absolute(y2[1] - s1[1]), tol)
+
+        self.assertLess(np.absolute(y1[2] - s2[0]), tol)
+        self.assertLess(np.absolute(y2[2] - s2[1]), tol)
+
+    def test_sie_particles_restored(self):
+        """ Tests that particles are restored if an iteration fails. """
+
+        settings = opendeplete.Settings()
+        settings.dt_vec = [0.75]
+        settings.output_dir = tempfile.mkdtemp()
+        settings.particles = 10
+
+        op = dummy_geometry.DummyGeometry(settings)
+        evals = [op.eval, op.eval, RuntimeError("transport failed")]
+
+        def fail_third(vec, print_out=True):
+            """ Evaluates the operator, failing on the third call. """
+            evaluate = evals.pop(0)
+            if isinstance(evaluate, Exception):
+                self.assertEqual(settings.particles, 20)
+                raise evaluate
+            return evaluate(vec, print_out)
+
+        op.eval = fail_third
+
+        try:
+            with self.assertRaises(RuntimeError):
+                opendeplete.sie(op, m=3, print_out=False)
+        finally:
+            os.chdir(self.cwd)
+            shutil.rmtree(settings.output_dir)
+
+        self.assertEqual(settings.particles, 10)
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Clean up files"""
+
+        os.chdir(cls.cwd)
+
+        opendeplete.comm.barrier()
+        if opendeplete.comm.rank == 0:
+            os.remove(os.path.join(cls.results, "results.h5"))
+            os.rmdir(cls.results)
+
+
+if __name__ == '__main__':
+    unittest.main()
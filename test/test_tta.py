@@ -0,0 +1,153 @@
+""" Tests for tta.py """
+
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import scipy.sparse as sp
+
+import opendeplete
+from opendeplete import benchmarks, depletion_chain, reaction_rates
+from opendeplete.integrator import CRAM48, TTA, tta
+
+
+class TestTTA(unittest.TestCase):
+    """ Tests for tta.py
+
+    Compares TTA against a Mathematica matrix exponential and CRAM48.
+    """
+
+    def test_TTA(self):
+        """ Test TTA against the same matrix as the CRAM tests. """
+        x = np.array([1.0, 1.0])
+        mat = sp.csr_matrix([[-1.0, 0.0], [-2.0, -3.0]])
+        dt = 0.1
+
+        z = TTA(mat, x, dt)
+
+        # Solution from mathematica
+        z0 = np.array((0.904837418035960, 0.576799023327476))
+
+        tol = 1.0e-15
+
+        self.assertLess(np.linalg.norm(z - z0), tol)
+
+    def test_TTA_cycle(self):
+        """ Test TTA against CRAM48 on chain_test, which contains cycles.
+
+        Atoms that go around a cycle more than once are not followed, so TTA
+        is below CRAM48 by a few percent of the strongly cycling nuclides.
+        """
+
+        dep = depletion_chain.DepletionChain.xml_read("chains/chain_test.xml")
+
+        cell_ind = {"10000": 0}
+        nuc_ind = {"A": 0, "B": 1, "C": 2}
+
+        react = reaction_rates.ReactionRates(cell_ind, nuc_ind, dep.react_to_ind)
+
+        dep.nuc_to_react_ind = nuc_ind
+
+        react["10000", "C", "fission"] = 1.0e-5
+        react["10000", "A", "(n,gamma)"] = 2.0e-5
+        react["10000", "B", "(n,gamma)"] = 3.0e-5
+        react["10000", "C", "(n,gamma)"] = 4.0e-5
+
+        mat = dep.form_matrix(react[0, :, :])
+        x = np.array([1.0, 0.0, 1.0])
+        dt = 1.0e4
+
+        z = TTA(mat, x, dt, cutoff=1.0e-16)
+        z0 = CRAM48(mat, x, dt)
+
+        self.assertTrue(np.all(z <= z0 * (1.0 + 1.0e-12)))
+        np.testing.assert_allclose(z, z0, rtol=3.0e-2)
+
+    def test_TTA_fast_cycle(self):
+        """ Test that a cycle ends the walk, however fast atoms go around. """
+
+        # Two nuclides decaying into each other with a half life of 1 s, which
+        # atoms go around about 30000 times in a day
+        lam = np.log(2.0)
+        mat = sp.csr_matrix([[-lam, lam], [lam, -lam]])
+        x = np.array([1.0, 0.0])
+
+        with patch.object(tta, "_log_exp_dd", wraps=tta._log_exp_dd) as dd:
+            z = TTA(mat, x, 24.0 * 60.0 * 60.0)
+
+        # Number of [0], number and passage of [0, 1], number of [0, 1, 0]
+        self.assertEqual(dd.call_count, 4)
+        self.assertTrue(np.all(np.isfinite(z)))
+
+    def test_TTA_synthetic(self):
+        """ Test TTA with every nuclide of a cyclic synthetic chain present. """
+
+        chain = benchmarks.synthetic_chain(50)
+        op = benchmarks.SyntheticOperator(opendeplete.Settings(), chain, 1)
+        mat = chain.form_matrix(op.rates.rates[0])
+        x = op.initial_condition()[0]
+        x /= np.sum(x)
+        dt = 30.0 * 24.0 * 60.0 * 60.0
+
+        z = TTA(mat, x, dt)
+
+        np.testing.assert_allclose(z, CRAM48(mat, x, dt), rtol=0.0,
+                                   atol=1.0e-8)
+
+        # The trajectories of each initial nuclide are independent
+        with ThreadPoolExecutor(2) as pool:
+            np.testing.assert_array_equal(TTA(mat, x, dt, pool=pool), z)
+
+    def test_TTA_stiff(self):
+        """ Test TTA on stiff chains, where the removal constants times dt are
+        large and spread over many orders of magnitude. """
+
+        mat = sp.csr_matrix([[-1.0, 0.0], [1.0, -1.0e-3]])
+        x = np.array([1.0, 1.0])
+
+        # Bateman solution
+        dt = 1.0e4
+        z0 = np.array([np.exp(-dt), np.exp(-1.0e-3 * dt)
+                       + (np.exp(-1.0e-3 * dt) - np.exp(-dt)) / (1.0 - 1.0e-3)])
+
+        np.testing.assert_allclose(TTA(mat, x, dt), z0, rtol=1.0e-14)
+
+        # By 1e6 both nuclides have decayed far below the accuracy of CRAM48
+        z = TTA(mat, x, 1.0e6)
+
+        self.assertTrue(np.all(np.isfinite(z)))
+        np.testing.assert_allclose(z, CRAM48(mat, x, 1.0e6), atol=1.0e-40)
+
+        # Linear chain of 15 nuclides, with half lives from 1 s to 1e15 s and
+        # a few branches, over 30 days
+        n = 15
+        rng = np.random.RandomState(1)
+        lam = np.log(2.0) / 10.0 ** rng.uniform(0.0, 15.0, n)
+        mat = sp.lil_matrix((n, n))
+        for i in range(n):
+            mat[i, i] = -lam[i]
+            if i + 1 < n:
+                mat[i + 1, i] = 0.7 * lam[i]
+            if i + 2 < n:
+                mat[i + 2, i] = 0.3 * lam[i]
+        x = np.zeros(n)
+        x[[0, 10]] = 1.0
+        dt = 30.0 * 24.0 * 60.0 * 60.0
+
+        z = TTA(mat.tocsr(), x, dt, cutoff=1.0e-20)
+
+        self.assertTrue(np.all(np.isfinite(z)))
+        np.testing.assert_allclose(z, CRAM48(mat.tocsr(), x, dt),
+                                   rtol=0.0, atol=1.0e-13)
+
+    def test_TTA_cutoff(self):
+        """ Test that non-positive cutoffs are rejected. """
+        x = np.array([1.0, 1.0])
+        mat = sp.csr_matrix([[-1.0, 0.0], [-2.0, -3.0]])
+
+        self.assertRaises(ValueError, TTA, mat, x, 0.1, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,16 @@
 """ Full system test suite. """
 
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
 
-from opendeplete import results
+import opendeplete
+from opendeplete import benchmarks, results
 from opendeplete import utilities
+import test.dummy_geometry as dummy_geometry
 
 
 class TestUtilities(unittest.TestCase):
@@ -48,6 +53,27 @@ class TestUtilities(unittest.TestCase):
         np.testing.assert_array_equal(x, x_ref)
         np.testing.assert_array_equal(y, xe_ref * r_ref)
 
+    def test_evaluate_lists(self):
+        """ Tests evaluating several cells and nuclides at once. """
+
+        res = results.read_results("test/test_reference.h5")
+
+        _, y = utilities.evaluate_single_nuclide(res, ["1", "2"],
+                                                 ["Xe135", "U235"])
+        _, rate = utilities.evaluate_reaction_rate(res, ["2"], "U235",
+                                                   "fission")
+
+        self.assertEqual(y.shape, (4, 2, 2))
+        for i, cell in enumerate(["1", "2"]):
+            for j, nuc in enumerate(["Xe135", "U235"]):
+                np.testing.assert_array_equal(
+                    y[:, i, j],
+                    utilities.evaluate_single_nuclide(res, cell, nuc)[1])
+
+        np.testing.assert_array_equal(
+            rate[:, 0],
+            utilities.evaluate_reaction_rate(res, "2", "U235", "fission")[1])
+
     def test_evaluate_eigenvalue(self):
         """ Tests evaluating eigenvalue
         """
@@ -63,6 +89,231 @@ class TestUtilities(unittest.TestCase):
         np.testing.assert_array_equal(x, x_ref)
         np.testing.assert_array_equal(y, y_ref)
 
+    def test_nuclide_series(self):
+        """ Tests reading nuclide time series from a results file.
+        """
+
+        res = results.read_results("test/test_reference.h5")
+
+        cells = ["3", "1", "10"]
+        nucs = ["Xe135", "U235"]
+
+        x, y = utilities.nuclide_series("test/test_reference.h5", cells, nucs)
+
+        self.assertEqual(y.shape, (len(res), len(cells), len(nucs)))
+        for i, cell in enumerate(cells):
+            for j, nuc in enumerate(nucs):
+                x_ref, y_ref = utilities.evaluate_single_nuclide(res, cell, nuc)
+                np.testing.assert_array_equal(x, x_ref)
+                np.testing.assert_array_equal(y[:, i, j], y_ref)
+
+        # A single name drops its axis
+        with results.ResultsFile("test/test_reference.h5") as res_file:
+            _, y_cells = utilities.nuclide_series(res_file, cells, "Xe135")
+            _, y_single = utilities.nuclide_series(res_file, "1", "Xe135")
+
+        np.testing.assert_array_equal(y_cells, y[:, :, 0])
+        np.testing.assert_array_equal(y_single, y[:, 1, 0])
+
+    def test_reaction_rate_series(self):
+        """ Tests reading reaction rate time series from a results file.
+        """
+
+        res = results.read_results("test/test_reference.h5")
+
+        cells = ["1", "2"]
+
+        x, y = utilities.reaction_rate_series(
+            "test/test_reference.h5", cells, "Xe135", "(n,gamma)")
+
+        self.assertEqual(y.shape, (len(res), len(cells)))
+        for i, cell in enumerate(cells):
+            x_ref, y_ref = utilities.evaluate_reaction_rate(
+                res, cell, "Xe135", "(n,gamma)")
+            np.testing.assert_array_equal(x, x_ref)
+            np.testing.assert_array_equal(y[:, i], y_ref)
+
+    def test_series_empty(self):
+        """ Tests reading time series of no cells or nuclides. """
+
+        res = results.read_results("test/test_reference.h5")
+
+        _, y = utilities.nuclide_series("test/test_reference.h5", [],
+                                        ["Xe135", "U235"])
+        self.assertEqual(y.shape, (len(res), 0, 2))
+
+        _, y = utilities.reaction_rate_series("test/test_reference.h5", ["1"],
+                                              [], "(n,gamma)")
+        self.assertEqual(y.shape, (len(res), 1, 0))
+
+    def test_reaction_rate_series_no_rates(self):
+        """ Tests reading reaction rates from a file without them. """
+
+        cwd = os.getcwd()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            settings = opendeplete.Settings()
+            settings.dt_vec = [0.75]
+            settings.output_dir = tmp_dir
+            settings.output_rates = "none"
+
+            op = dummy_geometry.DummyGeometry(settings)
+            opendeplete.predictor(op, print_out=False)
+
+            filename = os.path.join(tmp_dir, "results.h5")
+            with self.assertRaises(ValueError):
+                utilities.reaction_rate_series(filename, "1", "1", "1")
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp_dir)
+
+    def test_eigenvalue_series(self):
+        """ Tests reading the eigenvalue from a results file.
+        """
+
+        res = results.read_results("test/test_reference.h5")
+
+        x, y = utilities.eigenvalue_series("test/test_reference.h5")
+        x_ref, y_ref = utilities.evaluate_eigenvalue(res)
+
+        np.testing.assert_array_equal(x, x_ref)
+        np.testing.assert_array_equal(y, y_ref)
+
+
+class TestDenseOutput(unittest.TestCase):
+    """ Tests reconstructing compositions within a step. """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def _run(self, integrator, dt_vec, name):
+        """ Runs the dummy problem and returns the results file name. """
+
+        settings = opendeplete.Settings()
+        settings.dt_vec = dt_vec
+        settings.output_dir = os.path.join(self.tmp_dir, name)
+
+        op = dummy_geometry.DummyGeometry(settings)
+        integrator(op, print_out=False)
+
+        return os.path.join(settings.output_dir, "results.h5"), op
+
+    def test_predictor_within_step(self):
+        """ Tests that predictor dense output matches a shorter step. """
+
+        filename, op = self._run(opendeplete.predictor, [0.75, 0.75], "full")
+        short, _ = self._run(opendeplete.predictor, [0.3], "short")
+
+        y = utilities.dense_output(filename, op.chain, [0.3, 1.0])
+        y_ref = results.read_results(short)[1].data[0]
+
+        self.assertEqual(y.shape, (2, 1, 2))
+        np.testing.assert_allclose(y[0], y_ref, rtol=1.0e-12)
+
+        # The end of the last step is read back directly
+        y_end = utilities.dense_output(filename, op.chain, 1.5)
+        np.testing.assert_array_equal(
+            y_end[0], results.read_results(filename)[2].data[0])
+
+    def test_cecm_step_end(self):
+        """ Tests that cecm dense output reproduces the end of step. """
+
+        filename, op = self._run(opendeplete.cecm, [0.75, 0.75], "cecm")
+        res = results.read_results(filename)
+
+        y = utilities.dense_output(filename, op.chain, [0.75, 1.5],
+                                   integrator="cecm")
+
+        np.testing.assert_allclose(y[0], res[1].data[0], rtol=1.0e-12)
+        np.testing.assert_allclose(y[1], res[2].data[0], rtol=1.0e-12)
+
+    def test_depletion_chain(self):
+        """ Tests dense output with a depletion chain read anew. """
+
+        settings = opendeplete.Settings()
+        settings.dt_vec = [3600.0, 3600.0]
+        settings.output_dir = os.path.join(self.tmp_dir, "chain")
+        op = benchmarks.SyntheticOperator(
+            settings, benchmarks.synthetic_chain(20), 2)
+        opendeplete.predictor(op, print_out=False)
+        filename = os.path.join(settings.output_dir, "results.h5")
+
+        settings.dt_vec = [1000.0]
+        settings.output_dir = os.path.join(self.tmp_dir, "chain_short")
+        op = benchmarks.SyntheticOperator(
+            settings, benchmarks.synthetic_chain(20), 2)
+        opendeplete.predictor(op, print_out=False)
+        y_ref = results.read_results(
+            os.path.join(settings.output_dir, "results.h5"))[1].data[0]
+
+        # The chain has no reaction rate indices of its own, and keeps them
+        chain = benchmarks.synthetic_chain(20)
+        y = utilities.dense_output(filename, chain, 1000.0)
+
+        self.assertEqual(y.shape, (1, 2, 20))
+        np.testing.assert_allclose(y[0], y_ref, rtol=1.0e-10)
+        self.assertEqual(len(chain.nuc_to_react_ind), 0)
+
+    def test_fission_yield_energy(self):
+        """ Tests dense output of a run with fission yield energies. """
+
+        def run(dt_vec, name):
+            settings = opendeplete.Settings()
+            settings.dt_vec = dt_vec
+            settings.output_dir = os.path.join(self.tmp_dir, name)
+            op = benchmarks.SyntheticOperator(settings, _fast_chain(), 2)
+
+            eval_rates = op.eval
+            def eval_fast(vec, print_out=True):
+                k, rates, seed = eval_rates(vec, print_out)
+                rates.fission_energy = np.full(2, 1.0e6)
+                return k, rates, seed
+            op.eval = eval_fast
+
+            opendeplete.predictor(op, print_out=False)
+            return os.path.join(settings.output_dir, "results.h5")
+
+        filename = run([3600.0, 3600.0], "full")
+        y_ref = results.read_results(run([1000.0], "short"))[1].data[0]
+
+        y = utilities.dense_output(filename, _fast_chain(), 1000.0,
+                                   fission_yield_energy={0: 1.0e6, 1: 1.0e6})
+        np.testing.assert_allclose(y[0], y_ref, rtol=1.0e-10)
+
+        # Thermal yields differ
+        y = utilities.dense_output(filename, _fast_chain(), 1000.0)
+        self.assertFalse(np.allclose(y[0], y_ref, rtol=1.0e-10))
+
+    def test_invalid(self):
+        """ Tests errors for times and integrators that cannot be used. """
+
+        filename, op = self._run(opendeplete.predictor, [0.75], "invalid")
+
+        with self.assertRaises(ValueError):
+            utilities.dense_output(filename, op.chain, 0.8)
+        with self.assertRaises(ValueError):
+            utilities.dense_output(filename, op.chain, 0.5, integrator="cecm")
+        with self.assertRaises(ValueError):
+            utilities.dense_output(filename, op.chain, 0.5, solver="expm")
+
+
+def _fast_chain():
+    """ Returns a synthetic chain with reversed yields at 1 MeV. """
+
+    chain = benchmarks.synthetic_chain(20)
+    for nuc in chain.nuclides:
+        if nuc.yield_data:
+            thermal = nuc.yield_data[0.0253]
+            nuc.yield_data[1.0e6] = list(zip(thermal.products,
+                                             thermal.yields[::-1]))
+            nuc.yield_energies = [0.0253, 1.0e6]
+    return chain
+
 
 if __name__ == '__main__':
     unittest.main()